@@ -0,0 +1,4 @@
+# The browser scripts drive Chromium against the live site (or --local) and are
+# run directly, e.g. `python test_chatbot.py --local`; pytest only collects the
+# checks that need no browser.
+collect_ignore = ["test_chatbot.py", "test_chat_v2.py", "test_chatbot_debug.py"]
@@ -0,0 +1,4 @@
+"""
+Shared helpers for the Playwright chatbot scripts (test_chatbot.py,
+test_chat_v2.py, test_chatbot_debug.py).
+"""
@@ -0,0 +1,180 @@
+"""
+SQLite stand-in for the aggregate RPCs in
+supabase/migrations/20261018000000_aggregate_rpcs.sql.
+
+The stub backend answers POST /rest/v1/rpc/<name> through call(), which loads
+the in-memory tables into SQLite and runs the same GROUP BY the Postgres
+functions do. Keep RPC_SQL in step with the migration.
+
+SqliteRows goes the other way for large datasets: a table that already lives
+in SQLite (harness/dataset.py's write_sqlite()) read as the list of row dicts
+the stub keeps, without loading it into Python.
+"""
+
+import json
+import sqlite3
+
+RPC_SQL = {
+    "expense_category_totals": """
+        select category, sum(amount) as total, count(*) as entries
+        from expenses
+        where user_id = :p_user_id
+          and expense_date >= :p_start
+          and (:p_end is null or expense_date <= :p_end)
+        group by category
+        order by total desc
+    """,
+    "income_breakdown": """
+        select source_type, sum(amount) as total, count(*) as entries
+        from passive_income
+        where user_id = :p_user_id
+          and income_date >= :p_start
+          and (:p_end is null or income_date <= :p_end)
+        group by source_type
+        order by total desc
+    """,
+}
+
+# Tables each RPC reads
+RPC_TABLES = {
+    "expense_category_totals": "expenses",
+    "income_breakdown": "passive_income",
+}
+
+# Columns the RPCs need even when a table has no rows yet
+TABLE_COLUMNS = {
+    "expenses": ("id", "user_id", "category", "amount", "expense_date"),
+    "passive_income": ("id", "user_id", "source_type", "amount", "income_date"),
+}
+
+# The RPCs filter on (user_id, date) and TransactionsPage pages by
+# (user_id, date, id): indexed as in the migrations
+TABLE_INDEXES = {
+    "expenses": ("user_id", "expense_date", "id"),
+    "passive_income": ("user_id", "income_date", "id"),
+}
+
+
+def _value(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def load(conn, table, rows):
+    """Create `table` with the union of the rows' keys and insert the rows.
+
+    Row i of `rows` gets rowid i + 1, so a rowid found by a query maps
+    straight back to the original dict.
+    """
+    columns = sorted(set(TABLE_COLUMNS.get(table, ("id",))) | {key for row in rows for key in row})
+    conn.execute(f"create table {table} ({', '.join(columns)})")
+    append(conn, table, rows)
+    create_indexes(conn, table)
+
+
+def create_indexes(conn, table):
+    if table in TABLE_INDEXES:
+        conn.execute(f"create index if not exists {table}_rpc_idx on {table} ({', '.join(TABLE_INDEXES[table])})")
+
+
+def columns_of(conn, table):
+    return [row[1] for row in conn.execute(f"pragma table_info({table})")]
+
+
+def append(conn, table, rows, first_rowid=1):
+    """Insert rows as rowids first_rowid, first_rowid + 1, ...; new keys become columns."""
+    existing = columns_of(conn, table)
+    for column in sorted({key for row in rows for key in row} - set(existing)):
+        conn.execute(f"alter table {table} add column {column}")
+        existing.append(column)
+    placeholders = ", ".join("?" for _ in existing)
+    conn.executemany(f"insert into {table} (rowid, {', '.join(existing)}) values (?, {placeholders})",
+                     ([first_rowid + i] + [_value(row.get(column)) for column in existing]
+                      for i, row in enumerate(rows)))
+
+
+def connect(tables, check_same_thread=True):
+    """In-memory SQLite database holding {table: [row, ...]}."""
+    conn = sqlite3.connect(":memory:", check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    for table, rows in tables.items():
+        load(conn, table, rows)
+    return conn
+
+
+class SqliteRows:
+    """A SQLite table as the stub's list of row dicts: row i is rowid i + 1.
+
+    Rows are built from SQLite when read, so a million-row table costs its
+    SQLite pages rather than a million dicts. extend() keeps the rows it is
+    given as they are (the stub updates upserted rows in place); the caller
+    writes them to the table too, with append(). `decode` turns a raw SQLite
+    row dict back into the row as generated (booleans, JSON columns).
+    """
+
+    def __init__(self, conn, table, decode=None, batch_size=10000):
+        self.conn = conn
+        self.table = table
+        self.decode = decode or (lambda row: row)
+        self.batch_size = batch_size
+        self.stored = conn.execute(f"select count(*) from {table}").fetchone()[0]
+        self.added = []
+
+    def __len__(self):
+        return self.stored + len(self.added)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index >= self.stored:
+            return self.added[index - self.stored]
+        row = self.conn.execute(f"select * from {self.table} where rowid = ?", (index + 1,)).fetchone()
+        return self.decode(dict(row))
+
+    def __iter__(self):
+        cursor = self.conn.execute(f"select * from {self.table} where rowid <= ? order by rowid", (self.stored,))
+        while True:
+            batch = cursor.fetchmany(self.batch_size)
+            if not batch:
+                break
+            for row in batch:
+                yield self.decode(dict(row))
+        yield from list(self.added)
+
+    def at_rowids(self, rowids):
+        """Rows for a query's rowids, in that order, read in batches."""
+        found = {}
+        stored = [rowid for rowid in rowids if rowid <= self.stored]
+        for i in range(0, len(stored), 500):
+            chunk = stored[i:i + 500]
+            query = f"select rowid as _rowid, * from {self.table} where rowid in ({', '.join('?' for _ in chunk)})"
+            for row in self.conn.execute(query, chunk):
+                row = dict(row)
+                found[row.pop("_rowid")] = self.decode(row)
+        return [found[rowid] if rowid <= self.stored else self.added[rowid - 1 - self.stored] for rowid in rowids]
+
+    def extend(self, rows):
+        self.added.extend(rows)
+
+
+def run(conn, name, args):
+    """Run RPC `name` on an open connection; returns a list of dicts."""
+    if name not in RPC_SQL:
+        raise KeyError(name)
+    params = {"p_user_id": None, "p_start": None, "p_end": None, **args}
+    return [dict(row) for row in conn.execute(RPC_SQL[name], params)]
+
+
+def call(tables, name, args):
+    """Run RPC `name` against {table: rows}, loading only the table it reads."""
+    table = RPC_TABLES[name]
+    conn = connect({table: tables.get(table, [])})
+    try:
+        return run(conn, name, args)
+    finally:
+        conn.close()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Batched chat entries: N entries in one utterance vs N utterances.
+
+    python -m harness.bench_batch --local
+    python -m harness.bench_batch --local --entries 2,5,10,20 --latency-ms 80
+
+For each N the widget saves N expenses twice, each in a fresh context:
+
+    batch   one utterance ("Spent 500 on groceries, 200 on auto and 1500 on
+            electricity"), one confirmation, one bulk insert
+    single  N utterances ("Spent 500 on groceries", ...), each confirmed and
+            inserted on its own
+
+Time is end to end, from filling the first message to the last "saved"
+bubble, so it includes every confirmation click; "synced_ms" runs on to
+the outbox having sent everything (useOutbox). The report also counts
+Supabase POSTs per mode and checks that the stub ended up with N new
+expense rows either way; a mode that saved a different number fails the run.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, stats, waits
+from harness.bench_chat import READ_INTENT_JS, open_chat
+from harness.scenarios import CONFIRM_BUTTON, SEND_BUTTON, TEXTAREA
+
+REPORT_PATH = "/tmp/batch_entry_report.json"
+MODES = ("batch", "single")
+
+# (what, amount): every word is one useIntentParser knows, so parsing stays on the fast path
+ITEMS = (
+    ("groceries", 500), ("auto", 200), ("electricity", 1500), ("coffee", 150), ("petrol", 2000),
+    ("internet", 999), ("medicines", 640), ("movie", 450), ("haircut", 300), ("books", 820),
+)
+
+
+def items_for(count):
+    return [ITEMS[i % len(ITEMS)] for i in range(count)]
+
+
+def utterances(mode, count):
+    clauses = [f"{amount} on {what}" for what, amount in items_for(count)]
+    if mode == "single":
+        return [f"Spent {clause}" for clause in clauses]
+    if count == 1:
+        return [f"Spent {clauses[0]}"]
+    return [f"Spent {', '.join(clauses[:-1])} and {clauses[-1]}"]
+
+
+def send_and_confirm(page, text):
+    """One utterance through to its "saved" bubble; returns the intent path."""
+    baseline = waits.count_assistant_bubbles(page)
+    page.locator(TEXTAREA).first.fill(text)
+    page.locator(SEND_BUTTON).first.click()
+    waits.assistant_bubble_appended(page, baseline)
+    intent = page.evaluate(READ_INTENT_JS)
+
+    baseline = waits.count_assistant_bubbles(page)
+    page.locator(CONFIRM_BUTTON).first.click()
+    waits.assistant_bubble_appended(page, baseline)
+    return intent["path"] if intent else None
+
+
+def run_mode(browser, site, mode, count):
+    context = browser.new_context(viewport={"width": 1280, "height": 800})
+    site.install(context)
+    page = context.new_page()
+    posts = []
+
+    def log_request(request):
+        match = local_mode.SUPABASE_ROUTE.search(request.url)
+        if match and request.method == "POST" and not match.group(1).startswith("rpc/"):
+            posts.append(match.group(1))
+
+    page.on("request", log_request)
+    try:
+        open_chat(page, site)
+        before = len(site.backend.tables["expenses"])
+        posts.clear()
+
+        started = time.perf_counter()
+        paths = [send_and_confirm(page, text) for text in utterances(mode, count)]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # Saved bubbles are optimistic (useOutbox); the rows reach the stub after
+        waits.outbox_drained(page, timeout_ms=60000)
+        synced_ms = (time.perf_counter() - started) * 1000
+    finally:
+        context.close()
+
+    return {
+        "mode": mode,
+        "entries": count,
+        "total_ms": round(elapsed_ms, 1),
+        "per_entry_ms": round(elapsed_ms / count, 1),
+        "synced_ms": round(synced_ms, 1),
+        "posts": len(posts),
+        "saved": len(site.backend.tables["expenses"]) - before,
+        "intent_paths": paths,
+    }
+
+
+def build_report(results):
+    report = {"entries": {}}
+    for count, samples in results.items():
+        summary = {mode: stats.summarize([s["total_ms"] for s in samples if s["mode"] == mode]) for mode in MODES}
+        batch_p50 = summary["batch"].get("p50")
+        single_p50 = summary["single"].get("p50")
+        report["entries"][count] = {
+            "samples": samples,
+            "summary": summary,
+            "posts": {mode: max(s["posts"] for s in samples if s["mode"] == mode) for mode in MODES},
+            "speedup": round(single_p50 / batch_p50, 2) if batch_p50 and single_p50 else None,
+            "missing": sorted({s["mode"] for s in samples if s["saved"] != count}),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", default="2,5,10", help="comma-separated entry counts")
+    parser.add_argument("--iterations", type=int, default=3, help="runs per mode and count")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the benchmark counts the rows it saved in the stub: run with --local")
+
+    counts = [int(count) for count in args.entries.split(",") if count.strip()]
+    results = {}
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for count in counts:
+                results[count] = []
+                for i in range(args.iterations):
+                    for mode in MODES:
+                        sample = run_mode(browser, site, mode, count)
+                        results[count].append(sample)
+                        print(f"   [{i + 1}/{args.iterations}] {count:>3} entries {mode:>6}: {sample['total_ms']:>8.1f} ms"
+                              f"  {sample['posts']} POSTs  {sample['saved']} saved")
+        finally:
+            browser.close()
+
+    report = build_report(results)
+    print("\n🧾 Saving N expenses from chat (p50 ms, send to last saved bubble):")
+    print(f"   {'entries':>7}  {'batch':>9}  {'single':>9}  {'speedup':>7}  {'POSTs':>9}")
+    exit_code = 0
+    for count, entry in report["entries"].items():
+        summary = entry["summary"]
+        speedup = f"{entry['speedup']:.2f}x" if entry["speedup"] else "-"
+        posts = f"{entry['posts']['batch']} / {entry['posts']['single']}"
+        print(f"   {count:>7}  {summary['batch'].get('p50', 0):>9.1f}  {summary['single'].get('p50', 0):>9.1f}"
+              f"  {speedup:>7}  {posts:>9}")
+        if entry["missing"]:
+            exit_code = 1
+            print(f"   ❌ {', '.join(entry['missing'])} did not save {count} rows")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
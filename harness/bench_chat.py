@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Chat round-trip latency benchmark.
+
+    python -m harness.bench_chat --local --iterations 5
+    python -m harness.bench_chat --local --update-baseline
+
+Sends every utterance in the corpus through ChatWindow's textarea and send
+button and measures time-to-assistant-bubble, split into parse, fetch and
+render using the performance.mark() hooks around useChatbot.sendMessage
+(chat:parse / chat:fetch / chat:render / chat:total measures). Reports
+p50/p95/p99 as JSON and exits non-zero when a percentile regresses past
+--threshold against the stored baseline.
+
+useGemini's local fast-path parser reports which path each utterance took
+through window.__fiDebug.intent; the report's "fast_path" section gives the
+hit rate, how many hits matched the corpus "expected" fields, and the parse
+time saved against Gemini (measured Gemini parses in this run, or the
+baseline's parse p50 when every utterance hit the fast path).
+
+Conversational replies stream in: for those the report's "streaming" section
+puts time-to-first-token (chat:ttft, first streamed bubble rendered) next to
+time-to-complete. With --local the streams go to the stub server directly
+(local_mode's init script), so its chunks reach the page as they are sent;
+through page.route() the whole reply would arrive at once.
+
+Supabase REST calls are counted per utterance (from send to processing
+done) and summarized under "supabase"; the baseline keeps the same numbers
+so a run against a new build shows requests per chat query before/after.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, stats, waits
+from harness.scenarios import TEXTAREA, SEND_BUTTON, TOGGLE_BUTTON
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, "corpus", "chat_utterances.json")
+BASELINE_PATH = os.path.join(HERE, "baselines", "chat_latency.json")
+REPORT_PATH = "/tmp/chat_latency_report.json"
+
+SEGMENTS = ("total", "parse", "fetch", "render", "ttft")
+
+READ_MEASURES_JS = """() => {
+    const last = name => {
+        const entries = performance.getEntriesByName(`chat:${name}`, 'measure')
+        return entries.length ? entries[entries.length - 1].duration : null
+    }
+    return {
+        total: last('total'), parse: last('parse'), fetch: last('fetch'),
+        render: last('render'), ttft: last('ttft'),
+    }
+}"""
+
+CLEAR_MEASURES_JS = """() => {
+    performance.clearMarks()
+    performance.clearMeasures()
+    if (window.__fiDebug && window.__fiDebug.intent) window.__fiDebug.intent.last = null
+}"""
+
+READ_INTENT_JS = "() => window.__fiDebug && window.__fiDebug.intent ? window.__fiDebug.intent.last : null"
+READ_CACHE_STATS_JS = "() => window.__fiDebug ? window.__fiDebug.cache || null : null"
+
+
+def load_corpus(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def open_chat(page, site):
+    page.goto(site.url, wait_until="networkidle", timeout=30000)
+    waits.app_mounted(page)
+    page.locator(TOGGLE_BUTTON).click()
+    waits.chat_window_ready(page)
+
+
+def matches_expected(intent, expected):
+    if not intent or not expected:
+        return None
+    data = intent.get("intent", {}).get("data") or {}
+    for key, value in expected.items():
+        actual = intent["intent"].get("action") if key == "action" else data.get(key)
+        if actual != value:
+            return False
+    return True
+
+
+def send_and_measure(page, text, supabase_log):
+    """One round trip; returns per-segment ms (in-page measures when available)."""
+    page.evaluate(CLEAR_MEASURES_JS)
+    logged = len(supabase_log)
+    baseline = waits.count_assistant_bubbles(page)
+
+    page.locator(TEXTAREA).first.fill(text)
+    page.locator(SEND_BUTTON).first.click()
+
+    bubble = waits.assistant_bubble_appended(page, baseline)
+    done = waits.processing_done(page)
+
+    sample = page.evaluate(READ_MEASURES_JS)
+    # Builds without the marks still get an end-to-end number
+    if sample["total"] is None:
+        sample["total"] = bubble["waited_ms"]
+    sample["bubble_ms"] = bubble["waited_ms"]
+    sample["complete_ms"] = bubble["waited_ms"] + done["waited_ms"]
+    sample["intent"] = page.evaluate(READ_INTENT_JS)
+    sample["supabase_requests"] = len(supabase_log) - logged
+    sample["supabase_tables"] = dict(Counter(supabase_log[logged:]))
+    return sample
+
+
+def run(site, corpus, iterations):
+    samples = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(viewport={"width": 1280, "height": 800})
+        site.install(context)
+        page = context.new_page()
+
+        supabase_log = []
+        routed_gemini = []
+
+        def log_request(request):
+            match = local_mode.SUPABASE_ROUTE.search(request.url)
+            if match and request.method != "OPTIONS":
+                supabase_log.append(match.group(1))
+            if (site.backend and local_mode.GEMINI_ROUTE.match(request.url)
+                    and ":streamGenerateContent" in request.url):
+                routed_gemini.append(request.url)
+
+        page.on("request", log_request)
+
+        open_chat(page, site)
+        for iteration in range(iterations):
+            for utterance in corpus:
+                sample = send_and_measure(page, utterance["text"], supabase_log)
+                intent = sample.pop("intent")
+                samples.append({"text": utterance["text"], "kind": utterance["kind"],
+                                "iteration": iteration, **sample,
+                                "intent_path": intent["path"] if intent else None,
+                                "intent_match": matches_expected(intent, utterance.get("expected"))})
+
+        cache = page.evaluate(READ_CACHE_STATS_JS)
+        browser.close()
+    return samples, cache, bool(routed_gemini)
+
+
+def fast_path_report(samples, baseline):
+    routed = [s for s in samples if s["intent_path"]]
+    hits = [s for s in routed if s["intent_path"] == "fast"]
+    misses = [s for s in routed if s["intent_path"] == "gemini"]
+    if not routed:
+        return {"count": 0}
+
+    fast_parse = stats.summarize([s["parse"] for s in hits])
+    gemini_parse = stats.summarize([s["parse"] for s in misses])
+    reference = gemini_parse.get("p50")
+    if reference is None and baseline:
+        reference = baseline.get("parse", {}).get("p50")
+    saved = None
+    if reference is not None and hits:
+        saved = round(sum(max(reference - (s["parse"] or 0), 0) for s in hits), 1)
+
+    checked = [s for s in hits if s["intent_match"] is not None]
+    return {
+        "count": len(routed),
+        "hits": len(hits),
+        "cached": sum(1 for s in routed if s["intent_path"] == "cache"),
+        "hit_rate": round(len(hits) / len(routed), 3),
+        "hit_accuracy": round(sum(s["intent_match"] for s in checked) / len(checked), 3) if checked else None,
+        "mismatches": sorted({s["text"] for s in checked if not s["intent_match"]}),
+        "fallbacks": sorted({s["text"] for s in misses}),
+        "parse_fast": fast_parse,
+        "parse_gemini": gemini_parse,
+        "gemini_reference_ms": reference,
+        "saved_ms": saved,
+        "saved_ms_per_query": round(saved / len(routed), 1) if saved is not None else None,
+    }
+
+
+def streaming_report(samples):
+    streamed = [s for s in samples if s["ttft"] is not None]
+    if not streamed:
+        return {"count": 0}
+    return {
+        "count": len(streamed),
+        "ttft": stats.summarize([s["ttft"] for s in streamed]),
+        "complete": stats.summarize([s["total"] for s in streamed]),
+        "ttft_share": round(sum(s["ttft"] for s in streamed) / sum(s["total"] for s in streamed), 3),
+    }
+
+
+def supabase_report(samples):
+    kinds = sorted({s["kind"] for s in samples})
+    tables = Counter()
+    for s in samples:
+        tables.update(s["supabase_tables"])
+    return {
+        "per_query": stats.summarize([s["supabase_requests"] for s in samples]),
+        "by_kind": {kind: stats.summarize([s["supabase_requests"] for s in samples if s["kind"] == kind])
+                    for kind in kinds},
+        "by_table": dict(tables),
+    }
+
+
+def build_report(site, samples):
+    kinds = sorted({s["kind"] for s in samples})
+    return {
+        "site": site.url,
+        "samples": samples,
+        "summary": {segment: stats.summarize([s[segment] for s in samples]) for segment in SEGMENTS},
+        "by_kind": {kind: stats.summarize([s["total"] for s in samples if s["kind"] == kind])
+                    for kind in kinds},
+        "supabase": supabase_report(samples),
+        "streaming": streaming_report(samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="JSON list of {text, kind} utterances")
+    parser.add_argument("--iterations", type=int, default=3, help="passes over the corpus")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="stored summary to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="allowed slowdown per percentile, in percent (default: 20)")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run's summary as the baseline")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    baseline = stats.load_baseline(args.baseline)
+    with local_mode.open_site(args) as site:
+        print(f"🚀 Benchmarking {len(corpus)} utterances x {args.iterations} against {site.url}")
+        samples, cache, gemini_routed = run(site, corpus, args.iterations)
+        report = build_report(site, samples)
+    report["cache"] = cache
+    report["streaming"]["buffered_by_route"] = gemini_routed
+    report["fast_path"] = fast_path_report(report["samples"], baseline)
+
+    print("\n⏱️ Time to assistant bubble (ms):")
+    for segment, summary in report["summary"].items():
+        if summary["count"]:
+            print(f"   {segment:>6}: p50 {summary['p50']:>8.1f}  p95 {summary['p95']:>8.1f}  p99 {summary['p99']:>8.1f}")
+
+    streaming = report["streaming"]
+    if streaming["count"]:
+        print(f"\n🌊 Streamed replies ({streaming['count']}): first token p50 {streaming['ttft']['p50']} ms, "
+              f"complete p50 {streaming['complete']['p50']} ms")
+        if streaming["buffered_by_route"]:
+            print("   ⚠️ Gemini streams went through page.route(), which delivers them in one piece;"
+                  " first-token times equal complete times")
+
+    supabase = report["supabase"]
+    print(f"\n🗄️ Supabase requests per chat query: mean {supabase['per_query'].get('mean', 0)}"
+          f", max {supabase['per_query'].get('max', 0)}")
+    before = (baseline or {}).get("supabase_requests")
+    if before:
+        print(f"   Baseline: mean {before['mean']}, max {before['max']}")
+    for kind, summary in supabase["by_kind"].items():
+        print(f"   {kind:>8}: mean {summary['mean']}")
+
+    fast = report["fast_path"]
+    if fast["count"]:
+        print(f"\n⚡ Fast path: {fast['hits']}/{fast['count']} ({fast['hit_rate']:.0%})"
+              + (f", {fast['hit_accuracy']:.0%} matched expected" if fast["hit_accuracy"] is not None else ""))
+        if fast["saved_ms"] is not None:
+            print(f"   Saved ~{fast['saved_ms']:.0f} ms of parse time ({fast['saved_ms_per_query']:.1f} ms/query)"
+                  f" vs {fast['gemini_reference_ms']} ms Gemini p50")
+        for text in fast["mismatches"]:
+            print(f"   ⚠️ Fast path disagrees with corpus: {text}")
+    else:
+        print("\n⚠️ No window.__fiDebug intent stats (build predates the fast-path parser?)")
+    for name, counters in (cache or {}).items():
+        print(f"   {name} cache: {counters['hits']} hits / {counters['misses']} misses, "
+              f"{counters['size']} entries, {counters['evictions']} evicted")
+
+    exit_code = 0
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({**report["summary"], "supabase_requests": report["supabase"]["per_query"]}, f, indent=2)
+        print(f"\n📌 Baseline updated: {args.baseline}")
+    elif baseline is None:
+        print(f"\n⚠️ No baseline at {args.baseline} (run with --update-baseline to record one)")
+    else:
+        report["regressions"] = stats.compare(report["summary"], baseline, args.threshold)
+        if report["regressions"]:
+            exit_code = 1
+            print(f"\n❌ {len(report['regressions'])} regression(s) beyond {args.threshold}%:")
+            for r in report["regressions"]:
+                print(f"   - {r['metric']} {r['percentile']}: {r['baseline_ms']} -> {r['current_ms']} ms")
+        else:
+            print(f"\n✅ Within {args.threshold}% of baseline")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Full report saved to: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
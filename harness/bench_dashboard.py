@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Dashboard first-paint data latency: snapshot vs raw rows.
+
+    python -m harness.bench_dashboard --local
+    python -m harness.bench_dashboard --local --rows 10000,100000 --latency-ms 80
+
+Generates --rows rows across the four tables (harness/dataset.py), serves
+them from the local stub and loads "/" in a fresh context --iterations times
+per mode:
+
+    snapshot  as shipped: DashboardPage paints net_worth_snapshots and
+              dashboard_metrics first (dashboard:snapshot mark), then the
+              raw reads land (dashboard:reconciled mark)
+    raw       the snapshot tables answer with no rows, so the first figures
+              on screen are the raw ones, as before the snapshot pipeline
+
+"First data" is the dashboard:snapshot mark when there is one, otherwise
+dashboard:reconciled, in ms since navigation start. The report also carries
+the reconcile drift useSnapshot saw (window.__fiDebug.snapshot), which should
+be empty: the stub derives the snapshot the way the Postgres triggers do.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from playwright.sync_api import sync_playwright
+
+from harness import dataset, local_mode, snapshots, stats, waits
+
+REPORT_PATH = "/tmp/dashboard_snapshot_report.json"
+MODES = ("snapshot", "raw")
+SNAPSHOT_ROUTE = re.compile(r"https://[^/]+\.supabase\.co/rest/v1/(%s)\b" % "|".join(snapshots.SNAPSHOT_TABLES))
+
+READ_SNAPSHOT_STATS_JS = "() => window.__fiDebug ? window.__fiDebug.snapshot || null : null"
+
+
+def make_fixtures(rows, seed=13):
+    """default_fixtures() plus `rows` generated rows across the four tables."""
+    fixtures = local_mode.default_fixtures()
+    for table, generated in dataset.Generator(seed=seed).streams(rows).items():
+        fixtures[table].extend(generated)
+    return fixtures
+
+
+def hide_snapshots(context):
+    """The snapshot tables answer with no rows (registered last, so it wins)."""
+    def empty(route):
+        if route.request.method == "OPTIONS":
+            return route.fulfill(status=204, headers=local_mode.CORS_HEADERS)
+        route.fulfill(status=200, headers=local_mode.CORS_HEADERS, json=[])
+
+    context.route(SNAPSHOT_ROUTE, empty)
+
+
+def load_dashboard(browser, site, mode):
+    context = browser.new_context()
+    site.install(context)
+    if mode == "raw":
+        hide_snapshots(context)
+    page = context.new_page()
+    try:
+        page.goto(site.url, wait_until="commit", timeout=30000)
+        reconciled = waits.performance_mark(page, "dashboard:reconciled", timeout_ms=60000)
+        painted = page.evaluate("() => (performance.getEntriesByName('dashboard:snapshot', 'mark')[0] || {}).startTime")
+        debug = page.evaluate(READ_SNAPSHOT_STATS_JS) or {}
+    finally:
+        context.close()
+
+    return {
+        "mode": mode,
+        "snapshot_ms": round(painted, 1) if painted is not None else None,
+        "reconciled_ms": reconciled["start_ms"],
+        "first_data_ms": round(painted, 1) if painted is not None else reconciled["start_ms"],
+        "drift": debug.get("drift", []),
+    }
+
+
+def run(args, sizes):
+    results = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for rows in sizes:
+                backend = local_mode.StubBackend(fixtures=make_fixtures(rows), latency_ms=args.latency_ms)
+                backend.warm()
+                with local_mode.serve(backend, args.dist) as site:
+                    print(f"📦 {rows:,} rows ({len(backend.tables['expenses']):,} expenses, "
+                          f"{len(backend.tables['passive_income']):,} income, "
+                          f"{len(backend.tables['financial_assets']):,} assets)")
+                    samples = []
+                    for i in range(args.iterations):
+                        for mode in MODES:
+                            sample = load_dashboard(browser, site, mode)
+                            samples.append(sample)
+                            print(f"   [{i + 1}/{args.iterations}] {mode:>8}: first data {sample['first_data_ms']:>7.1f} ms"
+                                  f"  reconciled {sample['reconciled_ms']:>7.1f} ms")
+                results[rows] = samples
+        finally:
+            browser.close()
+    return results
+
+
+def build_report(results):
+    report = {"sizes": {}}
+    for rows, samples in results.items():
+        by_mode = {mode: [s for s in samples if s["mode"] == mode] for mode in MODES}
+        summary = {mode: {"first_data": stats.summarize([s["first_data_ms"] for s in group]),
+                          "reconciled": stats.summarize([s["reconciled_ms"] for s in group])}
+                   for mode, group in by_mode.items()}
+        snapshot_p50 = summary["snapshot"]["first_data"].get("p50")
+        raw_p50 = summary["raw"]["first_data"].get("p50")
+        report["sizes"][rows] = {
+            "samples": samples,
+            "summary": summary,
+            "speedup": round(raw_p50 / snapshot_p50, 2) if snapshot_p50 and raw_p50 else None,
+            "drift": sorted({name for s in by_mode["snapshot"] for name in s["drift"]}),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,50000", help="comma-separated dataset sizes (rows)")
+    parser.add_argument("--iterations", type=int, default=3, help="loads per mode and size")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the benchmark serves its own generated data: run with --local")
+
+    sizes = [int(size) for size in args.rows.split(",") if size.strip()]
+    report = build_report(run(args, sizes))
+
+    print("\n⏱️ First dashboard data (p50 ms since navigation):")
+    print(f"   {'rows':>8}  {'snapshot':>9}  {'raw':>9}  {'speedup':>7}")
+    exit_code = 0
+    for rows, size in report["sizes"].items():
+        summary = size["summary"]
+        speedup = f"{size['speedup']:.2f}x" if size["speedup"] else "-"
+        print(f"   {rows:>8,}  {summary['snapshot']['first_data'].get('p50', 0):>9.1f}"
+              f"  {summary['raw']['first_data'].get('p50', 0):>9.1f}  {speedup:>7}")
+        if size["drift"]:
+            exit_code = 1
+            print(f"   ❌ Snapshot disagreed with raw rows at {rows:,}: {', '.join(size['drift'])}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
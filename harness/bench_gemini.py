@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Gemini request scheduler under load: dedupe, supersession, concurrency, 429s.
+
+    python -m harness.bench_gemini --local
+    python -m harness.bench_gemini --local --bursts 20 --gemini-429-rate 0.4 --gemini-latency-ms 600
+
+Each burst types --burst-size chat messages into ChatWindow back to back,
+without waiting for replies, the way fast typing or quick-suggestion taps
+do; every --repeat-every-th message repeats the one before it. The messages
+miss the fast-path parser, so each one is a Gemini parse followed by a
+streamed reply. The stub answers 429 to --gemini-429-rate of Gemini calls
+(and to calls beyond --gemini-max-concurrent in flight, if set).
+
+useGeminiQueue should leave exactly one reply per burst, for the last
+message, and keep the page at --max-concurrent Gemini requests at a time.
+In flight is counted from Playwright's request events, so aborted requests
+stop counting when the page drops them; the stub's own count would keep them
+until their injected latency ran out. Per burst the report has the Gemini
+requests sent, the queue's deduped / superseded / retried / failed counts
+(window.__fiDebug.gemini), the 429s the stub sent and the replies that
+appeared. Exits non-zero when the page ran more requests at once than
+allowed, a burst got other than one reply, a 429 reached the chat as a raw
+error, or a 429 was never retried.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, stats, waits
+from harness.bench_chat import CORPUS_PATH, load_corpus, open_chat
+from harness.scenarios import TEXTAREA
+
+REPORT_PATH = "/tmp/gemini_queue_report.json"
+COUNTERS = ("requests", "deduped", "superseded", "retries", "rateLimited", "failed")
+
+READ_QUEUE_JS = "() => window.__fiDebug ? window.__fiDebug.gemini || null : null"
+READ_REPLIES_JS = """(selector) => [...document.querySelectorAll(selector)].map(el => el.innerText)"""
+LAST_IS_REPLY_JS = """(selector) => {
+    const last = document.querySelector(selector).lastElementChild
+    return !!last && last.matches('.justify-start')
+}"""
+
+BUSY_REPLY = "Gemini is busy right now"
+ERROR_REPLY = "Sorry, I encountered an error"
+RAW_ERRORS = ("[GoogleGenerativeAI Error]", "429", "RESOURCE_EXHAUSTED")
+
+
+def burst_messages(texts, burst, size, repeat_every):
+    """`size` messages, numbered so neither cache serves them; some repeat the one before."""
+    messages = []
+    for i in range(size):
+        if repeat_every and i and i % repeat_every == 0:
+            messages.append(messages[-1])
+        else:
+            messages.append(f"{texts[(burst + i) % len(texts)]} #{burst + 1}.{i + 1}")
+    return messages
+
+
+class GeminiTraffic:
+    """Gemini requests the page has in flight, from Playwright's request events."""
+
+    def __init__(self, page):
+        self.in_flight = set()
+        self.sent = 0
+        self.peak = 0
+        page.on("request", self._started)
+        page.on("requestfinished", self._ended)
+        page.on("requestfailed", self._ended)
+
+    def _started(self, request):
+        if local_mode.GEMINI_ROUTE.match(request.url) and request.method == "POST":
+            self.in_flight.add(request)
+            self.sent += 1
+            self.peak = max(self.peak, len(self.in_flight))
+
+    def _ended(self, request):
+        self.in_flight.discard(request)
+
+    def reset_peak(self):
+        self.peak = len(self.in_flight)
+
+
+def run_burst(page, traffic, backend, messages, timeout_ms):
+    before = page.evaluate(READ_QUEUE_JS) or {}
+    replies_before = waits.count_assistant_bubbles(page)
+    sent_before = traffic.sent
+    limited_before = backend.gemini_rate_limited
+    traffic.reset_peak()
+
+    textarea = page.locator(TEXTAREA).first
+    started = time.perf_counter()
+    for text in messages:
+        textarea.fill(text)
+        textarea.press("Enter")
+    typed_ms = (time.perf_counter() - started) * 1000
+
+    waits.gemini_idle(page, timeout_ms=timeout_ms)
+    waits.processing_done(page, timeout_ms=timeout_ms)
+    settled_ms = (time.perf_counter() - started) * 1000
+
+    after = page.evaluate(READ_QUEUE_JS) or {}
+    # ChatWindow renders only the latest messages: the new replies are its last bubbles
+    count = waits.count_assistant_bubbles(page) - replies_before
+    replies = page.evaluate(READ_REPLIES_JS, waits.ASSISTANT_BUBBLE)[-count:] if count else []
+    return {
+        "messages": len(messages),
+        "distinct": len(set(messages)),
+        "typed_ms": round(typed_ms, 1),
+        "settled_ms": round(settled_ms, 1),
+        "gemini_requests": traffic.sent - sent_before,
+        "peak_in_flight": traffic.peak,
+        "stub_429s": backend.gemini_rate_limited - limited_before,
+        **{counter: after.get(counter, 0) - before.get(counter, 0) for counter in COUNTERS},
+        "replies": count,
+        "last_is_reply": page.evaluate(LAST_IS_REPLY_JS, waits.MESSAGES),
+        "busy_replies": sum(BUSY_REPLY in reply for reply in replies),
+        "error_replies": sum(ERROR_REPLY in reply for reply in replies),
+        "raw_errors": sum(any(marker in reply for marker in RAW_ERRORS) for reply in replies),
+    }
+
+
+def problems(result, args):
+    found = []
+    if result["peak_in_flight"] > args.max_concurrent:
+        found.append(f"{result['peak_in_flight']} Gemini requests in flight (max {args.max_concurrent})")
+    if result["replies"] != 1 or not result["last_is_reply"]:
+        found.append(f"{result['replies']} replies to {result['messages']} messages, expected one to the last")
+    if result["raw_errors"]:
+        found.append(f"{result['raw_errors']} raw Gemini errors shown in the chat")
+    if result["stub_429s"] and not result["retries"]:
+        found.append(f"{result['stub_429s']} 429s from the stub and no retries")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, default=10, help="bursts of messages to send")
+    parser.add_argument("--burst-size", type=int, default=6, help="messages per burst")
+    parser.add_argument("--repeat-every", type=int, default=3,
+                        help="every Nth message repeats the previous one (0: never)")
+    parser.add_argument("--max-concurrent", type=int, default=2,
+                        help="Gemini requests the page may have in flight (useGeminiQueue's MAX_CONCURRENT)")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the stub's 429s")
+    parser.add_argument("--timeout-ms", type=int, default=60000, help="how long one burst may take to settle")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="chat corpus; its 'chat' utterances are sent")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    # Slow enough for messages to overlap, flaky enough to need retries
+    parser.set_defaults(gemini_latency_ms=300, gemini_429_rate=0.2)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the stress test needs the stub's injected 429s: run with --local")
+
+    texts = [u["text"] for u in load_corpus(args.corpus) if u["kind"] == "chat"]
+    backend = local_mode.StubBackend(latency_ms=args.latency_ms, gemini_latency_ms=args.gemini_latency_ms,
+                                     stream_chunk_ms=args.stream_chunk_ms, gemini_429_rate=args.gemini_429_rate,
+                                     gemini_max_concurrent=args.gemini_max_concurrent, seed=args.seed)
+
+    results = []
+    with local_mode.open_site(args, backend=backend) as site, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(viewport={"width": 1280, "height": 800})
+        site.install(context)
+        try:
+            page = context.new_page()
+            traffic = GeminiTraffic(page)
+            open_chat(page, site)
+            for burst in range(args.bursts):
+                messages = burst_messages(texts, burst, args.burst_size, args.repeat_every)
+                result = run_burst(page, traffic, backend, messages, args.timeout_ms)
+                results.append(result)
+                print(f"   [{burst + 1}/{args.bursts}] {result['gemini_requests']} requests,"
+                      f" {result['superseded']} superseded, {result['stub_429s']} 429s,"
+                      f" {result['retries']} retries, settled in {result['settled_ms']:.0f} ms")
+            queue = page.evaluate(READ_QUEUE_JS) or {}
+        finally:
+            browser.close()
+
+    totals = {key: sum(r[key] for r in results) for key in
+              ("messages", "gemini_requests", "stub_429s", *COUNTERS, "busy_replies", "error_replies")}
+    report = {
+        "bursts": args.bursts,
+        "burst_size": args.burst_size,
+        "gemini_429_rate": args.gemini_429_rate,
+        "gemini_latency_ms": args.gemini_latency_ms,
+        "totals": totals,
+        "requests_per_message": round(totals["gemini_requests"] / totals["messages"], 2) if totals["messages"] else None,
+        "peak_in_flight": max((r["peak_in_flight"] for r in results), default=0),
+        "peak_queued": queue.get("peakQueued"),
+        "queue_wait_ms": stats.summarize(queue.get("waitMs", [])),
+        "settled_ms": stats.summarize([r["settled_ms"] for r in results]),
+        "results": results,
+    }
+
+    print(f"\n🚦 Gemini queue, {args.bursts} bursts of {args.burst_size} messages"
+          f" ({args.gemini_429_rate:.0%} 429s, {args.gemini_latency_ms:.0f} ms latency):")
+    print(f"   requests per message {report['requests_per_message']},"
+          f" peak in flight {report['peak_in_flight']}, peak queued {report['peak_queued']}")
+    print(f"   deduped {totals['deduped']}, superseded {totals['superseded']},"
+          f" 429s {totals['stub_429s']} -> retries {totals['retries']}, failed {totals['failed']}"
+          f" ({totals['busy_replies']} busy replies)")
+    print(f"   queue wait p95 {report['queue_wait_ms'].get('p95', 0):.0f} ms,"
+          f" burst settled p95 {report['settled_ms'].get('p95', 0):.0f} ms")
+
+    exit_code = 0
+    for i, result in enumerate(results):
+        result["problems"] = problems(result, args)
+        for problem in result["problems"]:
+            exit_code = 1
+            print(f"   ❌ burst {i + 1}: {problem}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
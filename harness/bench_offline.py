@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Cold, repeat, warm and offline loads of the dashboard with the service worker.
+
+    python -m harness.bench_offline --local
+    python -m harness.bench_offline --local --iterations 5 --latency-ms 150
+
+Each iteration is a fresh browser context (no service worker, empty caches)
+loading "/" four times:
+
+    cold     first visit: everything from the network; dist/sw.js installs
+             and precaches the build once the page has loaded
+    repeat   the worker now controls the page: shell and hashed assets come
+             from the precache, Supabase reads still from the network (and
+             into the worker's API cache)
+    warm     the snapshot tables are answered from that cache
+             (stale-while-revalidate), so the figures paint without a
+             Supabase round trip
+    offline  context.set_offline(True), and every request that still reaches
+             Playwright aborted: the app shell, assets and last-known
+             dashboard data must all come from the worker
+
+Per load the report has first contentful paint, first dashboard data (the
+dashboard:snapshot mark, or dashboard:reconciled), reconciled, and how
+many responses came from the network vs the service worker. Supabase
+requests the worker makes are routed to the stub like the page's own
+(context.route() sees them). Exits non-zero when the offline load never
+showed dashboard data, or when a controlled load fetched a precached asset
+from the network.
+
+Needs a dist/ built with `npm run build`: scripts/post-build.js writes sw.js.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, stats, waits
+
+REPORT_PATH = "/tmp/offline_load_report.json"
+MODES = ("cold", "repeat", "warm", "offline")
+METRICS = ("fcp_ms", "first_data_ms", "reconciled_ms")
+
+# Matches scripts/service-worker.js: one API cache per build, fi-api-<VERSION>
+API_CACHE_PREFIX = "fi-api-"
+SNAPSHOT_TABLES = ("net_worth_snapshots", "dashboard_metrics")
+
+SW_READY_JS = """(timeoutMs) => Promise.race([
+    navigator.serviceWorker.ready.then(registration => registration.active.state),
+    new Promise((_, reject) => setTimeout(() => reject(new Error('no service worker became active')), timeoutMs)),
+])"""
+API_CACHED_JS = """async (tables) => {
+    const names = (await caches.keys()).filter(name => name.startsWith('%s'))
+    const urls = []
+    for (const name of names) {
+        const cache = await caches.open(name)
+        urls.push(...(await cache.keys()).map(request => request.url))
+    }
+    return tables.every(table => urls.some(url => url.includes('/rest/v1/' + table)))
+}""" % API_CACHE_PREFIX
+READ_PAINT_JS = """() => {
+    const mark = name => (performance.getEntriesByName(name, 'mark')[0] || {}).startTime
+    const fcp = performance.getEntriesByName('first-contentful-paint', 'paint')[0]
+    return {
+        fcp_ms: fcp ? fcp.startTime : null,
+        snapshot_ms: mark('dashboard:snapshot') ?? null,
+        controlled: !!navigator.serviceWorker && !!navigator.serviceWorker.controller,
+    }
+}"""
+
+
+def go_offline(context):
+    """Offline for the page, and nothing the worker fetches gets an answer either."""
+    context.set_offline(True)
+    # Registered last, so it wins over site.install()'s routes
+    context.route("**/*", lambda route: route.abort("internetdisconnected"))
+
+
+def load(page, site, mode, responses, timeout_ms):
+    before = len(responses)
+    page.goto(site.url, wait_until="commit", timeout=timeout_ms)
+    try:
+        reconciled = waits.performance_mark(page, "dashboard:reconciled", timeout_ms=timeout_ms)["start_ms"]
+    except Exception:
+        reconciled = None
+    paint = page.evaluate(READ_PAINT_JS)
+    seen = responses[before:]
+    first_data = paint["snapshot_ms"] if paint["snapshot_ms"] is not None else reconciled
+    return {
+        "mode": mode,
+        "controlled": paint["controlled"],
+        "fcp_ms": round(paint["fcp_ms"], 1) if paint["fcp_ms"] is not None else None,
+        "first_data_ms": round(first_data, 1) if first_data is not None else None,
+        "reconciled_ms": reconciled,
+        "network": sum(1 for r in seen if not r["from_sw"]),
+        "from_service_worker": sum(1 for r in seen if r["from_sw"]),
+        "assets_from_network": sorted({r["url"] for r in seen if "/assets/" in r["url"] and not r["from_sw"]}),
+    }
+
+
+def run_iteration(browser, site, args):
+    context = browser.new_context(viewport={"width": 1280, "height": 800})
+    site.install(context)
+    responses = []
+    samples = []
+    try:
+        page = context.new_page()
+        page.on("response", lambda response: responses.append(
+            {"url": response.url, "from_sw": response.from_service_worker}))
+
+        samples.append(load(page, site, "cold", responses, args.timeout_ms))
+        page.evaluate(SW_READY_JS, args.timeout_ms)
+
+        samples.append(load(page, site, "repeat", responses, args.timeout_ms))
+        # The worker files the repeat load's answers in the background
+        page.wait_for_function(API_CACHED_JS, arg=list(SNAPSHOT_TABLES), polling=100, timeout=args.timeout_ms)
+
+        samples.append(load(page, site, "warm", responses, args.timeout_ms))
+
+        go_offline(context)
+        samples.append(load(page, site, "offline", responses, args.timeout_ms))
+    finally:
+        context.close()
+    return samples
+
+
+def problems(samples):
+    found = []
+    for sample in samples:
+        if sample["mode"] == "offline" and sample["first_data_ms"] is None:
+            found.append("offline load never showed dashboard data")
+        if sample["mode"] != "cold" and not sample["controlled"]:
+            found.append(f"{sample['mode']} load was not controlled by the service worker")
+        for url in sample["assets_from_network"] if sample["mode"] != "cold" else ():
+            found.append(f"{sample['mode']} load fetched precached {url} from the network")
+    return sorted(set(found))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=3, help="fresh contexts, each loading cold -> offline")
+    parser.add_argument("--timeout-ms", type=int, default=30000, help="how long one load may take")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    # A round trip for the cache to save
+    parser.set_defaults(latency_ms=80)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("offline loads need the stub behind Playwright's routes: run with --local")
+    if not os.path.exists(os.path.join(args.dist, "sw.js")):
+        parser.error(f"{args.dist}/sw.js not found - run `npm run build` (scripts/post-build.js writes it)")
+
+    samples = []
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for i in range(args.iterations):
+                for sample in run_iteration(browser, site, args):
+                    samples.append(sample)
+                    first = sample["first_data_ms"]
+                    print(f"   [{i + 1}/{args.iterations}] {sample['mode']:>7}: first data"
+                          f" {f'{first:.0f} ms' if first is not None else '-':>8}, {sample['network']} from the network,"
+                          f" {sample['from_service_worker']} from the service worker")
+        finally:
+            browser.close()
+
+    report = {
+        "latency_ms": args.latency_ms,
+        "modes": {mode: {metric: stats.summarize([s[metric] for s in samples if s["mode"] == mode])
+                         for metric in METRICS} for mode in MODES},
+        "samples": samples,
+    }
+    cold = report["modes"]["cold"]["first_data_ms"].get("p50")
+    warm = report["modes"]["warm"]["first_data_ms"].get("p50")
+    if cold and warm:
+        report["warm_speedup"] = round(cold / warm, 2)
+
+    print(f"\n📶 Dashboard loads, {args.iterations} contexts ({args.latency_ms:.0f} ms stub latency), p50 ms:")
+    print(f"   {'load':>7}  {'FCP':>7}  {'first data':>10}  {'reconciled':>10}")
+    for mode, summary in report["modes"].items():
+        print(f"   {mode:>7}  {summary['fcp_ms'].get('p50', 0):>7.1f}  {summary['first_data_ms'].get('p50', 0):>10.1f}"
+              f"  {summary['reconciled_ms'].get('p50', 0):>10.1f}")
+    if "warm_speedup" in report:
+        print(f"   warm first data {report['warm_speedup']:.2f}x faster than cold")
+
+    report["problems"] = problems(samples)
+    for problem in report["problems"]:
+        print(f"   ❌ {problem}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return 1 if report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Offline outbox check: optimistic saves, batched sync, no lost or doubled rows.
+
+    python -m harness.bench_outbox --local
+    python -m harness.bench_outbox --local --entries 10 --scenarios offline,slow-3g
+
+Each scenario saves --entries expenses through the chat widget ("Spent 500
+on groceries" + Yes, Save) in a fresh context, then waits for useOutbox to
+drain (the outbox:drained mark) and checks the stub:
+
+    online, fast-3g,  the page throttled over CDP (harness/network.py), the
+    slow-3g           stub answering with the profile's round trip
+    offline           context.set_offline(True) while saving, so every write
+                      queues; back online, they go out together
+    offline-reload    saved offline, then the page is closed and a new one
+                      opened online: the writes come back from IndexedDB
+    lost-response     the first POST reaches the stub but the page never gets
+                      the answer; the retry must not insert the rows twice
+
+Per scenario the report has the confirm -> "saved" bubble time per entry
+(which should not depend on the network at all), queued -> acknowledged time
+per write (window.__fiDebug.outbox.syncMs), POSTs, retries and the rows the
+stub ended up with. Exits non-zero when a scenario saved a different number
+of rows than it entered, saved one twice, left writes queued, or took more
+than --max-confirm-ms to show a saved bubble.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, network, stats, waits
+from harness.bench_batch import items_for
+from harness.bench_chat import open_chat
+from harness.scenarios import CONFIRM_BUTTON, SEND_BUTTON, TEXTAREA
+
+REPORT_PATH = "/tmp/outbox_report.json"
+SCENARIOS = ("online", "fast-3g", "slow-3g", "offline", "offline-reload", "lost-response")
+EXPENSES_ROUTE = re.compile(r"https://[^/]+\.supabase\.co/rest/v1/expenses\b")
+
+READ_OUTBOX_JS = "() => window.__fiDebug ? window.__fiDebug.outbox || null : null"
+
+
+def record_entries(page, count):
+    """Save `count` expenses through the chat; ms from Yes, Save to the saved bubble, per entry."""
+    confirm_ms = []
+    for what, amount in items_for(count):
+        baseline = waits.count_assistant_bubbles(page)
+        page.locator(TEXTAREA).first.fill(f"Spent {amount} on {what}")
+        page.locator(SEND_BUTTON).first.click()
+        waits.assistant_bubble_appended(page, baseline)
+
+        baseline = waits.count_assistant_bubbles(page)
+        started = time.perf_counter()
+        page.locator(CONFIRM_BUTTON).first.click()
+        waits.assistant_bubble_appended(page, baseline)
+        confirm_ms.append(round((time.perf_counter() - started) * 1000, 1))
+    return confirm_ms
+
+
+def lose_first_response(site, context):
+    """The first expenses POST is stored by the stub, then aborted towards the page."""
+    lost = []
+
+    def handler(route):
+        if route.request.method == "POST" and not lost:
+            site.fetch(route)
+            lost.append(route.request.url)
+            return route.abort("failed")
+        route.fallback()
+
+    # Registered after site.install(), so it sees the request first
+    context.route(EXPENSES_ROUTE, handler)
+    return lost
+
+
+def run_scenario(browser, site, scenario, args):
+    backend = site.backend
+    context = browser.new_context(viewport={"width": 1280, "height": 800})
+    site.install(context)
+    posts = []
+
+    def log_request(request):
+        if EXPENSES_ROUTE.search(request.url) and request.method == "POST":
+            posts.append(request.url)
+
+    context.on("request", log_request)
+    stub_latency = backend.latency_ms
+    before = len(backend.tables["expenses"])
+    try:
+        page = context.new_page()
+        open_chat(page, site)
+
+        lost = []
+        if scenario in network.PROFILES:
+            network.emulate(context.new_cdp_session(page), scenario)
+            backend.latency_ms = network.stub_latency_ms(scenario)
+        elif scenario in ("offline", "offline-reload"):
+            context.set_offline(True)
+        elif scenario == "lost-response":
+            lost = lose_first_response(site, context)
+
+        confirm_ms = record_entries(page, args.entries)
+        saved_while_offline = len(backend.tables["expenses"]) - before
+
+        if scenario == "offline-reload":
+            # Whatever the old page had queued only survives in IndexedDB
+            page.close()
+            context.set_offline(False)
+            page = context.new_page()
+            page.goto(site.url, wait_until="domcontentloaded", timeout=30000)
+            # A fresh page has no earlier mark, but reports pending 0 until IndexedDB is read
+            drain_ms = waits.performance_mark(page, "outbox:drained", timeout_ms=args.drain_timeout_ms)["waited_ms"]
+        else:
+            if scenario == "offline":
+                context.set_offline(False)
+            drain_ms = waits.outbox_drained(page, timeout_ms=args.drain_timeout_ms)["waited_ms"]
+        outbox = page.evaluate(READ_OUTBOX_JS) or {}
+    finally:
+        backend.latency_ms = stub_latency
+        context.close()
+
+    new_rows = backend.tables["expenses"][before:]
+    client_ids = Counter(row.get("client_id") for row in new_rows)
+    return {
+        "scenario": scenario,
+        "entries": args.entries,
+        "confirm_ms": stats.summarize(confirm_ms),
+        "drain_ms": drain_ms,
+        "sync_ms": stats.summarize(outbox.get("syncMs", [])),
+        "posts": len(posts),
+        "batches": outbox.get("batches"),
+        "retries": outbox.get("retries"),
+        "rejected": outbox.get("rejected"),
+        "pending": outbox.get("pending"),
+        "lost_responses": len(lost),
+        "saved": len(new_rows),
+        "saved_while_offline": saved_while_offline if scenario.startswith("offline") else None,
+        "duplicates": sum(n - 1 for client_id, n in client_ids.items() if client_id and n > 1),
+        "without_client_id": client_ids.get(None, 0),
+    }
+
+
+def problems(result, args):
+    found = []
+    if result["saved"] != result["entries"]:
+        found.append(f"{result['saved']} rows saved for {result['entries']} entries")
+    if result["duplicates"]:
+        found.append(f"{result['duplicates']} rows saved twice")
+    if result["without_client_id"]:
+        found.append(f"{result['without_client_id']} rows without a client_id")
+    if result["pending"]:
+        found.append(f"{result['pending']} writes still queued")
+    if result["saved_while_offline"]:
+        found.append(f"{result['saved_while_offline']} rows reached the stub while offline")
+    if result["confirm_ms"].get("p95", 0) > args.max_confirm_ms:
+        found.append(f"saved bubble p95 {result['confirm_ms']['p95']} ms (max {args.max_confirm_ms})")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--entries", type=int, default=5, help="expenses saved per scenario")
+    parser.add_argument("--max-confirm-ms", type=float, default=500,
+                        help="fail when Yes, Save -> saved bubble p95 exceeds this (default: 500)")
+    parser.add_argument("--drain-timeout-ms", type=int, default=60000, help="how long to wait for the outbox to drain")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the check counts the rows the stub received: run with --local")
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    results = []
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for scenario in scenarios:
+                result = run_scenario(browser, site, scenario, args)
+                results.append(result)
+                print(f"   {scenario:>14}: saved bubble p50 {result['confirm_ms'].get('p50', 0):.0f} ms,"
+                      f" drained in {result['drain_ms']:.0f} ms, {result['posts']} POSTs, {result['saved']} rows")
+        finally:
+            browser.close()
+
+    print(f"\n📮 Outbox, {args.entries} expenses per scenario:")
+    print(f"   {'scenario':>14}  {'saved p95':>9}  {'sync p50':>8}  {'POSTs':>5}  {'retries':>7}  {'rows':>4}  {'dupes':>5}")
+    exit_code = 0
+    for result in results:
+        print(f"   {result['scenario']:>14}  {result['confirm_ms'].get('p95', 0):>9.1f}"
+              f"  {result['sync_ms'].get('p50', 0):>8.1f}  {result['posts']:>5}  {result['retries'] or 0:>7}"
+              f"  {result['saved']:>4}  {result['duplicates']:>5}")
+        result["problems"] = problems(result, args)
+        for problem in result["problems"]:
+            exit_code = 1
+            print(f"   ❌ {result['scenario']}: {problem}")
+
+    with open(args.output, "w") as f:
+        json.dump({"entries": args.entries, "scenarios": results}, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Dashboard load and chat reply across device, network and CPU profiles.
+
+    python -m harness.bench_profiles --local
+    python -m harness.bench_profiles --local --devices android-mid --networks 4g,slow-3g --cpu 4,6 --iterations 3
+
+Every combination of --devices x --networks x --cpu is a profile. Each
+iteration loads "/" in a fresh context emulating the device, with the
+network throttled over CDP (harness/network.py, the stub answering with the
+profile's round trip) and the main thread slowed with
+Emulation.setCPUThrottlingRate, then opens the chat widget and sends one
+message:
+
+    desktop            1280x800, the Mac user agent the other scripts use
+    android-mid        a mid-range Android phone: 412x915 at 2.625x, touch,
+                       Chrome for Android's user agent; BottomNav layout
+
+    online, 4g,        Chrome DevTools' presets ("online" is unthrottled)
+    fast-3g, slow-3g
+    offline-then-online
+                       loaded on 4g; the chat message is sent offline
+                       and the network comes back --offline-ms later
+
+Per profile the report has first dashboard data (the dashboard:snapshot mark,
+or dashboard:reconciled), reconciled, main-thread script time from
+Performance.getMetrics (where a big bundle's parse and heavy computeds
+show), widget open and send -> reply. The table compares every profile's
+p50 against the first one. With a --baseline recorded (--update-baseline),
+exits non-zero when a profile regressed beyond --threshold, so a change that
+only hurts low-end phones fails here even when desktop runs stay flat.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, network, stats, waits
+from harness.scenarios import SEND_BUTTON, TEST_MESSAGE, TEXTAREA, TOGGLE_BUTTON
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "baselines", "profiles.json")
+REPORT_PATH = "/tmp/profile_matrix_report.json"
+
+DEVICES = {
+    "desktop": {
+        "viewport": {"width": 1280, "height": 800},
+        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    },
+    "android-mid": {
+        "viewport": {"width": 412, "height": 915},
+        "device_scale_factor": 2.625,
+        "is_mobile": True,
+        "has_touch": True,
+        "user_agent": "Mozilla/5.0 (Linux; Android 13; SM-A546E) AppleWebKit/537.36"
+                      " (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
+    },
+}
+OFFLINE_THEN_ONLINE = "offline-then-online"
+NETWORKS = (*network.PROFILES, OFFLINE_THEN_ONLINE)
+CPU_RATES = (1, 4, 6)
+METRICS = ("first_data_ms", "reconciled_ms", "script_ms", "chat_open_ms", "reply_ms")
+
+READ_FIRST_DATA_JS = "() => (performance.getEntriesByName('dashboard:snapshot', 'mark')[0] || {}).startTime"
+READ_LAST_REPLY_JS = """(selector) => {
+    const bubbles = document.querySelectorAll(selector)
+    return bubbles.length ? bubbles[bubbles.length - 1].innerText : null
+}"""
+ERROR_REPLY = "Sorry, I encountered an error"
+
+
+def profile_name(device, net, cpu):
+    return f"{device}/{net}/{cpu}x"
+
+
+def script_ms(cdp):
+    """Main-thread script time so far (Performance.getMetrics' ScriptDuration, in s)."""
+    metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    return round(metrics.get("ScriptDuration", 0) * 1000, 1)
+
+
+def send_message(page, context, cdp, offline_ms, timeout_ms):
+    """TEST_MESSAGE through the widget; with offline_ms, sent offline and back on 4g after that long."""
+    baseline = waits.count_assistant_bubbles(page)
+    page.locator(TEXTAREA).first.fill(TEST_MESSAGE)
+    if offline_ms:
+        context.set_offline(True)
+    started = time.perf_counter()
+    page.locator(SEND_BUTTON).first.click()
+    if offline_ms:
+        # The outage itself, not a readiness wait
+        page.wait_for_timeout(offline_ms)
+        context.set_offline(False)
+        # Playwright's set_offline() may reset the CDP throttling it shares
+        network.emulate(cdp, "4g")
+    waits.assistant_bubble_appended(page, baseline, timeout_ms=timeout_ms)
+    waits.processing_done(page, timeout_ms=timeout_ms)
+    reply_ms = round((time.perf_counter() - started) * 1000, 1)
+    return reply_ms, page.evaluate(READ_LAST_REPLY_JS, waits.ASSISTANT_BUBBLE)
+
+
+def run_profile(browser, site, device, net, cpu, args):
+    backend = site.backend
+    context = browser.new_context(**DEVICES[device])
+    site.install(context)
+    stub_latency = backend.latency_ms
+    throttled = "4g" if net == OFFLINE_THEN_ONLINE else net
+    try:
+        page = context.new_page()
+        cdp = context.new_cdp_session(page)
+        cdp.send("Performance.enable")
+        network.throttle_cpu(cdp, cpu)
+        network.emulate(cdp, throttled)
+        backend.latency_ms = network.stub_latency_ms(throttled)
+
+        page.goto(site.url, wait_until="commit", timeout=args.timeout_ms)
+        reconciled = waits.performance_mark(page, "dashboard:reconciled", timeout_ms=args.timeout_ms)
+        painted = page.evaluate(READ_FIRST_DATA_JS)
+        loaded_script_ms = script_ms(cdp)
+
+        started = time.perf_counter()
+        page.locator(TOGGLE_BUTTON).click()
+        waits.chat_window_ready(page, timeout_ms=args.timeout_ms)
+        chat_open_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        offline_ms = args.offline_ms if net == OFFLINE_THEN_ONLINE else 0
+        reply_ms, reply = send_message(page, context, cdp, offline_ms, args.timeout_ms)
+    finally:
+        backend.latency_ms = stub_latency
+        context.close()
+
+    return {
+        "profile": profile_name(device, net, cpu),
+        "first_data_ms": round(painted, 1) if painted is not None else reconciled["start_ms"],
+        "reconciled_ms": reconciled["start_ms"],
+        "script_ms": loaded_script_ms,
+        "chat_open_ms": chat_open_ms,
+        "reply_ms": reply_ms,
+        "reply_error": bool(reply) and ERROR_REPLY in reply,
+    }
+
+
+def build_report(profiles, samples):
+    report = {"profiles": {}}
+    reference = None
+    for name in profiles:
+        group = [s for s in samples if s["profile"] == name]
+        summary = {metric: stats.summarize([s[metric] for s in group]) for metric in METRICS}
+        reference = reference or summary
+        report["profiles"][name] = {
+            "summary": summary,
+            # p50 against the first profile, the reference for the table
+            "slowdown": {metric: round(summary[metric]["p50"] / reference[metric]["p50"], 2)
+                         if summary[metric].get("p50") and reference[metric].get("p50") else None
+                         for metric in METRICS},
+            "reply_errors": sum(s["reply_error"] for s in group),
+        }
+    report["samples"] = samples
+    return report
+
+
+def flatten(report):
+    """{"<profile> <metric>": summary}, the shape stats.compare() takes."""
+    return {f"{name} {metric}": summary
+            for name, profile in report["profiles"].items()
+            for metric, summary in profile["summary"].items()}
+
+
+def parse_list(parser, value, choices, flag):
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown:
+        parser.error(f"unknown {flag}: {', '.join(unknown)} (choose from {', '.join(choices)})")
+    return items
+
+
+def parse_rates(parser, value):
+    """--cpu: whole slowdown factors, 1 (unthrottled) or more."""
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    bad = [item for item in items if not item.isdigit() or int(item) < 1]
+    if bad:
+        parser.error(f"bad --cpu rates: {', '.join(bad)} (whole slowdown factors: 1 for unthrottled, or more)")
+    return [int(item) for item in items]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", default=",".join(DEVICES), help="comma-separated devices")
+    parser.add_argument("--networks", default=f"online,4g,slow-3g,{OFFLINE_THEN_ONLINE}",
+                        help="comma-separated network profiles")
+    parser.add_argument("--cpu", default=",".join(map(str, CPU_RATES)), help="comma-separated CPU slowdown rates (DevTools: 4x mid-range, 6x low-end)")
+    parser.add_argument("--iterations", type=int, default=1, help="loads per profile")
+    parser.add_argument("--offline-ms", type=int, default=3000, help="how long offline-then-online stays offline")
+    parser.add_argument("--timeout-ms", type=int, default=120000, help="how long one load or reply may take")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="stored summary to compare against")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="allowed slowdown per percentile, in percent (default: 25)")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run's summary as the baseline")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the stub answers with each profile's round trip: run with --local")
+
+    devices = parse_list(parser, args.devices, DEVICES, "devices")
+    networks = parse_list(parser, args.networks, NETWORKS, "networks")
+    rates = parse_rates(parser, args.cpu)
+    combos = list(itertools.product(devices, networks, rates))
+    profiles = [profile_name(*combo) for combo in combos]
+
+    samples = []
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        print(f"🚀 {len(profiles)} profiles x {args.iterations} against {site.url}")
+        browser = p.chromium.launch(headless=True)
+        try:
+            for i in range(args.iterations):
+                for combo in combos:
+                    sample = run_profile(browser, site, *combo, args)
+                    samples.append(sample)
+                    print(f"   [{i + 1}/{args.iterations}] {sample['profile']:>32}: first data"
+                          f" {sample['first_data_ms']:>8.1f} ms, reply {sample['reply_ms']:>8.1f} ms")
+        finally:
+            browser.close()
+
+    report = build_report(profiles, samples)
+
+    print(f"\n📱 Profile matrix (p50 ms; x = against {profiles[0]}):")
+    print(f"   {'profile':>32}  {'first data':>14}  {'reconciled':>10}  {'script':>8}  {'chat open':>9}  {'reply':>14}")
+    for name, profile in report["profiles"].items():
+        summary, slowdown = profile["summary"], profile["slowdown"]
+        first = f"{summary['first_data_ms'].get('p50', 0):.0f} ({slowdown['first_data_ms'] or 0:.1f}x)"
+        reply = f"{summary['reply_ms'].get('p50', 0):.0f} ({slowdown['reply_ms'] or 0:.1f}x)"
+        print(f"   {name:>32}  {first:>14}  {summary['reconciled_ms'].get('p50', 0):>10.0f}"
+              f"  {summary['script_ms'].get('p50', 0):>8.0f}  {summary['chat_open_ms'].get('p50', 0):>9.0f}"
+              f"  {reply:>14}" + (f"  ⚠️ {profile['reply_errors']} error replies" if profile["reply_errors"] else ""))
+
+    exit_code = 0
+    baseline = stats.load_baseline(args.baseline)
+    current = flatten(report)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\n📌 Baseline updated: {args.baseline}")
+    elif baseline is None:
+        print(f"\n⚠️ No baseline at {args.baseline} (run with --update-baseline to record one)")
+    else:
+        report["regressions"] = stats.compare(current, baseline, args.threshold, min_delta_ms=20.0)
+        if report["regressions"]:
+            exit_code = 1
+            print(f"\n❌ {len(report['regressions'])} regression(s) beyond {args.threshold}%:")
+            for r in report["regressions"]:
+                print(f"   - {r['metric']} {r['percentile']}: {r['baseline_ms']} -> {r['current_ms']} ms")
+        else:
+            print(f"\n✅ Within {args.threshold}% of baseline")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
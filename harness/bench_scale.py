@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Latency curves against dataset size, on the local stand-in.
+
+    python -m harness.bench_scale --local
+    python -m harness.bench_scale --local --sizes 1000,10000,100000,1000000 --latency-ms 60
+
+For each size a dataset is generated with harness/dataset.py (cached as a
+SQLite file under --data-dir, so reruns skip generation), opened as a fresh
+StubBackend's tables and served locally. Then, --iterations times:
+
+    dashboard     "/" in a fresh context: first figures on screen
+                  (dashboard:snapshot, else dashboard:reconciled) and the
+                  reconciled render, ms since navigation start
+    transactions  "/transactions" in a fresh context: first VirtualList rows
+    chat          every "query" utterance in the chat corpus through the
+                  widget: chat:total per query (see bench_chat)
+
+The report keeps p50/p95 per metric and size, plus the stub's own time per
+Supabase request ("served_ms"), so growth in the stand-in can be told apart
+from growth in the app. The stub keeps the rows in SQLite (dataset.open_sqlite)
+rather than as Python dicts, so 1M rows needs a few hundred MB, not gigabytes.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from harness import dataset, local_mode, stats
+from harness.bench_chat import CORPUS_PATH, load_corpus, open_chat, send_and_measure
+from harness.bench_dashboard import load_dashboard
+from harness.bench_transactions import FIRST_ROWS_JS, LIST
+
+REPORT_PATH = "/tmp/scale_report.json"
+DATA_DIR = "/tmp/fi-datasets"
+METRICS = ("dashboard_first", "dashboard_reconciled", "transactions_first", "chat_query")
+
+
+def load_dataset(rows, data_dir, seed):
+    """SQLite for `rows` rows, generated on first use; returns (tables, generate_s, open_s)."""
+    path = os.path.join(data_dir, f"{rows}-{seed}.db")
+    generate_s = 0.0
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        started = time.perf_counter()
+        # Renamed once complete, so an interrupted run is not cached
+        dataset.generate(rows, path + ".partial", fmt="sqlite", seed=seed)
+        os.replace(path + ".partial", path)
+        generate_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    tables = dataset.open_sqlite(path)
+    return tables, generate_s, time.perf_counter() - started
+
+
+def load_transactions(browser, site):
+    context = browser.new_context()
+    site.install(context)
+    page = context.new_page()
+    try:
+        page.goto(f"{site.url}/transactions", wait_until="commit", timeout=30000)
+        page.wait_for_selector(f"{LIST} > div > div", timeout=60000)
+        return round(page.evaluate(FIRST_ROWS_JS), 1)
+    finally:
+        context.close()
+
+
+def chat_queries(browser, site, queries):
+    context = browser.new_context(viewport={"width": 1280, "height": 800})
+    site.install(context)
+    page = context.new_page()
+    try:
+        open_chat(page, site)
+        return [send_and_measure(page, text, [])["total"] for text in queries]
+    finally:
+        context.close()
+
+
+def served_report(backend):
+    """Stub-side time per Supabase table or RPC, from the request log."""
+    by_name = {}
+    for request in backend.requests:
+        if request["kind"] == "supabase" and request["served_ms"] is not None:
+            by_name.setdefault(request["name"], []).append(request["served_ms"])
+    return {name: stats.summarize(values) for name, values in sorted(by_name.items())}
+
+
+def measure_size(browser, rows, args, queries):
+    tables, generate_s, open_s = load_dataset(rows, args.data_dir, args.seed)
+    started = time.perf_counter()
+    backend = local_mode.StubBackend(fixtures=tables, latency_ms=args.latency_ms,
+                                     gemini_latency_ms=args.gemini_latency_ms)
+    backend.warm()
+    load_s = time.perf_counter() - started
+    print(f"📦 {rows:,} rows: generated in {generate_s:.1f}s, opened in {open_s:.1f}s, stub ready in {load_s:.1f}s")
+
+    samples = {metric: [] for metric in METRICS}
+    with local_mode.serve(backend, args.dist) as site:
+        for i in range(args.iterations):
+            dashboard = load_dashboard(browser, site, "snapshot")
+            samples["dashboard_first"].append(dashboard["first_data_ms"])
+            samples["dashboard_reconciled"].append(dashboard["reconciled_ms"])
+            samples["transactions_first"].append(load_transactions(browser, site))
+            samples["chat_query"].extend(chat_queries(browser, site, queries))
+            print(f"   [{i + 1}/{args.iterations}] dashboard {dashboard['first_data_ms']:.0f} ms,"
+                  f" transactions {samples['transactions_first'][-1]:.0f} ms,"
+                  f" chat p50 {stats.percentile(samples['chat_query'], 50):.0f} ms")
+
+    return {
+        "tables": {table: len(table_rows) for table, table_rows in tables.items()},
+        "setup_s": {"generate": round(generate_s, 2), "open": round(open_s, 2), "stub": round(load_s, 2)},
+        "summary": {metric: stats.summarize(values) for metric, values in samples.items()},
+        "served_ms": served_report(backend),
+        "samples": samples,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated dataset sizes (rows)")
+    parser.add_argument("--iterations", type=int, default=3, help="passes per size")
+    parser.add_argument("--seed", type=int, default=42, help="dataset seed")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where generated datasets are cached")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="chat corpus; its 'query' utterances are sent")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the benchmark serves its own generated data: run with --local")
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    queries = [u["text"] for u in load_corpus(args.corpus) if u["kind"] == "query"]
+
+    report = {"sizes": {}}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for rows in sizes:
+                report["sizes"][rows] = measure_size(browser, rows, args, queries)
+        finally:
+            browser.close()
+
+    # One curve per metric: [(rows, p50), ...]
+    report["curves"] = {metric: [(rows, size["summary"][metric].get("p50")) for rows, size in report["sizes"].items()]
+                        for metric in METRICS}
+
+    print("\n📈 p50 ms by dataset size:")
+    print(f"   {'rows':>9}" + "".join(f"  {metric:>20}" for metric in METRICS))
+    for rows, size in report["sizes"].items():
+        print(f"   {rows:>9,}" + "".join(f"  {size['summary'][metric].get('p50', 0):>20.1f}" for metric in METRICS))
+
+    print("\n🗄️ Stub time per request (p50 ms), for telling stand-in growth from app growth:")
+    for rows, size in report["sizes"].items():
+        served = ", ".join(f"{name} {summary['p50']}" for name, summary in size["served_ms"].items())
+        print(f"   {rows:>9,}  {served}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+TransactionsPage scaling: scroll FPS and memory at 1k / 10k / 100k rows.
+
+    python -m harness.bench_transactions --local
+    python -m harness.bench_transactions --local --rows 1000,100000 --scroll-seconds 10
+
+For each size the stub is loaded with that many generated rows
+(harness/dataset.py, as in bench_dashboard), /transactions is opened in a
+fresh context and the window is scrolled --px-per-frame every animation
+frame for --scroll-seconds, so the keyset pages keep loading while the list
+scrolls. Reported per size:
+
+    first_rows_ms   navigation start -> first VirtualList rows in the DOM
+    fps / p95 frame frame rate and frame-time p95 during the scroll
+    long_frames     frames over 50 ms
+    rows_loaded     rows merged into the feed by the end of the scroll
+    rendered        row elements in the DOM at the end (should stay flat)
+    heap_mb / nodes JSHeapUsedSize and DOM node count from CDP, after a GC
+
+Exits non-zero when more than --max-rendered rows are in the DOM at once,
+i.e. the list stopped virtualizing.
+"""
+
+import argparse
+import json
+import sys
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, stats
+from harness.bench_dashboard import make_fixtures
+
+REPORT_PATH = "/tmp/transactions_scaling_report.json"
+LIST = "[data-virtual-list]"
+
+SCROLL_JS = """async ({ durationMs, pxPerFrame }) => {
+    const frames = []
+    const start = performance.now()
+    let last = start
+    while (last - start < durationMs) {
+        window.scrollBy(0, pxPerFrame)
+        await new Promise(resolve => requestAnimationFrame(resolve))
+        const now = performance.now()
+        frames.push(now - last)
+        last = now
+    }
+    const list = document.querySelector(%r)
+    return {
+        frames,
+        elapsed_ms: last - start,
+        rows_loaded: Number(list.dataset.rows),
+        rendered: list.firstElementChild.childElementCount,
+        scroll_y: window.scrollY,
+    }
+}""" % LIST
+
+FIRST_ROWS_JS = """() => {
+    const entry = performance.getEntriesByType('navigation')[0]
+    return performance.now() - (entry ? entry.startTime : 0)
+}"""
+
+
+def read_memory(cdp):
+    cdp.send("HeapProfiler.collectGarbage")
+    metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    return {
+        "heap_mb": round(metrics.get("JSHeapUsedSize", 0) / 1024 / 1024, 1),
+        "nodes": int(metrics.get("Nodes", 0)),
+    }
+
+
+def measure(browser, site, args):
+    context = browser.new_context(viewport={"width": 412, "height": 915})
+    site.install(context)
+    page = context.new_page()
+    cdp = context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+    try:
+        page.goto(f"{site.url}/transactions", wait_until="commit", timeout=30000)
+        page.wait_for_selector(f"{LIST} > div > div", timeout=60000)
+        first_rows_ms = page.evaluate(FIRST_ROWS_JS)
+        before = read_memory(cdp)
+
+        scroll = page.evaluate(SCROLL_JS, {"durationMs": args.scroll_seconds * 1000,
+                                           "pxPerFrame": args.px_per_frame})
+        after = read_memory(cdp)
+    finally:
+        context.close()
+
+    frames = scroll.pop("frames")
+    return {
+        "first_rows_ms": round(first_rows_ms, 1),
+        "fps": round(len(frames) / (scroll["elapsed_ms"] / 1000), 1) if frames else None,
+        "frame_ms": stats.summarize(frames),
+        "long_frames": sum(1 for frame in frames if frame > 50),
+        **scroll,
+        "memory_before": before,
+        "memory_after": after,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma-separated dataset sizes (rows)")
+    parser.add_argument("--scroll-seconds", type=float, default=5, help="how long to scroll per size")
+    parser.add_argument("--px-per-frame", type=int, default=400, help="scroll distance per animation frame")
+    parser.add_argument("--max-rendered", type=int, default=100,
+                        help="fail when more row elements than this are in the DOM (default: 100)")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("the benchmark serves its own generated data: run with --local")
+
+    sizes = [int(size) for size in args.rows.split(",") if size.strip()]
+    report = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for rows in sizes:
+                backend = local_mode.StubBackend(fixtures=make_fixtures(rows), latency_ms=args.latency_ms)
+                backend.warm()
+                with local_mode.serve(backend, args.dist) as site:
+                    total = len(backend.tables["expenses"]) + len(backend.tables["passive_income"])
+                    print(f"📦 {total:,} transactions")
+                    report[rows] = {"transactions": total, **measure(browser, site, args)}
+        finally:
+            browser.close()
+
+    print(f"\n📜 Scrolling /transactions for {args.scroll_seconds:g}s at {args.px_per_frame}px/frame:")
+    print(f"   {'rows':>8}  {'first':>7}  {'fps':>5}  {'p95 ms':>6}  {'long':>4}  {'loaded':>7}"
+          f"  {'in DOM':>6}  {'heap MB':>7}  {'nodes':>6}")
+    exit_code = 0
+    for rows, result in report.items():
+        memory = result["memory_after"]
+        print(f"   {rows:>8,}  {result['first_rows_ms']:>7.0f}  {result['fps'] or 0:>5.1f}"
+              f"  {result['frame_ms'].get('p95', 0):>6.1f}  {result['long_frames']:>4}"
+              f"  {result['rows_loaded']:>7,}  {result['rendered']:>6}  {memory['heap_mb']:>7.1f}"
+              f"  {memory['nodes']:>6,}")
+        if result["rendered"] > args.max_rendered:
+            exit_code = 1
+            print(f"   ❌ {result['rendered']} rows in the DOM at {rows:,} (max {args.max_rendered})")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Voice-to-confirmation latency, with and without speculative parsing.
+
+    python -m harness.bench_voice --local
+    python -m harness.bench_voice --local --iterations 3 --gemini-latency-ms 900 --endpoint-ms 600
+
+Every expense, income and FD utterance in the chat corpus is spoken into
+the chat through a scripted SpeechRecognition (harness/fake_speech.py), in
+three modes:
+
+    final-only    no interim results: the parse can only start once the
+                  final transcript is in, as before speculation
+    speculative   interim results a word at a time; the final transcript is
+                  the last interim one, capitalised and punctuated, so the
+                  speculative parse started during the end-of-speech pause
+                  should be reused
+    revised       the interims carry a different amount from the final
+                  transcript, so the speculative parse must be thrown away
+
+Latency is from the final result (speech:final) to the confirmation bubble
+(chat:rendered), in page time. The report has p50/p95 per mode, the
+speculative parses started / reused / discarded (window.__fiDebug.voice)
+and whether each confirmation carried the corpus amount. Exits non-zero
+when a revised utterance reused its speculation, a confirmation had the
+wrong amount, or speculative mode never reused a parse it started.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from playwright.sync_api import sync_playwright
+
+from harness import fake_speech, local_mode, stats, waits
+from harness.bench_chat import CORPUS_PATH, load_corpus, open_chat
+from harness.scenarios import VOICE_BUTTON
+
+REPORT_PATH = "/tmp/voice_latency_report.json"
+MODES = ("final-only", "speculative", "revised")
+KINDS = ("expense", "income", "fd")
+
+READ_VOICE_JS = "() => window.__fiDebug && window.__fiDebug.voice ? { ...window.__fiDebug.voice } : {}"
+READ_INTENT_JS = "() => window.__fiDebug && window.__fiDebug.intent ? window.__fiDebug.intent.last : null"
+CLEAR_MARKS_JS = "() => { performance.clearMarks('speech:final'); performance.clearMarks('voice:speculated') }"
+LATENCY_JS = """() => {
+    const mark = name => {
+        const entries = performance.getEntriesByName(name, 'mark')
+        return entries.length ? entries[entries.length - 1].startTime : null
+    }
+    const final = mark('speech:final'), rendered = mark('chat:rendered')
+    return {
+        confirm_ms: final !== null && rendered !== null ? rendered - final : null,
+        speculated: mark('voice:speculated') !== null,
+    }
+}"""
+
+
+def revise(text):
+    """`text` with its first amount misheard (500 -> 50, 1 -> 2), for the interim results."""
+    def mishear(match):
+        digits = match.group(0)
+        return digits[:-1] if len(digits) > 1 else str(int(digits) + 1)
+    return re.sub(r"\d+", mishear, text, count=1)
+
+
+def speech_for(text, mode, args):
+    timing = {"word_ms": args.word_ms, "endpoint_ms": args.endpoint_ms}
+    if mode == "final-only":
+        return fake_speech.script(text, interim=False, **timing)
+    spoken = text.lower().rstrip(".?!")
+    if mode == "speculative":
+        return fake_speech.script(spoken, final_text=text.rstrip(".?!") + ".", **timing)
+    return fake_speech.script(revise(spoken), final_text=text, **timing)
+
+
+def intent_amount(intent):
+    data = (intent or {}).get("intent", {}).get("data") or {}
+    return data.get("amount", data.get("principal"))
+
+
+def speak_and_measure(page, utterance, mode, args):
+    page.evaluate(CLEAR_MARKS_JS)
+    before = page.evaluate(READ_VOICE_JS)
+    fake_speech.queue(page, speech_for(utterance["text"], mode, args))
+
+    baseline = waits.count_assistant_bubbles(page)
+    page.locator(VOICE_BUTTON).first.click()
+    waits.assistant_bubble_appended(page, baseline, timeout_ms=args.timeout_ms)
+    waits.processing_done(page, timeout_ms=args.timeout_ms)
+
+    sample = page.evaluate(LATENCY_JS)
+    after = page.evaluate(READ_VOICE_JS)
+    intent = page.evaluate(READ_INTENT_JS)
+    expected = (utterance.get("expected") or {}).get("amount")
+    return {
+        "text": utterance["text"],
+        "mode": mode,
+        "confirm_ms": round(sample["confirm_ms"], 1) if sample["confirm_ms"] is not None else None,
+        "speculated": sample["speculated"],
+        "reused": after.get("reused", 0) - before.get("reused", 0),
+        "discarded": after.get("discarded", 0) - before.get("discarded", 0),
+        "intent_path": intent["path"] if intent else None,
+        "amount_ok": None if expected is None else intent_amount(intent) == expected,
+    }
+
+
+def mode_report(samples):
+    return {
+        "count": len(samples),
+        "confirm_ms": stats.summarize([s["confirm_ms"] for s in samples if s["confirm_ms"] is not None]),
+        "speculated": sum(s["speculated"] for s in samples),
+        "reused": sum(s["reused"] for s in samples),
+        "discarded": sum(s["discarded"] for s in samples),
+        "wrong_amount": sorted({s["text"] for s in samples if s["amount_ok"] is False}),
+    }
+
+
+def problems(report):
+    found = []
+    modes = report["modes"]
+    if modes.get("revised", {}).get("reused"):
+        found.append(f"{modes['revised']['reused']} revised utterances reused a stale speculative parse")
+    for mode, summary in modes.items():
+        for text in summary["wrong_amount"]:
+            found.append(f"{mode}: wrong amount confirmed for {text!r}")
+    speculative = modes.get("speculative")
+    if speculative and speculative["speculated"] and not speculative["reused"]:
+        found.append("speculative mode started parses but never reused one")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1, help="passes over the utterances per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated modes to run")
+    parser.add_argument("--word-ms", type=int, default=250, help="time per spoken word")
+    parser.add_argument("--endpoint-ms", type=int, default=800,
+                        help="silence after the last word before the final result")
+    parser.add_argument("--timeout-ms", type=int, default=30000, help="how long one utterance may take")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="chat corpus; its entry utterances are spoken")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    # Speculation only pays off when the parse has a round trip to hide
+    parser.set_defaults(gemini_latency_ms=600)
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = sorted(set(modes) - set(MODES))
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)} (choose from {', '.join(MODES)})")
+    utterances = [u for u in load_corpus(args.corpus) if u["kind"] in KINDS]
+
+    samples = []
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            for mode in modes:
+                # A fresh context per mode, so the intent cache starts empty each time
+                context = browser.new_context(viewport={"width": 1280, "height": 800})
+                context.add_init_script(fake_speech.INIT_JS)
+                site.install(context)
+                page = context.new_page()
+                open_chat(page, site)
+                for _ in range(args.iterations):
+                    for utterance in utterances:
+                        samples.append(speak_and_measure(page, utterance, mode, args))
+                context.close()
+                latest = stats.summarize([s["confirm_ms"] for s in samples if s["mode"] == mode])
+                print(f"   {mode:>12}: confirmation p50 {latest.get('p50', 0):.0f} ms over {latest['count']} utterances")
+        finally:
+            browser.close()
+
+    report = {
+        "word_ms": args.word_ms,
+        "endpoint_ms": args.endpoint_ms,
+        "modes": {mode: mode_report([s for s in samples if s["mode"] == mode]) for mode in modes},
+        "samples": samples,
+    }
+    baseline = report["modes"].get("final-only", {}).get("confirm_ms", {}).get("p50")
+    speculative = report["modes"].get("speculative", {}).get("confirm_ms", {}).get("p50")
+    if baseline is not None and speculative is not None:
+        report["saved_ms_p50"] = round(baseline - speculative, 1)
+
+    print(f"\n🎙️ Voice -> confirmation ({len(utterances)} utterances x {args.iterations}):")
+    print(f"   {'mode':>12}  {'p50':>7}  {'p95':>7}  {'speculated':>10}  {'reused':>6}  {'discarded':>9}")
+    for mode, summary in report["modes"].items():
+        print(f"   {mode:>12}  {summary['confirm_ms'].get('p50', 0):>7.1f}  {summary['confirm_ms'].get('p95', 0):>7.1f}"
+              f"  {summary['speculated']:>10}  {summary['reused']:>6}  {summary['discarded']:>9}")
+    if "saved_ms_p50" in report:
+        print(f"   speculation saves {report['saved_ms_p50']:.0f} ms at p50")
+
+    report["problems"] = problems(report)
+    for problem in report["problems"]:
+        print(f"   ❌ {problem}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return 1 if report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
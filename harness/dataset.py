@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Synthetic financial dataset for scale runs against the local stand-in.
+
+    python -m harness.dataset --rows 100000 --out /tmp/fi-100k
+    python -m harness.dataset --rows 1000000 --format sqlite --out /tmp/fi-1m.db \\
+        --start 2015-01-01 --mix food=40,transport=20,housing=5
+
+Generates expenses, passive_income, fd_tracker and financial_assets rows
+shaped like src/types/database.ts for one user. --rows is the total across
+the four tables, split by --table-mix (default 85% expenses, 13% income, 1%
+FDs, 1% assets). Dates fall between --start and --end; expense categories
+and income sources follow --mix / --income-mix weights. Recurring expenses
+(housing, utilities, education) land early in the month, FDs mature after
+their start date and are 'matured' once that date has passed.
+
+Rows are produced by generators and written as they come, one JSONL file
+per table (--format jsonl, a directory) or one SQLite database
+(--format sqlite), so a 1M-row dataset never sits in memory. read_tables()
+loads a JSONL directory back into the {table: [rows]} shape StubBackend
+takes; open_sqlite() hands StubBackend a SQLite database instead, its tables
+read row by row as requests need them (harness/aggregates.py's SqliteRows),
+which is what makes 1M rows practical. The same seed gives the same rows.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from functools import partial
+
+from harness import aggregates, local_mode
+
+TABLES = ("expenses", "passive_income", "fd_tracker", "financial_assets")
+
+# Columns per table, in src/types/database.ts order (SQLite schema and column order)
+COLUMNS = {
+    "expenses": ("id", "user_id", "category", "subcategory", "amount", "description", "expense_date",
+                 "payment_method", "is_recurring", "tags", "created_at"),
+    "passive_income": ("id", "user_id", "asset_id", "source_type", "source_name", "amount", "income_date",
+                       "frequency", "notes", "created_at"),
+    "fd_tracker": ("id", "user_id", "bank_name", "fd_number", "principal", "interest_rate", "start_date",
+                   "maturity_date", "maturity_amount", "interest_payout", "status", "auto_renew", "notes",
+                   "created_at"),
+    "financial_assets": ("id", "user_id", "asset_type", "name", "institution", "principal", "current_value",
+                         "interest_rate", "start_date", "maturity_date", "notes", "metadata", "created_at",
+                         "updated_at"),
+}
+
+# Stored as 0/1 and JSON text by write_sqlite(); open_sqlite() turns them back
+BOOLEAN_COLUMNS = {"expenses": ("is_recurring",), "fd_tracker": ("auto_renew",)}
+JSON_COLUMNS = {"expenses": ("tags",), "financial_assets": ("metadata",)}
+
+DEFAULT_TABLE_MIX = {"expenses": 85, "passive_income": 13, "fd_tracker": 1, "financial_assets": 1}
+
+# Category -> (weight, median amount, descriptions); EXPENSE_CATEGORIES in useExpenses.ts
+EXPENSES = {
+    "food": (30, 450, ("groceries", "swiggy", "zomato", "vegetables", "milk", "restaurant")),
+    "transport": (18, 180, ("auto", "uber", "ola", "petrol", "metro", "parking")),
+    "utilities": (8, 1400, ("electricity", "internet", "mobile recharge", "gas cylinder", "water bill")),
+    "entertainment": (8, 700, ("movie", "netflix", "concert", "books", "games")),
+    "personal": (10, 900, ("haircut", "clothes", "gym", "gifts")),
+    "healthcare": (5, 1200, ("pharmacy", "doctor", "lab tests", "insurance premium")),
+    "housing": (4, 18000, ("rent", "maintenance", "repairs")),
+    "education": (3, 5000, ("school fees", "course", "tuition")),
+    "other": (14, 600, ("misc", "donation", "household")),
+}
+RECURRING = {"housing", "utilities", "education"}
+PAYMENT_METHODS = ("upi", "upi", "upi", "card", "cash", "netbanking")
+
+# Source type -> (weight, median amount, frequency, names)
+INCOME = {
+    "fd_interest": (40, 6000, "monthly", ("{bank} FD interest",)),
+    "dividend": (20, 2500, "quarterly", ("HDFC Bank dividend", "ITC dividend", "Infosys dividend",
+                                         "Index fund IDCW")),
+    "rental": (25, 18000, "monthly", ("Flat rent", "Shop rent", "Tenant rent")),
+    "business": (10, 30000, "monthly", ("Consulting", "Partnership share")),
+    "other": (5, 3000, "one_time", ("Cashback", "Savings interest", "Royalty")),
+}
+
+BANKS = ("SBI", "HDFC", "ICICI", "Axis", "Kotak", "Canara", "Bank of Baroda", "IDFC First", "Yes Bank", "PNB")
+
+# Asset type -> (weight, median value, names)
+ASSETS = {
+    "fd": (30, 300000, ("{bank} FD",)),
+    "mutual_fund": (25, 250000, ("Nifty 50 index fund", "Flexi cap fund", "Liquid fund", "ELSS")),
+    "stock": (20, 150000, ("Equity portfolio", "Bank stocks", "IT stocks")),
+    "rental": (10, 4500000, ("Flat", "Shop", "Plot")),
+    "business": (5, 1000000, ("Partnership stake",)),
+    "other": (10, 100000, ("Gold", "PPF", "EPF")),
+}
+
+
+def parse_mix(text, known):
+    """'food=40,transport=20' -> weights for `known`, unnamed keys keep their defaults."""
+    weights = {key: value[0] if isinstance(value, tuple) else value for key, value in known.items()}
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        key, _, weight = part.partition("=")
+        key = key.strip()
+        if key not in known:
+            raise ValueError(f"unknown key {key!r} (expected one of {', '.join(known)})")
+        weights[key] = float(weight)
+    return weights
+
+
+def split_rows(rows, table_mix):
+    """Row count per table: proportional to the mix, at least one of each."""
+    total = sum(table_mix.values())
+    counts = {table: max(1, int(rows * weight / total)) for table, weight in table_mix.items()}
+    counts["expenses"] += max(0, rows - sum(counts.values()))
+    return counts
+
+
+class Generator:
+    """Seeded row streams for one user over [start, end]."""
+
+    def __init__(self, user_id=local_mode.USER_ID, start=None, end=None, seed=42,
+                 category_mix=None, income_mix=None):
+        self.user_id = user_id
+        self.end = end or date.today()
+        self.start = start or self.end - timedelta(days=3 * 365)
+        if self.start > self.end:
+            raise ValueError("start date is after end date")
+        self.days = (self.end - self.start).days + 1
+        self.seed = seed
+        self.category_mix = category_mix or parse_mix(None, EXPENSES)
+        self.income_mix = income_mix or parse_mix(None, INCOME)
+
+    def _rng(self, table):
+        # One stream per table, so changing one table's size leaves the others alone
+        return random.Random(f"{self.seed}:{table}")
+
+    def _id(self, rng):
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def _day(self, rng):
+        return self.start + timedelta(days=rng.randrange(self.days))
+
+    def _created(self, rng, day):
+        moment = datetime.combine(day, time(rng.randrange(7, 23), rng.randrange(60), rng.randrange(60)))
+        return moment.replace(tzinfo=timezone.utc).isoformat()
+
+    def _amount(self, rng, median, sigma=0.6, step=1):
+        value = rng.lognormvariate(math.log(median), sigma)
+        return max(step, round(value / step) * step)
+
+    def expenses(self, count):
+        rng = self._rng("expenses")
+        categories, weights = zip(*self.category_mix.items())
+        for _ in range(count):
+            category = rng.choices(categories, weights)[0]
+            _, median, descriptions = EXPENSES[category]
+            day = self._day(rng)
+            recurring = category in RECURRING and rng.random() < 0.7
+            if recurring:
+                day = day.replace(day=min(day.day, 5))
+            yield {
+                "id": self._id(rng),
+                "user_id": self.user_id,
+                "category": category,
+                "subcategory": None,
+                "amount": self._amount(rng, median, sigma=0.25 if recurring else 0.7),
+                "description": rng.choice(descriptions),
+                "expense_date": day.isoformat(),
+                "payment_method": rng.choice(PAYMENT_METHODS),
+                "is_recurring": recurring,
+                "tags": None,
+                "created_at": self._created(rng, day),
+            }
+
+    def passive_income(self, count):
+        rng = self._rng("passive_income")
+        sources, weights = zip(*self.income_mix.items())
+        for _ in range(count):
+            source_type = rng.choices(sources, weights)[0]
+            _, median, frequency, names = INCOME[source_type]
+            day = self._day(rng)
+            yield {
+                "id": self._id(rng),
+                "user_id": self.user_id,
+                "asset_id": None,
+                "source_type": source_type,
+                "source_name": rng.choice(names).format(bank=rng.choice(BANKS)),
+                "amount": self._amount(rng, median, sigma=0.4),
+                "income_date": day.isoformat(),
+                "frequency": frequency,
+                "notes": None,
+                "created_at": self._created(rng, day),
+            }
+
+    def fd_tracker(self, count):
+        rng = self._rng("fd_tracker")
+        today = date.today()
+        for i in range(count):
+            started = self._day(rng)
+            years = rng.choice((1, 1, 2, 3, 5))
+            matures = started + timedelta(days=365 * years)
+            principal = self._amount(rng, 300000, sigma=0.8, step=10000)
+            rate = round(rng.uniform(6.0, 8.0) * 4) / 4
+            yield {
+                "id": self._id(rng),
+                "user_id": self.user_id,
+                "bank_name": rng.choice(BANKS),
+                "fd_number": f"FD{i + 1:07d}",
+                "principal": principal,
+                "interest_rate": rate,
+                "start_date": started.isoformat(),
+                "maturity_date": matures.isoformat(),
+                "maturity_amount": round(principal * (1 + rate / 400) ** (4 * years)),
+                "interest_payout": rng.choice(("monthly", "quarterly", "maturity")),
+                "status": "active" if matures >= today else "matured",
+                "auto_renew": rng.random() < 0.3,
+                "notes": None,
+                "created_at": self._created(rng, started),
+            }
+
+    def financial_assets(self, count):
+        rng = self._rng("financial_assets")
+        types, weights = zip(*((t, w) for t, (w, _, _) in ASSETS.items()))
+        for _ in range(count):
+            asset_type = rng.choices(types, weights)[0]
+            _, median, names = ASSETS[asset_type]
+            started = self._day(rng)
+            principal = self._amount(rng, median, sigma=0.7, step=1000)
+            created = self._created(rng, started)
+            yield {
+                "id": self._id(rng),
+                "user_id": self.user_id,
+                "asset_type": asset_type,
+                "name": rng.choice(names).format(bank=rng.choice(BANKS)),
+                "institution": rng.choice(BANKS) if asset_type == "fd" else None,
+                "principal": principal,
+                "current_value": round(principal * rng.uniform(0.85, 1.6), -2),
+                "interest_rate": round(rng.uniform(6.0, 8.0), 2) if asset_type == "fd" else None,
+                "start_date": started.isoformat(),
+                "maturity_date": None,
+                "notes": None,
+                "metadata": None,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def streams(self, rows, table_mix=None):
+        """{table: row generator} adding up to `rows` rows."""
+        counts = split_rows(rows, table_mix or DEFAULT_TABLE_MIX)
+        return {table: getattr(self, table)(counts[table]) for table in TABLES}
+
+
+def write_jsonl(streams, out_dir):
+    """One <table>.jsonl per stream; returns rows written per table."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    for table, rows in streams.items():
+        with open(os.path.join(out_dir, f"{table}.jsonl"), "w") as f:
+            count = 0
+            for row in rows:
+                f.write(json.dumps(row, separators=(",", ":")))
+                f.write("\n")
+                count += 1
+        written[table] = count
+    return written
+
+
+def _sqlite_value(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def write_sqlite(streams, path, batch_size=10000):
+    """All streams into one SQLite file, inserted batch_size rows at a time."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    written = {}
+    try:
+        for table, rows in streams.items():
+            columns = COLUMNS[table]
+            conn.execute(f"create table {table} ({', '.join(columns)})")
+            insert = f"insert into {table} ({', '.join(columns)}) values ({', '.join('?' for _ in columns)})"
+            count = 0
+            while True:
+                batch = [[_sqlite_value(row[c]) for c in columns] for row in itertools.islice(rows, batch_size)]
+                if not batch:
+                    break
+                conn.executemany(insert, batch)
+                count += len(batch)
+            date_column = {"expenses": "expense_date", "passive_income": "income_date"}.get(table)
+            if date_column:
+                conn.execute(f"create index {table}_user_date_idx on {table} (user_id, {date_column})")
+            written[table] = count
+        conn.commit()
+    finally:
+        conn.close()
+    return written
+
+
+def read_tables(out_dir):
+    """A write_jsonl() directory as {table: [rows]}, ready for StubBackend(fixtures=...)."""
+    tables = {}
+    for table in TABLES:
+        path = os.path.join(out_dir, f"{table}.jsonl")
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            tables[table] = [json.loads(line) for line in f if line.strip()]
+    return tables
+
+
+def _decode(table, row):
+    for column in BOOLEAN_COLUMNS.get(table, ()):
+        if row.get(column) is not None:
+            row[column] = bool(row[column])
+    for column in JSON_COLUMNS.get(table, ()):
+        if isinstance(row.get(column), str):
+            row[column] = json.loads(row[column])
+    return row
+
+
+def open_sqlite(path):
+    """A write_sqlite() database as {table: SqliteRows}, for StubBackend(fixtures=...).
+
+    The file is copied into an in-memory database first, so the stub's inserts
+    leave the cached dataset alone.
+    """
+    disk = sqlite3.connect(path)
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    try:
+        disk.backup(conn)
+    finally:
+        disk.close()
+    conn.row_factory = sqlite3.Row
+    present = {name for (name,) in conn.execute("select name from sqlite_master where type = 'table'")}
+    return {table: aggregates.SqliteRows(conn, table, partial(_decode, table))
+            for table in TABLES if table in present}
+
+
+def generate(rows, out, fmt="jsonl", **options):
+    """Write a `rows`-row dataset to `out`; returns rows written per table."""
+    table_mix = options.pop("table_mix", None)
+    streams = Generator(**options).streams(rows, table_mix)
+    if fmt == "sqlite":
+        return write_sqlite(streams, out)
+    return write_jsonl(streams, out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="total rows across the four tables")
+    parser.add_argument("--out", required=True, help="output directory (jsonl) or database file (sqlite)")
+    parser.add_argument("--format", choices=("jsonl", "sqlite"), default="jsonl")
+    parser.add_argument("--user-id", default=local_mode.USER_ID)
+    parser.add_argument("--start", type=date.fromisoformat, help="first date (default: three years before --end)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last date (default: today)")
+    parser.add_argument("--mix", help="expense category weights, e.g. food=40,transport=20")
+    parser.add_argument("--income-mix", help="income source weights, e.g. rental=50,dividend=10")
+    parser.add_argument("--table-mix", help="row share per table, e.g. expenses=90,passive_income=8")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        options = {
+            "user_id": args.user_id, "start": args.start, "end": args.end, "seed": args.seed,
+            "category_mix": parse_mix(args.mix, EXPENSES),
+            "income_mix": parse_mix(args.income_mix, INCOME),
+            "table_mix": parse_mix(args.table_mix, DEFAULT_TABLE_MIX),
+        }
+        started = datetime.now()
+        written = generate(args.rows, args.out, args.format, **options)
+    except ValueError as e:
+        parser.error(str(e))
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ {sum(written.values()):,} rows -> {args.out} in {elapsed:.1f}s")
+    for table, count in written.items():
+        print(f"   {table}: {count:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
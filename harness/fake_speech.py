@@ -0,0 +1,100 @@
+"""
+A scripted SpeechRecognition for the Playwright scripts.
+
+    context.add_init_script(fake_speech.INIT_JS)
+    ...
+    fake_speech.queue(page, fake_speech.script("Spent 500 on groceries"))
+    page.locator(VOICE_BUTTON).click()
+
+INIT_JS replaces window.SpeechRecognition / webkitSpeechRecognition before
+the app loads, so useVoice picks it up as the browser's own. Each start()
+plays the next queued script: interim results a word at a time, every
+word_ms, the way Chrome reveals a transcript; then, endpoint_ms after the
+last word (Chrome's end-of-speech detection), the final result; then onend.
+The final result also sets performance.mark('speech:final'), the start of
+voice-to-confirmation latency. start() with nothing queued ends with a
+"no-speech" error, as a silent microphone would.
+"""
+
+INIT_JS = """
+(() => {
+    const pending = []
+
+    class FakeSpeechRecognition {
+        constructor() {
+            this.continuous = false
+            this.interimResults = false
+            this.lang = 'en-US'
+            this.onstart = this.onresult = this.onerror = this.onend = null
+            this._timers = []
+        }
+
+        _later(ms, fn) {
+            this._timers.push(setTimeout(fn, ms))
+        }
+
+        _fire(name, event) {
+            if (this['on' + name]) this['on' + name](event)
+        }
+
+        start() {
+            const script = pending.shift()
+            this._later(0, () => this._fire('start'))
+            if (!script) {
+                this._later(0, () => {
+                    this._fire('error', { error: 'no-speech' })
+                    this._fire('end')
+                })
+                return
+            }
+            for (const step of script.steps) {
+                if (!step.final && !this.interimResults) continue
+                this._later(step.at, () => {
+                    if (step.final) performance.mark('speech:final')
+                    const result = [{ transcript: step.text, confidence: 0.9 }]
+                    result.isFinal = step.final
+                    this._fire('result', { resultIndex: 0, results: [result] })
+                })
+            }
+            this._later(script.end_at, () => this._fire('end'))
+        }
+
+        stop() {
+            this._timers.forEach(clearTimeout)
+            this._timers = []
+            this._later(0, () => this._fire('end'))
+        }
+
+        abort() {
+            this.stop()
+        }
+    }
+
+    window.SpeechRecognition = FakeSpeechRecognition
+    window.webkitSpeechRecognition = FakeSpeechRecognition
+    window.__fakeSpeech = { queue: script => pending.push(script), pending }
+})()
+"""
+
+QUEUE_JS = "script => window.__fakeSpeech.queue(script)"
+
+
+def script(text, final_text=None, interim=True, word_ms=250, endpoint_ms=800, end_ms=50):
+    """What the recogniser hears for `text`; the final result says `final_text` if given.
+
+    Without `interim`, only the final result is delivered, as with
+    interimResults off.
+    """
+    words = text.split()
+    steps = []
+    if interim:
+        steps = [{"at": word_ms * (i + 1), "text": " ".join(words[:i + 1]), "final": False}
+                 for i in range(len(words))]
+    final_at = word_ms * len(words) + endpoint_ms
+    steps.append({"at": final_at, "text": final_text or text, "final": True})
+    return {"steps": steps, "end_at": final_at + end_ms}
+
+
+def queue(page, speech):
+    """Queue `speech` (see script()) for the next recognition the page starts."""
+    return page.evaluate(QUEUE_JS, speech)
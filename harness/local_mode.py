@@ -0,0 +1,814 @@
+"""
+Hermetic local mode for the chatbot scripts.
+
+Serves the built dist/ from an in-process HTTP server (with SPA fallback) and
+answers the Supabase REST and Gemini calls the bundle makes, so a run needs no
+network at all. Requests leave the browser for their real hosts and are
+redirected through page.route() to the same local server, which adds the
+configured latency in its own thread so parallel calls stay parallel.
+
+Gemini can be made to answer 429 like a rate-limited API key:
+--gemini-429-rate for a random share of calls, --gemini-max-concurrent for
+calls beyond that many in flight at once (useGeminiQueue's retries and its
+concurrency cap are what these exercise, see harness/bench_gemini.py).
+
+Streamed Gemini replies (:streamGenerateContent) are served as SSE, one
+chunk every --stream-chunk-ms. page.route() hands the page the whole body at
+once, so install() also adds an init script that points the page's stream
+fetches at this server directly; chunks then arrive as they are sent, with
+any build.
+
+Usage from a script:
+
+    parser = argparse.ArgumentParser()
+    local_mode.add_arguments(parser)
+    args = parser.parse_args()
+
+    with local_mode.open_site(args) as site:
+        context = browser.new_context()
+        site.install(context)
+        page = context.new_page()
+        page.goto(site.url)
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from harness import aggregates, snapshots
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIST_DIR = os.path.join(ROOT_DIR, "dist")
+LIVE_URL = "https://finance.maiyuri.com"
+USER_ID = "ram_kumaran"
+
+SUPABASE_TABLES = ("expenses", "passive_income", "fd_tracker", "financial_assets") + snapshots.SNAPSHOT_TABLES
+SUPABASE_RPCS = tuple(aggregates.RPC_SQL)
+SUPABASE_ROUTE = re.compile(r"https://[^/]+\.supabase\.co/rest/v1/(%s)\b" % "|".join(
+    SUPABASE_TABLES + tuple(f"rpc/{name}" for name in SUPABASE_RPCS)))
+# Tables at least this big are filtered and sorted in SQLite rather than in
+# Python, so datasets from harness/dataset.py stay quick to page through
+SQLITE_SELECT_ROWS = 10000
+
+GEMINI_ROUTE = re.compile(r"https://generativelanguage\.googleapis\.com/")
+FONTS_ROUTE = re.compile(r"https://fonts\.(googleapis|gstatic)\.com/")
+# A fulfilled route arrives in one piece: streams skip page.route() and
+# fetch the local server itself (same origin as the page, so no CORS)
+GEMINI_STREAM_JS = """(base) => {
+    const gemini = 'https://generativelanguage.googleapis.com/'
+    const fetch = window.fetch
+    window.fetch = function (input, init) {
+        const url = typeof input === 'string' ? input : input instanceof URL ? input.href : input.url
+        if (url.startsWith(gemini) && url.includes(':streamGenerateContent')) {
+            const local = base + '/' + url.slice(gemini.length)
+            input = typeof input === 'string' || input instanceof URL ? local : new Request(local, input)
+        }
+        return fetch.call(this, input, init)
+    }
+}"""
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PATCH, DELETE, OPTIONS",
+    "Access-Control-Expose-Headers": "Content-Range",
+}
+
+
+def add_arguments(parser):
+    """Add --local and the latency knobs to a script's argument parser."""
+    group = parser.add_argument_group("local mode")
+    group.add_argument("--local", action="store_true",
+                       help="serve dist/ locally and stub Supabase + Gemini")
+    group.add_argument("--dist", default=DIST_DIR, help="built app to serve (default: dist/)")
+    group.add_argument("--latency-ms", type=float, default=0,
+                       help="latency injected into stubbed Supabase calls")
+    group.add_argument("--gemini-latency-ms", type=float, default=None,
+                       help="latency injected into stubbed Gemini calls (default: --latency-ms)")
+    group.add_argument("--stream-chunk-ms", type=float, default=40,
+                       help="delay between chunks of a streamed Gemini reply (default: 40)")
+    group.add_argument("--gemini-429-rate", type=float, default=0,
+                       help="share of stubbed Gemini calls answered 429 at random (default: 0)")
+    group.add_argument("--gemini-max-concurrent", type=int, default=0,
+                       help="answer 429 to Gemini calls beyond this many in flight (default: no limit)")
+    return parser
+
+
+def parse_args(description=None, argv=None):
+    """Parser with only the local-mode options, for scripts without their own."""
+    parser = argparse.ArgumentParser(description=description)
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def default_fixtures(user_id=USER_ID, today=None):
+    """A small, month-relative dataset shaped like src/types/database.ts."""
+    today = today or date.today()
+    month_start = today.replace(day=1)
+
+    def day(offset):
+        return (month_start + timedelta(days=offset)).isoformat()
+
+    def later(days):
+        return (today + timedelta(days=days)).isoformat()
+
+    created = datetime.now(timezone.utc).isoformat()
+    rows = {
+        "expenses": [
+            ("food", 500, "groceries", 0),
+            ("transport", 200, "auto", 1),
+            ("utilities", 1500, "electricity", 2),
+            ("entertainment", 800, "movie", 3),
+        ],
+        "passive_income": [
+            ("fd_interest", "SBI FD interest", 45000, 0),
+            ("rental", "tenant rent", 10000, 1),
+            ("dividend", "HDFC dividend", 2500, 2),
+        ],
+        "fd_tracker": [
+            ("SBI", 500000, 7.1, later(45)),
+            ("HDFC", 300000, 7.25, later(200)),
+        ],
+        "financial_assets": [
+            ("fd", "SBI FD", 500000),
+            ("mutual_fund", "Index fund", 750000),
+            ("stock", "Equity portfolio", 400000),
+        ],
+    }
+
+    fixtures = {
+        "expenses": [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "category": c, "amount": a,
+             "description": d, "expense_date": day(o), "is_recurring": False, "created_at": created}
+            for c, a, d, o in rows["expenses"]
+        ],
+        "passive_income": [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "source_type": t, "source_name": n,
+             "amount": a, "income_date": day(o), "frequency": "monthly", "created_at": created}
+            for t, n, a, o in rows["passive_income"]
+        ],
+        "fd_tracker": [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "bank_name": b, "principal": p,
+             "interest_rate": r, "start_date": month_start.isoformat(), "maturity_date": m,
+             "maturity_amount": round(p * (1 + r / 100)), "interest_payout": "maturity",
+             "status": "active", "auto_renew": False, "created_at": created}
+            for b, p, r, m in rows["fd_tracker"]
+        ],
+        "financial_assets": [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "asset_type": t, "name": n,
+             "current_value": v, "created_at": created, "updated_at": created}
+            for t, n, v in rows["financial_assets"]
+        ],
+    }
+    return fixtures
+
+
+def stub_intent(text):
+    """Canned Gemini intent for an utterance, close enough to the real model."""
+    lower = text.lower()
+    amount = _parse_amount(lower)
+
+    for keyword, query_type in (("net worth", "net_worth"), ("matur", "fd_maturity"),
+                                ("fi progress", "fi_progress"), ("progress", "fi_progress"),
+                                ("income", "income"), ("expenses", "expenses")):
+        if keyword in lower and ("?" in lower or lower.startswith(("what", "how", "show", "my"))):
+            return {"action": "query", "data": {"query_type": query_type}, "confidence": 1.0,
+                    "message": "Let me check that for you."}
+
+    # "500 on groceries, 200 on auto and 1500 on electricity": one entry per clause
+    clauses = [clause for clause in re.split(r"\s*(?:,(?!\d)|;|\band\b)\s*", text) if _parse_amount(clause.lower())]
+    if len(clauses) > 1:
+        entries = [stub_intent(clause) for clause in clauses]
+        return {"action": "add_batch",
+                "entries": [{"action": entry["action"], "data": entry["data"]} for entry in entries],
+                "confidence": 0.9, "message": f"Recording {len(entries)} entries."}
+
+    if amount and ("fd" in lower or "fixed deposit" in lower):
+        bank = re.search(r"\bin ([A-Za-z]+)", text)
+        rate = re.search(r"(\d+(?:\.\d+)?)\s*%", lower)
+        return {"action": "add_fd",
+                "data": {"bank_name": bank.group(1) if bank else "SBI", "principal": amount,
+                         "interest_rate": float(rate.group(1)) if rate else 7.0,
+                         "maturity_date": (date.today() + timedelta(days=365)).isoformat()},
+                "confidence": 0.9, "message": f"Creating FD for Rs {amount:,}."}
+
+    if amount and any(word in lower for word in ("received", "got", "earned", "rent", "dividend", "interest")):
+        source_type = "rental" if "rent" in lower else "dividend" if "dividend" in lower else \
+            "fd_interest" if "interest" in lower else "other"
+        return {"action": "add_income",
+                "data": {"amount": amount, "source_type": source_type, "source_name": text},
+                "confidence": 0.95, "message": f"Recording Rs {amount:,} income."}
+
+    if amount:
+        on = re.search(r"\bon ([a-z ]+)", lower)
+        return {"action": "add_expense",
+                "data": {"amount": amount, "category": "other",
+                         "description": on.group(1).strip() if on else text},
+                "confidence": 0.95, "message": f"Recording Rs {amount:,} expense."}
+
+    return {"action": "unknown", "confidence": 0.3, "message": "Could you rephrase that?"}
+
+
+STUB_REPLY = (
+    "You're making steady progress toward financial independence. Your FD interest "
+    "is doing most of the work right now, so staggering maturities keeps that income "
+    "predictable. Rental income is your second pillar; keeping expenses flat while it "
+    "grows closes the gap to your target faster than chasing higher returns. "
+    "Keep it up!"
+)
+
+
+def _parse_amount(lower):
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(lakh|lac|crore|cr|k)?\b", lower.replace(",", ""))
+    if not match:
+        return None
+    multiplier = {"lakh": 100000, "lac": 100000, "crore": 10000000, "cr": 10000000, "k": 1000}
+    return int(float(match.group(1)) * multiplier.get(match.group(2), 1))
+
+
+class StubBackend:
+    """In-memory stand-in for the Supabase tables and the Gemini API.
+
+    net_worth_snapshots and dashboard_metrics are derived from the other four
+    the way the Postgres triggers derive them (harness/snapshots.py).
+    """
+
+    def __init__(self, fixtures=None, latency_ms=0, gemini_latency_ms=None, stream_chunk_ms=0,
+                 gemini_429_rate=0, gemini_max_concurrent=0, seed=None):
+        self.tables = fixtures if fixtures is not None else default_fixtures()
+        for table in SUPABASE_TABLES:
+            self.tables.setdefault(table, [])
+        self.latency_ms = latency_ms
+        self.gemini_latency_ms = latency_ms if gemini_latency_ms is None else gemini_latency_ms
+        self.stream_chunk_ms = stream_chunk_ms
+        self.gemini_429_rate = gemini_429_rate
+        self.gemini_max_concurrent = gemini_max_concurrent
+        # Gemini calls being answered now, the most at once, and 429s sent
+        self.gemini_in_flight = 0
+        self.gemini_peak = 0
+        self.gemini_rate_limited = 0
+        self._random = random.Random(seed)
+        self.requests = []
+        # Reentrant: insert() runs the snapshot triggers, which call rpc()
+        self._lock = threading.RLock()
+        self._sqlite_dbs = {}
+        self._conflict_indexes = {}
+        # Tables already in SQLite (harness/dataset.py's open_sqlite()) are their own copy
+        for table, rows in self.tables.items():
+            if isinstance(rows, aggregates.SqliteRows):
+                aggregates.create_indexes(rows.conn, table)
+                self._sqlite_dbs[table] = rows.conn
+        snapshots.refresh_all(self.tables, rpc=self.rpc)
+
+    def record(self, kind, name, method):
+        """Log a request; the caller may fill in "served_ms" once it has the answer."""
+        entry = {"kind": kind, "name": name, "method": method, "at": time.time(), "served_ms": None}
+        with self._lock:
+            self.requests.append(entry)
+        return entry
+
+    def counts(self, kind=None):
+        """Requests served so far, grouped by table (or "gemini")."""
+        with self._lock:
+            counts = {}
+            for req in self.requests:
+                if kind is None or req["kind"] == kind:
+                    counts[req["name"]] = counts.get(req["name"], 0) + 1
+            return counts
+
+    def _sqlite(self, table):
+        """SQLite copy of `table` (rowid = list index + 1), built on first use
+        and kept in step by insert(). Call with the lock held."""
+        conn = self._sqlite_dbs.get(table)
+        if conn is None:
+            conn = aggregates.connect({table: self.tables.get(table, [])}, check_same_thread=False)
+            self._sqlite_dbs[table] = conn
+        return conn
+
+    def warm(self):
+        """Build the SQLite copies now rather than inside the first timed request."""
+        with self._lock:
+            for table in set(aggregates.RPC_TABLES.values()):
+                self._sqlite(table)
+            for table, rows in self.tables.items():
+                if len(rows) >= SQLITE_SELECT_ROWS:
+                    self._sqlite(table)
+
+    def select(self, table, params):
+        with self._lock:
+            if len(self.tables[table]) >= SQLITE_SELECT_ROWS:
+                return self._sqlite_select(table, params)
+            rows = list(self.tables[table])
+
+        for column, values in params.items():
+            if column in ("select", "order", "limit", "offset", "columns"):
+                continue
+            if column in ("or", "and"):
+                rows = [row for row in rows if all(_logic_matches(row, column, value) for value in values)]
+                continue
+            for value in values:
+                op, _, operand = value.partition(".")
+                rows = [row for row in rows if _matches(row.get(column), op, operand)]
+
+        for order in reversed(params.get("order", [""])[0].split(",")):
+            if not order:
+                continue
+            column, _, direction = order.partition(".")
+            rows.sort(key=lambda row: _sort_key(row.get(column)),
+                      reverse=direction.startswith("desc"))
+
+        offset = int(params.get("offset", ["0"])[0])
+        if "limit" in params:
+            rows = rows[offset:offset + int(params["limit"][0])]
+        else:
+            rows = rows[offset:]
+        return rows
+
+    def _sqlite_select(self, table, params):
+        """select() for large tables: the same filters and order as SQL over the
+        SQLite copy, returning the original row dicts."""
+        conn = self._sqlite(table)
+        rows = self.tables[table]
+        columns = set(aggregates.columns_of(conn, table))
+        where, args = [], []
+
+        for column, values in params.items():
+            if column in ("select", "order", "limit", "offset", "columns"):
+                continue
+            for value in values:
+                if column in ("or", "and"):
+                    sql, extra = _sql_logic(column, value, columns, rows)
+                else:
+                    sql, extra = _sql_condition(column, value, columns, rows)
+                where.append(sql)
+                args.extend(extra)
+
+        order = []
+        for term in params.get("order", [""])[0].split(","):
+            if term:
+                column, _, direction = term.partition(".")
+                order.append(f"{_sql_column(column, columns)} {'desc' if direction.startswith('desc') else 'asc'}")
+        # Python's sort is stable: ties stay in insertion order
+        order.append("rowid")
+
+        sql = f"select rowid from {table}"
+        if where:
+            sql += " where " + " and ".join(where)
+        sql += " order by " + ", ".join(order)
+        offset = int(params.get("offset", ["0"])[0])
+        if "limit" in params:
+            sql += " limit ? offset ?"
+            args.extend([int(params["limit"][0]), offset])
+        elif offset:
+            sql += " limit -1 offset ?"
+            args.append(offset)
+        rowids = [rowid for (rowid,) in conn.execute(sql, args)]
+        if isinstance(rows, aggregates.SqliteRows):
+            return rows.at_rowids(rowids)
+        return [rows[rowid - 1] for rowid in rowids]
+
+    def rpc(self, name, args):
+        """Aggregate RPCs, computed by the SQLite stand-in (harness/aggregates.py)
+        on the table's SQLite copy, so a large dataset is loaded once."""
+        table = aggregates.RPC_TABLES[name]
+        with self._lock:
+            return aggregates.run(self._sqlite(table), name, args or {})
+
+    def insert(self, table, payload, on_conflict=None):
+        """Insert rows; returns them in the order given.
+
+        With on_conflict (an upsert, as useOutbox sends), a row whose column
+        matches an existing row updates it instead, like Postgres'
+        insert ... on conflict (col) do update.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        rows = payload if isinstance(payload, list) else [payload]
+        with self._lock:
+            existing = self._conflict_index(table, on_conflict) if on_conflict else {}
+            result, inserted = [], []
+            for row in rows:
+                match = existing.get(row.get(on_conflict)) if on_conflict else None
+                if match is not None:
+                    match.update(row)
+                    result.append(match)
+                    continue
+                new = {"id": str(uuid.uuid4()), "created_at": now, **row}
+                if on_conflict and new.get(on_conflict) is not None:
+                    existing[new[on_conflict]] = new
+                inserted.append(new)
+                result.append(new)
+
+            first_rowid = len(self.tables[table]) + 1
+            self.tables[table].extend(inserted)
+            if table in self._sqlite_dbs:
+                aggregates.append(self._sqlite_dbs[table], table, inserted, first_rowid)
+            snapshots.track(self.tables, table, inserted, rpc=self.rpc)
+        return result
+
+    def _conflict_index(self, table, column):
+        """Rows of `table` by `column`, built on first use and kept by insert()."""
+        key = (table, column)
+        if key not in self._conflict_indexes:
+            self._conflict_indexes[key] = {row[column]: row for row in self.tables[table]
+                                           if row.get(column) is not None}
+        return self._conflict_indexes[key]
+
+    def gemini_admit(self):
+        """Whether a Gemini call gets an answer (and then counts as in flight
+        until gemini_done()) or a 429."""
+        with self._lock:
+            busy = self.gemini_max_concurrent and self.gemini_in_flight >= self.gemini_max_concurrent
+            if busy or self._random.random() < self.gemini_429_rate:
+                self.gemini_rate_limited += 1
+                return False
+            self.gemini_in_flight += 1
+            self.gemini_peak = max(self.gemini_peak, self.gemini_in_flight)
+            return True
+
+    def gemini_done(self):
+        with self._lock:
+            self.gemini_in_flight -= 1
+
+    def gemini(self, body):
+        parts = [part.get("text", "") for content in body.get("contents", [])
+                 for part in content.get("parts", [])]
+        prompt = "\n".join(parts)
+        user_line = re.search(r"^User: (.*)$", prompt, re.MULTILINE)
+        if user_line:
+            text = json.dumps(stub_intent(user_line.group(1)))
+        else:
+            text = STUB_REPLY
+        return _candidate(text, "STOP")
+
+    def gemini_stream(self, body, words_per_chunk=4):
+        """The same reply as gemini(), as a list of streamGenerateContent chunks."""
+        text = self.gemini(body)["candidates"][0]["content"]["parts"][0]["text"]
+        words = text.split(" ")
+        pieces = [" ".join(words[i:i + words_per_chunk]) for i in range(0, len(words), words_per_chunk)]
+        pieces = [piece + " " for piece in pieces[:-1]] + pieces[-1:]
+        return [_candidate(piece, "STOP" if i == len(pieces) - 1 else None) for i, piece in enumerate(pieces)]
+
+
+# The body Google sends with a 429
+RATE_LIMITED = {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED",
+                          "message": "Resource has been exhausted (e.g. check quota)."}}
+
+
+def _candidate(text, finish_reason):
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {"candidates": [candidate]}
+
+
+def _matches(value, op, operand):
+    if op == "is":
+        return (value is None) == (operand == "null")
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        value = str(value).lower()
+    left, right = _sort_key(value), _sort_key(operand)
+    if op == "eq":
+        return str(value) == operand if isinstance(value, str) else left == right
+    if op == "neq":
+        return str(value) != operand if isinstance(value, str) else left != right
+    if op == "gt":
+        return left > right
+    if op == "gte":
+        return left >= right
+    if op == "lt":
+        return left < right
+    if op == "lte":
+        return left <= right
+    return True
+
+
+def _split_terms(expr):
+    """Top-level comma-separated terms of "a.eq.1,and(b.lt.2,c.gt.3)"."""
+    terms, depth, start = [], 0, 0
+    for i, char in enumerate(expr):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            terms.append(expr[start:i])
+            start = i + 1
+    terms.append(expr[start:])
+    return [term for term in terms if term]
+
+
+def _logic_matches(row, kind, expr):
+    """PostgREST or=(...) / and=(...) filters, nested as the keyset cursors use them."""
+    results = []
+    for term in _split_terms(expr.strip()[1:-1]):
+        if term.startswith(("and(", "or(")):
+            name, _, rest = term.partition("(")
+            results.append(_logic_matches(row, name, "(" + rest))
+        else:
+            column, op, operand = term.split(".", 2)
+            results.append(_matches(row.get(column), op, operand))
+    return any(results) if kind == "or" else all(results)
+
+
+_SQL_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _sql_column(column, columns):
+    # Unknown columns read as NULL, like row.get() on the Python path
+    return column if column in columns and re.fullmatch(r"\w+", column) else "null"
+
+
+def _sql_operand(rows, column, operand):
+    """Bind `operand` as the column's Python values are typed (first non-null wins)."""
+    for row in itertools.islice(rows, 200):
+        value = row.get(column)
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return 1 if operand == "true" else 0 if operand == "false" else operand
+        if isinstance(value, (int, float)):
+            try:
+                return float(operand)
+            except ValueError:
+                return operand
+        return operand
+    return operand
+
+
+def _sql_condition(column, value, columns, rows):
+    op, _, operand = value.partition(".")
+    target = _sql_column(column, columns)
+    if op == "is":
+        return f"{target} is {'null' if operand == 'null' else 'not null'}", []
+    if op not in _SQL_OPERATORS:
+        return "1", []
+    return f"{target} {_SQL_OPERATORS[op]} ?", [_sql_operand(rows, column, operand)]
+
+
+def _sql_logic(kind, expr, columns, rows):
+    """or=(...) / and=(...) as a parenthesised SQL expression."""
+    parts, args = [], []
+    for term in _split_terms(expr.strip()[1:-1]):
+        if term.startswith(("and(", "or(")):
+            name, _, rest = term.partition("(")
+            sql, extra = _sql_logic(name, "(" + rest, columns, rows)
+        else:
+            column, _, value = term.partition(".")
+            sql, extra = _sql_condition(column, value, columns, rows)
+        parts.append(sql)
+        args.extend(extra)
+    return "(" + f" {kind} ".join(parts) + ")", args
+
+
+def _sort_key(value):
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0, "" if value is None else str(value))
+
+
+class _LocalHandler(SimpleHTTPRequestHandler):
+    """dist/ with SPA fallback, plus /rest/v1/<table>, /rest/v1/rpc/<name> and /v1beta/ stubs."""
+
+    backend = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        for name, value in CORS_HEADERS.items():
+            self.send_header(name, value)
+        super().end_headers()
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.startswith("/rest/v1/"):
+            return self._supabase()
+        return super().do_GET()
+
+    def do_HEAD(self):
+        if self.path.startswith("/rest/v1/"):
+            return self._supabase()
+        return super().do_HEAD()
+
+    def do_POST(self):
+        if self.path.startswith("/rest/v1/"):
+            return self._supabase()
+        if self.path.startswith("/v1beta/"):
+            return self._gemini()
+        self.send_error(405)
+
+    def send_head(self):
+        # SPA fallback: unknown routes without a file extension get index.html
+        path = urlsplit(self.path).path
+        if not os.path.exists(self.translate_path(path)) and "." not in os.path.basename(path):
+            self.path = "/index.html"
+        return super().send_head()
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw or b"null")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _supabase(self):
+        parts = urlsplit(self.path)
+        table = parts.path[len("/rest/v1/"):].strip("/")
+        if table.startswith("rpc/"):
+            return self._rpc(table[len("rpc/"):])
+        if table not in self.backend.tables:
+            return self._send_json(404, {"message": f"relation \"{table}\" does not exist"})
+
+        entry = self.backend.record("supabase", table, self.command)
+        time.sleep(self.backend.latency_ms / 1000)
+
+        started = time.perf_counter()
+        if self.command == "POST":
+            on_conflict = parse_qs(parts.query).get("on_conflict", [None])[0]
+            rows = self.backend.insert(table, self._read_json(), on_conflict=on_conflict)
+            status = 201
+        else:
+            rows = self.backend.select(table, parse_qs(parts.query))
+            status = 200
+        entry["served_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        # .single() asks for one object instead of an array
+        if "vnd.pgrst.object" in (self.headers.get("Accept") or ""):
+            if len(rows) != 1:
+                return self._send_json(406, {"message": "JSON object requested, multiple (or no) rows returned"})
+            return self._send_json(status, rows[0])
+        return self._send_json(status, rows)
+
+    def _rpc(self, name):
+        if name not in aggregates.RPC_SQL:
+            return self._send_json(404, {"message": f"function {name} does not exist"})
+
+        entry = self.backend.record("supabase", f"rpc/{name}", self.command)
+        time.sleep(self.backend.latency_ms / 1000)
+        args = self._read_json() if self.command == "POST" else {
+            key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+        started = time.perf_counter()
+        result = self.backend.rpc(name, args)
+        entry["served_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._send_json(200, result)
+
+    def _gemini(self):
+        self.backend.record("gemini", "gemini", self.command)
+        body = self._read_json() or {}
+        if not self.backend.gemini_admit():
+            return self._send_json(429, RATE_LIMITED)
+        try:
+            time.sleep(self.backend.gemini_latency_ms / 1000)
+            if ":streamGenerateContent" in self.path:
+                return self._gemini_stream(body)
+            self._send_json(200, self.backend.gemini(body))
+        finally:
+            self.backend.gemini_done()
+
+    def _gemini_stream(self, body):
+        chunks = self.backend.gemini_stream(body)
+        # HTTP/1.0: no Content-Length, the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self.backend.stream_chunk_ms / 1000)
+            self.wfile.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+            self.wfile.flush()
+
+
+class LocalSite:
+    """The locally served app plus the stub backend behind it."""
+
+    def __init__(self, url, backend):
+        self.url = url
+        self.backend = backend
+
+    def _redirect(self, route):
+        parts = urlsplit(route.request.url)
+        return self.url + parts.path + (f"?{parts.query}" if parts.query else "")
+
+    def fetch(self, route):
+        """The stub's response to a routed request, for handlers layered over install()."""
+        return route.fetch(url=self._redirect(route))
+
+    def _stream_script(self):
+        return f"({GEMINI_STREAM_JS})({json.dumps(self.url)})"
+
+    def install(self, target):
+        """Route Supabase, Gemini and font requests of a page or context locally."""
+        if inspect.iscoroutinefunction(target.route):
+            return self._install_async(target)
+
+        def forward(route):
+            if route.request.method == "OPTIONS":
+                return route.fulfill(status=204, headers=CORS_HEADERS)
+            route.fulfill(response=self.fetch(route))
+
+        target.route(SUPABASE_ROUTE, forward)
+        target.route(GEMINI_ROUTE, forward)
+        target.route(FONTS_ROUTE, lambda route: route.abort())
+        target.add_init_script(self._stream_script())
+
+    async def _install_async(self, target):
+        async def forward(route):
+            if route.request.method == "OPTIONS":
+                return await route.fulfill(status=204, headers=CORS_HEADERS)
+            await route.fulfill(response=await route.fetch(url=self._redirect(route)))
+
+        async def abort(route):
+            await route.abort()
+
+        await target.route(SUPABASE_ROUTE, forward)
+        await target.route(GEMINI_ROUTE, forward)
+        await target.route(FONTS_ROUTE, abort)
+        await target.add_init_script(self._stream_script())
+
+
+class LiveSite:
+    """finance.maiyuri.com as deployed; nothing is intercepted."""
+
+    url = LIVE_URL
+    backend = None
+
+    def install(self, target):
+        if inspect.iscoroutinefunction(target.route):
+            return _noop()
+
+
+async def _noop():
+    pass
+
+
+@contextmanager
+def serve(backend, dist_dir=DIST_DIR):
+    """Run the local server on a free port for the duration of the block."""
+    if not os.path.exists(os.path.join(dist_dir, "index.html")):
+        raise FileNotFoundError(f"{dist_dir}/index.html not found - run `npm run build` first")
+
+    handler = type("Handler", (_LocalHandler,), {"backend": backend})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=dist_dir))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield LocalSite(f"http://127.0.0.1:{server.server_address[1]}", backend)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def serve_stub(backend):
+    """serve() with a placeholder index.html instead of a build, for checks
+    that only call the stubbed Supabase and Gemini endpoints."""
+    with tempfile.TemporaryDirectory() as dist_dir:
+        with open(os.path.join(dist_dir, "index.html"), "w") as f:
+            f.write("<!doctype html>")
+        with serve(backend, dist_dir) as site:
+            yield site
+
+
+@contextmanager
+def open_site(args, backend=None):
+    """The site a run should target: local stubs with --local, otherwise live."""
+    if not getattr(args, "local", False):
+        yield LiveSite()
+        return
+
+    backend = backend or StubBackend(latency_ms=args.latency_ms,
+                                     gemini_latency_ms=args.gemini_latency_ms,
+                                     stream_chunk_ms=getattr(args, "stream_chunk_ms", 0),
+                                     gemini_429_rate=getattr(args, "gemini_429_rate", 0),
+                                     gemini_max_concurrent=getattr(args, "gemini_max_concurrent", 0))
+    with serve(backend, args.dist) as site:
+        yield site
@@ -0,0 +1,44 @@
+"""
+Network and CPU conditions for the Playwright scripts, applied over CDP.
+
+    cdp = context.new_cdp_session(page)
+    network.emulate(cdp, "slow-3g")
+    network.throttle_cpu(cdp, 4)
+
+Latency in ms and throughput in bytes/s, as Network.emulateNetworkConditions
+takes them; the presets are Chrome DevTools' (which Lighthouse uses too). "4g" is
+DevTools' Fast 4G, close to what phones get on Indian 4G.
+
+Supabase and Gemini calls that LocalSite.install() routes are fulfilled by
+Playwright, outside Chromium's network stack, so CDP throttling never reaches
+them. Scripts running --local also set the stub's latency to stub_latency_ms()
+so those calls pay the profile's round trip as well.
+"""
+
+PROFILES = {
+    "online": None,
+    "4g": {"latency": 165, "downloadThroughput": 9 * 1024 * 1024 / 8 * 0.9,
+           "uploadThroughput": 1.5 * 1024 * 1024 / 8 * 0.9},
+    "fast-3g": {"latency": 562.5, "downloadThroughput": 1.6 * 1024 * 1024 / 8 * 0.9,
+                "uploadThroughput": 750 * 1024 / 8 * 0.9},
+    "slow-3g": {"latency": 2000, "downloadThroughput": 500 * 1024 / 8 * 0.8,
+                "uploadThroughput": 500 * 1024 / 8 * 0.8},
+}
+
+UNTHROTTLED = {"offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1}
+
+
+def emulate(cdp, name):
+    """Throttle the page behind `cdp` to profile `name` ("online" lifts it)."""
+    cdp.send("Network.enable")
+    cdp.send("Network.emulateNetworkConditions", {**UNTHROTTLED, **(PROFILES[name] or {})})
+
+
+def stub_latency_ms(name):
+    conditions = PROFILES[name]
+    return conditions["latency"] if conditions else 0
+
+
+def throttle_cpu(cdp, rate):
+    """Slow the page's main thread down `rate` times (1 lifts it); DevTools' 4x / 6x are mid / low-end phones."""
+    cdp.send("Emulation.setCPUThrottlingRate", {"rate": rate})
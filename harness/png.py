@@ -0,0 +1,118 @@
+"""
+PNG decode/encode on NumPy arrays, for the visual checks (harness/visual.py).
+
+    pixels = png.decode(data)        # (height, width, channels) uint8
+    data = png.encode(pixels)
+
+Covers what Chromium's screenshots use: 8-bit grayscale, RGB and RGBA
+(with or without alpha), not interlaced. No Pillow needed. None, Sub and Up
+rows are unfiltered with whole-row NumPy operations; Average and Paeth
+depend on the byte just reconstructed, so they go byte by byte in Python.
+Chromium's fast screenshot encoder sticks to the cheap filters. encode()
+writes Up-filtered rows, which suit flat UI colours, and zlib releases the
+GIL while compressing, so encoding in a thread pool runs in parallel.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Colour type -> channels
+CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+COLOR_TYPES = {channels: color_type for color_type, channels in CHANNELS.items()}
+
+
+def _chunks(data):
+    if data[:8] != SIGNATURE:
+        raise ValueError("not a PNG")
+    offset = 8
+    while offset < len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        yield kind, data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter_slow(kind, row, prev, bpp):
+    out = bytearray(row)
+    for i in range(len(out)):
+        left = out[i - bpp] if i >= bpp else 0
+        if kind == 3:
+            out[i] = (out[i] + ((left + prev[i]) >> 1)) & 0xFF
+        else:
+            upper_left = prev[i - bpp] if i >= bpp else 0
+            out[i] = (out[i] + _paeth(left, prev[i], upper_left)) & 0xFF
+    return np.frombuffer(bytes(out), dtype=np.uint8)
+
+
+def decode(data):
+    """(height, width, channels) uint8 array of an 8-bit, non-interlaced PNG."""
+    header, idat = None, []
+    for kind, body in _chunks(data):
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise ValueError("PNG without IHDR")
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or color_type not in CHANNELS or interlace:
+        raise ValueError(f"unsupported PNG: depth {depth}, colour type {color_type}, interlace {interlace}")
+
+    bpp = CHANNELS[color_type]
+    stride = width * bpp
+    raw = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(height, stride + 1)
+    pixels = np.empty((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.uint8)
+    for y in range(height):
+        kind, row = raw[y, 0], raw[y, 1:]
+        if kind == 0:
+            out = row
+        elif kind == 1:
+            # Sub: a running sum per channel, wrapping at 256
+            out = np.cumsum(row.reshape(width, bpp), axis=0, dtype=np.uint8).reshape(stride)
+        elif kind == 2:
+            out = row + prev
+        elif kind in (3, 4):
+            out = _unfilter_slow(kind, row.tobytes(), prev.tobytes(), bpp)
+        else:
+            raise ValueError(f"bad PNG filter {kind} on row {y}")
+        pixels[y] = out
+        prev = pixels[y]
+    return pixels.reshape(height, width, bpp)
+
+
+def _chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def encode(pixels, level=6):
+    """PNG bytes of a (height, width[, channels]) uint8 array."""
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    height, width, channels = pixels.shape
+    rows = pixels.reshape(height, width * channels)
+
+    # Up filter: each row minus the one above, the first row as is
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 0] = 0
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]
+
+    header = struct.pack(">IIBBBBB", width, height, 8, COLOR_TYPES[channels], 0, 0, 0)
+    return (SIGNATURE + _chunk(b"IHDR", header)
+            + _chunk(b"IDAT", zlib.compress(filtered.tobytes(), level))
+            + _chunk(b"IEND", b""))
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Page-load performance profile via CDP for the Dashboard, FDs and Transactions routes.
+
+    python -m harness.profile_pages --local
+
+Each route loads in a fresh browser context with its own CDP session and
+records navigation timing, FCP/LCP, long tasks, the V8 parse/compile time of
+the JavaScript loaded (the index-*.js entry plus route chunks) and every
+Supabase request fired on mount (count, bytes, start/end). The per-run
+timeline is written as JSON; "data_ready_ms" and "dominant_table" show which
+composable's fetch gates time-to-interactive.
+
+On "/" the chat widget is also opened to measure the lazily loaded chatbot
+chunk. --compare OLD_TIMELINE reports the first-load bytes and time saved
+relative to an earlier run (e.g. one taken before code splitting).
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from harness import local_mode, waits
+from harness.scenarios import TOGGLE_BUTTON
+
+ROUTES = ("/", "/fds", "/transactions")
+
+# Which composable fires each table's request on mount
+TABLE_COMPOSABLES = {
+    "expenses": "useExpenses",
+    "passive_income": "useFIProgress / usePassiveIncome",
+    "fd_tracker": "useFDs",
+    "financial_assets": "useAssets",
+    "net_worth_snapshots": "useSnapshot",
+    "dashboard_metrics": "useSnapshot",
+}
+
+TRACE_CATEGORIES = ",".join([
+    "devtools.timeline",
+    "v8",
+    "disabled-by-default-v8.compile",
+])
+
+BUNDLE_PATTERN = re.compile(r"/assets/index-[^/]*\.js")
+ASSET_JS_PATTERN = re.compile(r"/assets/[^/?]+\.js")
+SUPABASE_PATTERN = re.compile(r"/rest/v1/(\w+)")
+
+OBSERVERS_JS = """
+window.__fiPerf = { paint: {}, lcp: null, longTasks: [] }
+new PerformanceObserver(list => {
+    for (const entry of list.getEntries()) window.__fiPerf.paint[entry.name] = entry.startTime
+}).observe({ type: 'paint', buffered: true })
+new PerformanceObserver(list => {
+    const entries = list.getEntries()
+    window.__fiPerf.lcp = entries[entries.length - 1].startTime
+}).observe({ type: 'largest-contentful-paint', buffered: true })
+new PerformanceObserver(list => {
+    for (const entry of list.getEntries()) {
+        window.__fiPerf.longTasks.push({ start: entry.startTime, duration: entry.duration })
+    }
+}).observe({ type: 'longtask', buffered: true })
+"""
+
+COLLECT_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0]
+    return {
+        timeOrigin: performance.timeOrigin,
+        navigation: nav ? nav.toJSON() : null,
+        fcp: window.__fiPerf.paint['first-contentful-paint'] ?? null,
+        lcp: window.__fiPerf.lcp,
+        longTasks: window.__fiPerf.longTasks,
+    }
+}"""
+
+
+class NetworkLog:
+    """Request timing and size from CDP Network events."""
+
+    def __init__(self, cdp):
+        self.requests = {}
+        cdp.on("Network.requestWillBeSent", self._sent)
+        cdp.on("Network.responseReceived", self._received)
+        cdp.on("Network.loadingFinished", self._finished)
+
+    def _sent(self, event):
+        self.requests[event["requestId"]] = {
+            "url": event["request"]["url"],
+            "method": event["request"]["method"],
+            "wall_time": event["wallTime"],
+            "started": event["timestamp"],
+        }
+
+    def _received(self, event):
+        request = self.requests.get(event["requestId"])
+        if request:
+            request["status"] = event["response"]["status"]
+
+    def _finished(self, event):
+        request = self.requests.get(event["requestId"])
+        if request:
+            request["finished"] = event["timestamp"]
+            request["bytes"] = event["encodedDataLength"]
+
+    def timeline(self, time_origin_ms):
+        """Requests with start/end in ms relative to the page's timeOrigin."""
+        entries = []
+        for request in self.requests.values():
+            start = request["wall_time"] * 1000 - time_origin_ms
+            duration = (request["finished"] - request["started"]) * 1000 if "finished" in request else None
+            entries.append({
+                "url": request["url"],
+                "method": request["method"],
+                "status": request.get("status"),
+                "bytes": request.get("bytes", 0),
+                "start_ms": round(start, 1),
+                "end_ms": round(start + duration, 1) if duration is not None else None,
+            })
+        return sorted(entries, key=lambda e: e["start_ms"])
+
+
+class Tracer:
+    """Collects trace events through CDP Tracing (ReportEvents transfer mode)."""
+
+    def __init__(self, cdp):
+        self.cdp = cdp
+        self.events = []
+        self.complete = False
+        cdp.on("Tracing.dataCollected", lambda event: self.events.extend(event["value"]))
+        cdp.on("Tracing.tracingComplete", self._complete)
+
+    def _complete(self, event):
+        self.complete = True
+
+    def start(self):
+        self.cdp.send("Tracing.start", {"categories": TRACE_CATEGORIES, "transferMode": "ReportEvents"})
+
+    def stop(self, page, timeout_ms=10000):
+        self.cdp.send("Tracing.end")
+        deadline = time.monotonic() + timeout_ms / 1000
+        # tracingComplete arrives through the event loop; let Playwright pump it
+        while not self.complete and time.monotonic() < deadline:
+            page.wait_for_timeout(20)
+        return self.events
+
+
+def bundle_compile_ms(events, pattern=ASSET_JS_PATTERN):
+    """V8 parse + compile time attributed to the app's JavaScript assets."""
+    parse_compile = 0.0
+    evaluate = 0.0
+    for event in events:
+        if event.get("ph") != "X" or "dur" not in event:
+            continue
+        data = event.get("args", {}).get("data", {}) or {}
+        url = data.get("url") or event.get("args", {}).get("fileName") or ""
+        if not pattern.search(url):
+            continue
+        name = event["name"].lower()
+        if "compile" in name or "parse" in name:
+            parse_compile += event["dur"] / 1000
+        elif "evaluate" in name:
+            evaluate += event["dur"] / 1000
+    return round(parse_compile, 2), round(evaluate, 2)
+
+
+def open_chat(page, network):
+    """Open the widget and measure the chatbot chunk it pulls in."""
+    before = set(network.requests)
+    started = time.perf_counter()
+    page.locator(TOGGLE_BUTTON).click()
+    waits.chat_window_ready(page)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    # Requests are still finishing; give loadingFinished a moment via networkidle
+    page.wait_for_load_state("networkidle")
+    loaded = [r for request_id, r in network.requests.items()
+              if request_id not in before and ASSET_JS_PATTERN.search(r["url"])]
+    return {
+        "open_ms": round(elapsed, 1),
+        "js_requests": len(loaded),
+        "js_bytes": sum(r.get("bytes", 0) for r in loaded),
+    }
+
+
+def profile_route(browser, site, route):
+    context = browser.new_context(viewport={"width": 1280, "height": 800})
+    site.install(context)
+    context.add_init_script(OBSERVERS_JS)
+    page = context.new_page()
+
+    cdp = context.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.send("Performance.enable")
+    network = NetworkLog(cdp)
+    tracer = Tracer(cdp)
+    tracer.start()
+
+    page.goto(site.url.rstrip("/") + route, wait_until="networkidle", timeout=30000)
+    waits.app_mounted(page)
+
+    collected = page.evaluate(COLLECT_JS)
+    metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    events = tracer.stop(page)
+    requests = network.timeline(collected["timeOrigin"])
+
+    chat = open_chat(page, network) if route == "/" else None
+    context.close()
+
+    supabase = []
+    for request in requests:
+        match = SUPABASE_PATTERN.search(request["url"])
+        if match and request["method"] != "OPTIONS":
+            supabase.append({**request, "table": match.group(1),
+                             "composable": TABLE_COMPOSABLES.get(match.group(1))})
+
+    finished = [r for r in supabase if r["end_ms"] is not None]
+    dominant = max(finished, key=lambda r: r["end_ms"]) if finished else None
+    parse_compile, evaluate = bundle_compile_ms(events)
+    js = [r for r in requests if ASSET_JS_PATTERN.search(r["url"])]
+    long_tasks = collected["longTasks"]
+    nav = collected["navigation"] or {}
+
+    return {
+        "route": route,
+        "navigation": {
+            key: round(nav[key], 1) for key in (
+                "responseEnd", "domInteractive", "domContentLoadedEventEnd", "loadEventEnd"
+            ) if key in nav
+        },
+        "fcp_ms": collected["fcp"],
+        "lcp_ms": collected["lcp"],
+        "long_tasks": {
+            "count": len(long_tasks),
+            "total_ms": round(sum(t["duration"] for t in long_tasks), 1),
+            "entries": long_tasks,
+        },
+        "js": {
+            "entry_bytes": sum(r["bytes"] for r in js if BUNDLE_PATTERN.search(r["url"])),
+            "first_load_requests": len(js),
+            "first_load_bytes": sum(r["bytes"] for r in js),
+            # Requested before LCP, i.e. excluding the idle-time chat prefetch
+            "critical_bytes": sum(r["bytes"] for r in js
+                                  if collected["lcp"] is None or r["start_ms"] <= collected["lcp"]),
+            "parse_compile_ms": parse_compile,
+            "evaluate_ms": evaluate,
+        },
+        "chat_open": chat,
+        "supabase": {
+            "count": len(supabase),
+            "bytes": sum(r["bytes"] for r in supabase),
+            "requests": supabase,
+        },
+        "data_ready_ms": dominant["end_ms"] if dominant else None,
+        "dominant_table": dominant["table"] if dominant else None,
+        "dominant_composable": dominant["composable"] if dominant else None,
+        "metrics": {key: metrics.get(key) for key in (
+            "ScriptDuration", "TaskDuration", "LayoutDuration", "JSHeapUsedSize", "Nodes"
+        )},
+        "requests": requests,
+    }
+
+
+def _first_load(profile):
+    # Timelines from before code splitting recorded only the entry bundle
+    js = profile.get("js") or {"critical_bytes": profile.get("bundle", {}).get("bytes"),
+                                "parse_compile_ms": profile.get("bundle", {}).get("parse_compile_ms")}
+    return {
+        "js_bytes": js.get("critical_bytes"),
+        "parse_compile_ms": js.get("parse_compile_ms"),
+        "fcp_ms": profile.get("fcp_ms"),
+        "lcp_ms": profile.get("lcp_ms"),
+    }
+
+
+def first_load_savings(old, new):
+    """Per-route reduction (old - new) in first-load JS bytes and paint times."""
+    savings = {}
+    for route, profile in new["routes"].items():
+        if route not in old.get("routes", {}):
+            continue
+        before, after = _first_load(old["routes"][route]), _first_load(profile)
+        savings[route] = {
+            key: round(before[key] - after[key], 1)
+            for key in before if before[key] is not None and after[key] is not None
+        }
+    return savings
+
+
+def print_savings(savings):
+    print("\n📉 Saved on first load vs. previous run:")
+    for route, saved in savings.items():
+        print(f"   {route}: {saved.get('js_bytes', 0) / 1024:.1f} KB JS, "
+              f"{saved.get('parse_compile_ms', 0):.1f} ms parse/compile, "
+              f"FCP {saved.get('fcp_ms', 0):.0f} ms, LCP {saved.get('lcp_ms', 0):.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--route", action="append", choices=ROUTES, help="profile only this route (repeatable)")
+    parser.add_argument("--output", default=None,
+                        help="timeline JSON path (default: /tmp/page_profile_<timestamp>.json)")
+    parser.add_argument("--compare", metavar="OLD_TIMELINE",
+                        help="report first-load savings against an earlier timeline")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    output = args.output or f"/tmp/page_profile_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    timeline = {"started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "routes": {}}
+
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        timeline["site"] = site.url
+        browser = p.chromium.launch(headless=True)
+        for route in args.route or ROUTES:
+            print(f"📍 Profiling {route}...")
+            profile = profile_route(browser, site, route)
+            timeline["routes"][route] = profile
+            print(f"   FCP {profile['fcp_ms'] or 0:.0f} ms, LCP {profile['lcp_ms'] or 0:.0f} ms, "
+                  f"{profile['long_tasks']['count']} long task(s), "
+                  f"{profile['js']['first_load_bytes'] / 1024:.1f} KB JS, "
+                  f"parse/compile {profile['js']['parse_compile_ms']:.1f} ms")
+            print(f"   {profile['supabase']['count']} Supabase request(s), "
+                  f"{profile['supabase']['bytes'] / 1024:.1f} KB; data ready at "
+                  f"{profile['data_ready_ms'] or 0:.0f} ms (slowest: {profile['dominant_composable']})")
+            if profile["chat_open"]:
+                chat = profile["chat_open"]
+                print(f"   Chat opened in {chat['open_ms']:.0f} ms, "
+                      f"{chat['js_bytes'] / 1024:.1f} KB JS on demand")
+        browser.close()
+
+    if args.compare:
+        with open(args.compare) as f:
+            timeline["savings"] = first_load_savings(json.load(f), timeline)
+        print_savings(timeline["savings"])
+
+    with open(output, "w") as f:
+        json.dump(timeline, f, indent=2)
+    print(f"\n📄 Timeline saved to: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
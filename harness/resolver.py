@@ -0,0 +1,209 @@
+"""
+Batched selector resolution with a per-build cache.
+
+Instead of walking a fallback list with one count()/all() round trip per
+candidate, resolve() sends every candidate for a role to the page in a single
+page.evaluate(). The first candidate with a (visible) match wins; the winning
+element is tagged with data-fi-resolved="<role>" so locator(role) addresses
+exactly that element, and its geometry comes back with the result.
+
+Winners are cached in .selector-cache.json keyed by the hashed bundle name
+(index-*.js). The next run against the same build tries the cached selector
+first and skips the cascade; a new build has a new bundle name, so the cache
+invalidates itself.
+"""
+
+import json
+import os
+
+from harness.local_mode import ROOT_DIR
+
+CACHE_PATH = os.path.join(ROOT_DIR, ".selector-cache.json")
+
+# Geometric fallback: first visible button in the bottom-right corner
+BOTTOM_RIGHT = "@bottom-right"
+
+ROLES = {
+    "chat_button": {
+        "selectors": [
+            "button:has-text('💬')",
+            "[class*='chat']",
+            "button[class*='fixed'][class*='bottom']",
+            ".chat-widget button",
+            "#chat-button",
+            "[data-testid='chat-button']",
+            ".fixed.bottom-6.right-6 > button",
+            BOTTOM_RIGHT,
+            "button:has(svg)",
+        ],
+        "visible": True,
+    },
+    "chat_window": {
+        "selectors": [
+            "[class*='chat-window']",
+            "[class*='ChatWindow']",
+            ".chat-container",
+            ".fixed.bottom-6.right-6 > .bg-slate-800.rounded-2xl",
+            "div:has-text('FI Assistant')",
+        ],
+        "visible": False,
+    },
+    "input": {
+        "selectors": [
+            "textarea[placeholder*='message']",
+            "textarea[placeholder*='voice']",
+            "textarea",
+            "input[type='text']",
+            "input[placeholder*='message']",
+            "[contenteditable='true']",
+        ],
+        "visible": False,
+    },
+    "send": {
+        "selectors": [
+            "button:has-text('Send')",
+            "button[type='submit']",
+            "button:has(svg[class*='send'])",
+            "button.bg-emerald-600",
+            "form button",
+        ],
+        "visible": True,
+    },
+    "voice": {
+        "selectors": [
+            "button:has-text('🎤')",
+            "[class*='VoiceButton']",
+            "[class*='voice']",
+            "[class*='mic']",
+            "button[title*='voice']",
+            "button[title*='Start']",
+            "button:has(svg[class*='animate'])",
+        ],
+        "visible": False,
+    },
+    "suggestions": {
+        "selectors": [
+            "button:has-text('Add expense')",
+            "button:has-text('My net worth')",
+            "button:has-text('FI progress')",
+            "button.rounded-full",
+            "[class*='suggestion']",
+            "[class*='quick']",
+        ],
+        "visible": False,
+    },
+}
+
+RESOLVE_JS = """
+({ role, candidates, visibleOnly }) => {
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect()
+        const style = getComputedStyle(el)
+        return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none'
+    }
+    // Playwright's :has-text('x') is not CSS; emulate it with a text filter
+    const query = selector => {
+        const hasText = selector.match(/^(.*):has-text\\((['"])(.*)\\2\\)$/)
+        const css = hasText ? (hasText[1] || '*') : selector
+        let elements
+        try {
+            elements = [...document.querySelectorAll(css)]
+        } catch (e) {
+            return []
+        }
+        if (hasText) {
+            const text = hasText[3].toLowerCase()
+            elements = elements.filter(el => el.textContent.toLowerCase().includes(text))
+        }
+        return elements
+    }
+    const bottomRight = () => [...document.querySelectorAll('button')].filter(el => {
+        const rect = el.getBoundingClientRect()
+        return rect.x > innerWidth - 280 && rect.y > innerHeight - 200
+    })
+
+    document.querySelectorAll(`[data-fi-resolved="${role}"]`)
+        .forEach(el => el.removeAttribute('data-fi-resolved'))
+
+    const bundle = document.querySelector('script[src*="/assets/index-"]')
+    const result = {
+        role,
+        bundle: bundle ? bundle.getAttribute('src').split('/').pop() : null,
+        selector: null,
+        count: 0,
+        tried: 0,
+        box: null,
+    }
+    for (const selector of candidates) {
+        result.tried++
+        let matches = selector === '@bottom-right' ? bottomRight() : query(selector)
+        if (visibleOnly) matches = matches.filter(isVisible)
+        if (!matches.length) continue
+
+        const el = matches[0]
+        const rect = el.getBoundingClientRect()
+        el.setAttribute('data-fi-resolved', role)
+        result.selector = selector
+        result.count = matches.length
+        result.box = { x: rect.x, y: rect.y, width: rect.width, height: rect.height }
+        break
+    }
+    return result
+}
+"""
+
+
+def locator(page, role):
+    """Locator for the element the last resolve() of `role` picked."""
+    return page.locator(f"[data-fi-resolved='{role}']")
+
+
+class SelectorResolver:
+    """Resolves roles in one round trip each, remembering winners per build."""
+
+    def __init__(self, cache_path=CACHE_PATH, roles=ROLES):
+        self.cache_path = cache_path
+        self.roles = roles
+        self.cache = self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"bundle": None, "roles": {}}
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        with open(self.cache_path, "w") as f:
+            json.dump(self.cache, f, indent=2)
+
+    def _args(self, role):
+        spec = self.roles[role]
+        cached = self.cache["roles"].get(role)
+        # The cached winner goes first; the cascade only runs if it stopped matching
+        candidates = [cached] if cached else []
+        candidates += [s for s in spec["selectors"] if s != cached]
+        return {"role": role, "candidates": candidates, "visibleOnly": spec["visible"]}
+
+    def _remember(self, role, result):
+        cached = self.cache["roles"].get(role)
+        same_build = result["bundle"] == self.cache.get("bundle")
+        result["from_cache"] = same_build and bool(cached) and result["selector"] == cached and result["tried"] == 1
+
+        if not same_build:
+            # New build deployed: everything we knew is stale
+            self.cache = {"bundle": result["bundle"], "roles": {}}
+        if result["selector"] and result["selector"] != self.cache["roles"].get(role):
+            self.cache["roles"][role] = result["selector"]
+            self._save()
+        return result
+
+    def resolve(self, page, role):
+        """Resolve `role` on a sync_api page. Returns the result dict."""
+        return self._remember(role, page.evaluate(RESOLVE_JS, self._args(role)))
+
+    async def resolve_async(self, page, role):
+        """Resolve `role` on an async_api page. Returns the result dict."""
+        return self._remember(role, await page.evaluate(RESOLVE_JS, self._args(role)))
@@ -0,0 +1,87 @@
+"""
+The chatbot checks' results dict, shared by test_chatbot.py and the parallel
+runner (harness/runner.py), and the summary both print.
+"""
+
+
+def new_results():
+    """Empty results dict: one flag per check, then what the run collected."""
+    return {
+        "site_loaded": False,
+        "chat_button_found": False,
+        "chat_window_opened": False,
+        "text_input_works": False,
+        "gemini_response": False,
+        "voice_button_found": False,
+        "quick_suggestions": False,
+        "errors": [],
+        "console_logs": [],
+        "console_logs_dropped": 0,
+        "screenshots": [],
+        "wait_durations": {},
+        "selectors": {}
+    }
+
+
+def print_results(results):
+    print("\n" + "="*60)
+    print("📊 CHATBOT TEST RESULTS")
+    print("="*60)
+
+    tests = [
+        ("Site Loaded", results["site_loaded"]),
+        ("Chat Button Found", results["chat_button_found"]),
+        ("Chat Window Opened", results["chat_window_opened"]),
+        ("Text Input Works", results["text_input_works"]),
+        ("Gemini Response", results["gemini_response"]),
+        ("Voice Button Found", results["voice_button_found"]),
+        ("Quick Suggestions", results["quick_suggestions"]),
+    ]
+
+    passed = sum(1 for _, v in tests if v)
+    total = len(tests)
+
+    for name, passed_test in tests:
+        status = "✅ PASS" if passed_test else "❌ FAIL"
+        print(f"  {status} - {name}")
+
+    print(f"\n📈 Score: {passed}/{total} tests passed")
+
+    if results.get("wait_durations"):
+        print("\n⏱️ Wait durations:")
+        for name, waited_ms in results["wait_durations"].items():
+            # The parallel runner collects one sample per scenario
+            samples = sorted(waited_ms if isinstance(waited_ms, list) else [waited_ms])
+            median = samples[len(samples) // 2]
+            print(f"   - {name}: {median:.0f} ms" + (f" (median of {len(samples)})" if len(samples) > 1 else ""))
+
+    if results["errors"]:
+        print("\n⚠️ Errors encountered:")
+        for err in results["errors"]:
+            print(f"   - {err[:100]}")
+
+    if results["console_logs"]:
+        error_logs = [log for log in results["console_logs"] if log["type"] == "error"]
+        if error_logs:
+            print("\n🔴 Console Errors:")
+            for log in error_logs[:5]:
+                print(f"   - {log['text'][:100]}")
+
+    print("\n📸 Screenshots saved:")
+    for path in results["screenshots"]:
+        print(f"   - {path}")
+
+    report = results.get("visual")
+    if report and report["captures"]:
+        totals = report["totals"]
+        print(f"\n🖼️ Visual checks ({totals['capture_ms']:.0f} ms capturing; decode {totals['decode_ms']:.0f},"
+              f" compare {totals['compare_ms']:.0f}, encode {totals['encode_ms']:.0f} ms off-thread):")
+        for capture in report["captures"]:
+            costs = ", ".join(f"{key} {capture[key]:.0f}" for key in ("capture_ms", "decode_ms", "compare_ms", "encode_ms")
+                              if key in capture)
+            print(f"   - {capture['name']}: {capture['status']} ({costs})"
+                  + (f" -> {capture['diff']}" if "diff" in capture else ""))
+
+    print("="*60)
+
+    return passed, total
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Parallel chatbot suite: one Chromium, one isolated browser context per scenario.
+
+    python -m harness.runner --local --workers 4
+
+Scenarios come from harness/scenarios.py and run in a pool of --workers
+contexts. Their results are merged into one results dict (harness/results.py,
+the one test_chatbot.py fills), with per-scenario timings under "scenarios".
+A scenario the build cannot run (harness.scenarios.ScenarioSkipped) is listed
+as skipped, with its reason, and does not fail the suite.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from harness import local_mode
+from harness.results import new_results, print_results
+from harness.scenarios import SCENARIOS, ScenarioSkipped
+
+RESULTS_PATH = "/tmp/chatbot_parallel_results.json"
+
+
+def merge_results(results, scenario_results):
+    """Fold one scenario's results into the suite results: flags OR, counts add, lists extend."""
+    for key, value in scenario_results.items():
+        if isinstance(value, bool):
+            results[key] = results.get(key, False) or value
+        elif isinstance(value, int):
+            results[key] = results.get(key, 0) + value
+        elif isinstance(value, list):
+            results.setdefault(key, []).extend(value)
+        elif key == "wait_durations":
+            for wait, waited_ms in value.items():
+                results[key].setdefault(wait, []).append(waited_ms)
+        else:
+            results[key] = value
+
+
+async def run_scenario(browser, site, name, scenario):
+    scenario_results = new_results()
+    context = await browser.new_context(
+        viewport={"width": 1280, "height": 800},
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    )
+    await site.install(context)
+    page = await context.new_page()
+
+    page.on("console", lambda msg: scenario_results["console_logs"].append({
+        "type": msg.type,
+        "text": msg.text
+    }))
+    page.on("pageerror", lambda err: scenario_results["errors"].append(str(err)))
+
+    started = time.perf_counter()
+    skipped = None
+    try:
+        await scenario(page, site, scenario_results)
+        passed = True
+    except ScenarioSkipped as e:
+        # Not a failure, and nothing it recorded counts towards the suite
+        scenario_results = new_results()
+        skipped = str(e)
+        passed = True
+    except Exception as e:
+        scenario_results["errors"].append(f"{name}: {e}")
+        passed = False
+    finally:
+        await context.close()
+
+    summary = {
+        "passed": passed,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    if skipped:
+        summary["skipped"] = skipped
+    return scenario_results, summary
+
+
+async def run_suite(site, workers, names=None):
+    names = names or list(SCENARIOS)
+    results = new_results()
+    results["scenarios"] = {}
+
+    queue = asyncio.Queue()
+    for name in names:
+        queue.put_nowait(name)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+
+        async def worker():
+            while not queue.empty():
+                name = queue.get_nowait()
+                scenario_results, summary = await run_scenario(browser, site, name, SCENARIOS[name])
+                merge_results(results, scenario_results)
+                results["scenarios"][name] = summary
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(names)))))
+        results["wall_clock_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        await browser.close()
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="concurrent browser contexts (default: CPU count)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--output", default=RESULTS_PATH, help="where to write the JSON results")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with local_mode.open_site(args) as site:
+        print(f"🚀 Running {len(args.scenario or SCENARIOS)} scenario(s) against {site.url} "
+              f"with {args.workers} worker(s)")
+        results = asyncio.run(run_suite(site, max(args.workers, 1), args.scenario))
+
+    print_results(results)
+
+    print("\n⏱️ Scenario timings:")
+    for name, summary in results["scenarios"].items():
+        if summary.get("skipped"):
+            print(f"   ⏭️ {name}: skipped, {summary['skipped']}")
+            continue
+        status = "✅" if summary["passed"] else "❌"
+        print(f"   {status} {name}: {summary['duration_ms']:.0f} ms")
+    print(f"   Wall clock: {results['wall_clock_ms']:.0f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Full results saved to: {args.output}")
+
+    return 0 if all(s["passed"] for s in results["scenarios"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Chatbot scenarios for the parallel runner (harness/runner.py).
+
+Each scenario is an async function taking a fresh page (in its own browser
+context), the site under test and a results dict (harness/results.py).
+Scenarios are independent: each one loads the app and opens the widget itself,
+and raises to fail. One that cannot run against this build raises
+ScenarioSkipped instead, with the reason.
+
+suggestion_cache reads window.__fiDebug.cache, which only a dist/ rebuilt
+with `npm run build` from the current src/ publishes; against an older build
+it is skipped ("build predates cache stats").
+"""
+
+from harness import waits
+
+TEST_MESSAGE = "What's my net worth?"
+SUGGESTIONS = ("Add expense", "My net worth", "FI progress")
+
+TOGGLE_BUTTON = ".fixed.bottom-6.right-6 > button"
+CHAT_HEADER = "h3:has-text('FI Assistant')"
+TEXTAREA = "textarea"
+# The "Yes, Save" confirmation button is emerald too; the send button sits in the input row
+SEND_BUTTON = ".flex.items-end.gap-2 > button.bg-emerald-600"
+CONFIRM_BUTTON = "button:has-text('Yes, Save')"
+VOICE_BUTTON = "button[title*='voice'], button[title*='listening']"
+
+
+class ScenarioSkipped(Exception):
+    """The build under test lacks what the scenario checks."""
+
+
+async def load_app(page, site, results):
+    await page.goto(site.url, wait_until="networkidle", timeout=30000)
+    results["wait_durations"]["app_mounted"] = (await waits.app_mounted(page))["waited_ms"]
+    results["site_loaded"] = True
+
+
+async def open_chat(page, site, results):
+    await load_app(page, site, results)
+
+    toggle = page.locator(TOGGLE_BUTTON)
+    if await toggle.count() == 0:
+        raise AssertionError(f"no chat toggle ({TOGGLE_BUTTON})")
+    results["chat_button_found"] = True
+
+    await toggle.click()
+    ready = await waits.chat_window_ready(page, timeout_ms=5000)
+    results["wait_durations"]["chat_window_ready"] = ready["waited_ms"]
+    results["chat_window_opened"] = await page.locator(CHAT_HEADER).count() > 0
+
+
+async def open_widget(page, site, results):
+    await open_chat(page, site, results)
+    path = "/tmp/chatbot_parallel_window_open.png"
+    await page.screenshot(path=path)
+    results["screenshots"].append(path)
+
+
+async def type_and_send(page, site, results):
+    await open_chat(page, site, results)
+
+    textarea = page.locator(TEXTAREA).first
+    await textarea.fill(TEST_MESSAGE)
+    results["text_input_works"] = True
+
+    baseline = await waits.count_assistant_bubbles(page)
+    await page.locator(SEND_BUTTON).first.click()
+
+    bubble = await waits.assistant_bubble_appended(page, baseline)
+    done = await waits.processing_done(page)
+    results["wait_durations"]["assistant_bubble"] = bubble["waited_ms"]
+    results["wait_durations"]["processing_done"] = done["waited_ms"]
+    results["gemini_response"] = True
+
+    path = "/tmp/chatbot_parallel_after_send.png"
+    await page.screenshot(path=path)
+    results["screenshots"].append(path)
+
+
+async def voice_button_probe(page, site, results):
+    await open_chat(page, site, results)
+    results["voice_button_found"] = await page.locator(VOICE_BUTTON).count() > 0
+
+
+async def quick_suggestions(page, site, results):
+    await open_chat(page, site, results)
+
+    found = 0
+    for suggestion in SUGGESTIONS:
+        found += await page.locator(f"button:has-text('{suggestion}')").count()
+    results["quick_suggestions"] = found > 0
+
+
+READ_CACHE_STATS_JS = "() => window.__fiDebug ? window.__fiDebug.cache || null : null"
+
+
+async def click_suggestion(page, suggestion):
+    baseline = await waits.count_assistant_bubbles(page)
+    await page.locator(f"button:has-text('{suggestion}')").first.click()
+    await waits.assistant_bubble_appended(page, baseline)
+    await waits.processing_done(page)
+
+
+async def suggestion_cache(page, site, results):
+    """
+    Tap "My net worth" twice, reload, tap it again: the repeats (including the
+    one after the reload, via sessionStorage) must be served from the cache.
+    """
+    await open_chat(page, site, results)
+    if await page.evaluate(READ_CACHE_STATS_JS) is None:
+        raise ScenarioSkipped("build predates cache stats (window.__fiDebug.cache): rebuild dist/ with `npm run build`")
+
+    await click_suggestion(page, "My net worth")
+    await click_suggestion(page, "My net worth")
+    before_reload = await page.evaluate(READ_CACHE_STATS_JS)
+
+    await open_chat(page, site, results)
+    await click_suggestion(page, "My net worth")
+    after_reload = await page.evaluate(READ_CACHE_STATS_JS)
+
+    results["cache_stats"] = {"before_reload": before_reload, "after_reload": after_reload}
+    if not before_reload or before_reload["intent"]["hits"] < 1:
+        raise AssertionError(f"repeated suggestion missed the intent cache: {before_reload}")
+    if not after_reload or after_reload["intent"]["hits"] < 1:
+        raise AssertionError(f"intent cache did not survive the reload: {after_reload}")
+
+
+async def dom_debug_dump(page, site, results):
+    """Same information as test_chatbot_debug.py, collected as data."""
+    await open_chat(page, site, results)
+
+    results["dom_debug"] = await page.evaluate("""() => {
+        const describe = el => ({
+            tag: el.tagName.toLowerCase(),
+            type: el.getAttribute('type'),
+            placeholder: el.getAttribute('placeholder'),
+            visible: !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length),
+        })
+        const widget = document.querySelector('[class*="fixed"][class*="bottom"]')
+        return {
+            textareas: [...document.querySelectorAll('textarea')].map(describe),
+            inputs: [...document.querySelectorAll('input')].map(describe),
+            fi_header: document.body.innerText.includes('FI Assistant'),
+            message_area: !!document.querySelector('[class*="overflow-y-auto"]'),
+            input_area: !!document.querySelector('[class*="border-t"]'),
+            widget_html: widget ? widget.innerHTML.slice(0, 2000) : null,
+        }
+    }""")
+
+
+SCENARIOS = {
+    "open_widget": open_widget,
+    "type_and_send": type_and_send,
+    "voice_button_probe": voice_button_probe,
+    "quick_suggestions": quick_suggestions,
+    "suggestion_cache": suggestion_cache,
+    "dom_debug_dump": dom_debug_dump,
+}
@@ -0,0 +1,134 @@
+"""
+Python stand-in for the snapshot triggers in
+supabase/migrations/20261018010000_dashboard_snapshots.sql.
+
+The stub backend calls refresh() for every user when it starts (the
+migration's backfill) and track() after each insert (the row triggers), so
+net_worth_snapshots and dashboard_metrics read the same in local mode as they
+do against Postgres. Keep the metric shapes in step with the migration.
+"""
+
+import uuid
+from datetime import date, datetime, timezone
+from functools import partial
+
+from harness import aggregates
+
+SNAPSHOT_TABLES = ("net_worth_snapshots", "dashboard_metrics")
+
+# Table -> metric its trigger maintains
+TRACKED = {
+    "expenses": "monthly_expenses",
+    "passive_income": "monthly_income",
+    "fd_tracker": "active_fds",
+    "financial_assets": "net_worth",
+}
+
+# Inserts into these apply a delta: (metric, date column, group column, metric_data key)
+DELTAS = {
+    "expenses": ("monthly_expenses", "expense_date", "category", "categories"),
+    "passive_income": ("monthly_income", "income_date", "source_type", "sources"),
+}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _upsert(rows, match, values):
+    for row in rows:
+        if all(row.get(key) == value for key, value in match.items()):
+            row.update(values)
+            return row
+    row = {"id": str(uuid.uuid4()), **match, **values}
+    rows.append(row)
+    return row
+
+
+def _metric(tables, user_id, name, value, data):
+    _upsert(tables["dashboard_metrics"], {"user_id": user_id, "metric_name": name},
+            {"metric_value": value, "metric_data": data, "calculated_at": _now()})
+
+
+def refresh_net_worth(tables, user_id, today=None):
+    breakdown = {}
+    for row in tables.get("financial_assets", []):
+        if row.get("user_id") != user_id:
+            continue
+        value = row.get("current_value")
+        if value is None:
+            value = row.get("principal") or 0
+        breakdown[row.get("asset_type")] = breakdown.get(row.get("asset_type"), 0) + value
+    total = sum(breakdown.values())
+    _upsert(tables["net_worth_snapshots"],
+            {"user_id": user_id, "snapshot_date": (today or date.today()).isoformat()},
+            {"total_assets": total, "total_liabilities": 0, "net_worth": total,
+             "breakdown": breakdown, "created_at": _now()})
+
+
+def refresh_month(tables, user_id, table, today=None, rpc=None):
+    """Recount this month's expense or income metric through the aggregate RPC.
+
+    `rpc(name, args)` defaults to aggregates.call() on `tables`; the stub
+    backend passes its own, which reuses its SQLite copies.
+    """
+    name, _, group, key = DELTAS[table]
+    month = (today or date.today()).replace(day=1).isoformat()
+    function = "expense_category_totals" if table == "expenses" else "income_breakdown"
+    totals = (rpc or partial(aggregates.call, tables))(function, {"p_user_id": user_id, "p_start": month})
+    _metric(tables, user_id, name, sum(t["total"] for t in totals),
+            {"month": month, key: {t[group]: t["total"] for t in totals}})
+
+
+def refresh_active_fds(tables, user_id):
+    active = [row for row in tables.get("fd_tracker", [])
+              if row.get("user_id") == user_id and row.get("status") == "active"]
+    _metric(tables, user_id, "active_fds", sum(row.get("principal") or 0 for row in active),
+            {"count": len(active)})
+
+
+def refresh(tables, user_id, today=None, rpc=None):
+    """Every snapshot row for `user_id`, recomputed from the raw tables."""
+    for table in SNAPSHOT_TABLES:
+        tables.setdefault(table, [])
+    refresh_net_worth(tables, user_id, today)
+    refresh_month(tables, user_id, "expenses", today, rpc)
+    refresh_month(tables, user_id, "passive_income", today, rpc)
+    refresh_active_fds(tables, user_id)
+
+
+def refresh_all(tables, today=None, rpc=None):
+    users = {row.get("user_id") for table in TRACKED for row in tables.get(table, [])}
+    for user_id in sorted(user for user in users if user):
+        refresh(tables, user_id, today, rpc)
+
+
+def track(tables, table, rows, today=None, rpc=None):
+    """What the row triggers do after `rows` were inserted into `table`."""
+    if table not in TRACKED:
+        return
+    for table_name in SNAPSHOT_TABLES:
+        tables.setdefault(table_name, [])
+    month = (today or date.today()).replace(day=1).isoformat()
+
+    for row in rows:
+        user_id = row.get("user_id")
+        if table in DELTAS:
+            name, date_column, group, key = DELTAS[table]
+            if (row.get(date_column) or "") < month:
+                continue
+            metric = next((m for m in tables["dashboard_metrics"]
+                           if m["user_id"] == user_id and m["metric_name"] == name), None)
+            if metric and (metric.get("metric_data") or {}).get("month") == month:
+                # Replaced rather than mutated: a concurrent select may be serialising it
+                groups = dict(metric["metric_data"].get(key) or {})
+                groups[row.get(group)] = groups.get(row.get(group), 0) + row["amount"]
+                metric.update(metric_value=metric["metric_value"] + row["amount"],
+                              metric_data={**metric["metric_data"], key: groups},
+                              calculated_at=_now())
+            else:
+                refresh_month(tables, user_id, table, today, rpc)
+        elif table == "fd_tracker":
+            refresh_active_fds(tables, user_id)
+        else:
+            refresh_net_worth(tables, user_id, today)
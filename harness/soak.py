@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Long-session soak of the chat widget: heap, DOM nodes and listeners must stay flat.
+
+    python -m harness.soak --local
+    python -m harness.soak --local --cycles 40 --messages-per-cycle 100 --voice-toggles 20
+
+Each cycle opens the widget, sends --messages-per-cycle chat messages (the
+corpus's query and chat utterances, answered by the stub), speaks
+--voice-toggles queries through a scripted SpeechRecognition
+(harness/fake_speech.py), then closes the widget. With it closed, the page
+is garbage-collected over CDP (HeapProfiler.collectGarbage) and sampled
+with Performance.getMetrics: JSHeapUsedSize, Nodes, JSEventListeners.
+
+The first --warmup cycles fill caches and are left out. Over the rest, a
+metric grows when its least-squares trend over the run exceeds its
+tolerance and every sample in the last third is above every sample in the
+first third, so one noisy sample can't fail the run and a plateau can't pass
+as growth. Exits non-zero when any metric grew.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from harness import fake_speech, local_mode, stats, waits
+from harness.bench_chat import CORPUS_PATH, load_corpus, open_chat
+from harness.scenarios import TEXTAREA, TOGGLE_BUTTON, VOICE_BUTTON
+
+REPORT_PATH = "/tmp/soak_report.json"
+KINDS = ("query", "chat")
+METRICS = {
+    # CDP metric name -> (report key, tolerance flag)
+    "JSHeapUsedSize": ("heap_mb", "max_heap_growth_mb"),
+    "Nodes": ("nodes", "max_node_growth"),
+    "JSEventListeners": ("listeners", "max_listener_growth"),
+}
+
+READ_RENDERED_JS = "(selector) => document.querySelectorAll(selector).length"
+
+
+def send_messages(page, texts, count, timeout_ms):
+    textarea = page.locator(TEXTAREA).first
+    for i in range(count):
+        baseline = waits.count_assistant_bubbles(page)
+        textarea.fill(texts[i % len(texts)])
+        textarea.press("Enter")
+        waits.assistant_bubble_appended(page, baseline, timeout_ms=timeout_ms)
+        waits.processing_done(page, timeout_ms=timeout_ms)
+
+
+def toggle_voice(page, texts, count, timeout_ms):
+    for i in range(count):
+        # Spoken quickly: the soak is about what each recognition leaves behind
+        fake_speech.queue(page, fake_speech.script(texts[i % len(texts)], word_ms=20, endpoint_ms=100))
+        baseline = waits.count_assistant_bubbles(page)
+        page.locator(VOICE_BUTTON).first.click()
+        waits.assistant_bubble_appended(page, baseline, timeout_ms=timeout_ms)
+        waits.processing_done(page, timeout_ms=timeout_ms)
+
+
+def sample(cdp, page):
+    """Performance.getMetrics after a full GC, with the heap in MB."""
+    cdp.send("HeapProfiler.collectGarbage")
+    metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    result = {}
+    for name, (key, _) in METRICS.items():
+        value = metrics.get(name)
+        if value is not None and name == "JSHeapUsedSize":
+            value = round(value / (1024 * 1024), 2)
+        result[key] = value
+    result["assistant_messages"] = waits.count_assistant_bubbles(page)
+    return result
+
+
+def growth(values):
+    """Trend over the series (slope x span), and whether the last third sits wholly above the first."""
+    values = [v for v in values if v is not None]
+    if len(values) < 3:
+        return {"trend": None, "sustained": False}
+    third = max(len(values) // 3, 1)
+    trend = stats.slope(values) * (len(values) - 1)
+    return {
+        "trend": round(trend, 2),
+        "first": values[0],
+        "last": values[-1],
+        "sustained": min(values[-third:]) > max(values[:third]),
+    }
+
+
+def problems(report, args):
+    found = []
+    for key, flag in METRICS.values():
+        result = report["growth"][key]
+        tolerance = getattr(args, flag)
+        if result["sustained"] and result["trend"] > tolerance:
+            found.append(f"{key} grew by {result['trend']} over {report['measured_cycles']} cycles"
+                         f" ({result['first']} -> {result['last']}, max {tolerance})")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=30, help="open / send / speak / close cycles")
+    parser.add_argument("--messages-per-cycle", type=int, default=80, help="chat messages sent per cycle")
+    parser.add_argument("--voice-toggles", type=int, default=10, help="voice inputs per cycle")
+    parser.add_argument("--warmup", type=int, default=3, help="cycles left out of the growth check")
+    parser.add_argument("--max-heap-growth-mb", type=float, default=2.0,
+                        help="allowed JS heap growth over the measured cycles (default: 2 MB)")
+    parser.add_argument("--max-node-growth", type=float, default=200,
+                        help="allowed DOM node growth over the measured cycles (default: 200)")
+    parser.add_argument("--max-listener-growth", type=float, default=20,
+                        help="allowed event listener growth over the measured cycles (default: 20)")
+    parser.add_argument("--timeout-ms", type=int, default=30000, help="how long one message may take")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="chat corpus; its query and chat utterances are sent")
+    parser.add_argument("--output", default=REPORT_PATH, help="where to write the JSON report")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.local:
+        parser.error("thousands of messages need the stub behind them: run with --local")
+    if args.cycles - args.warmup < 3:
+        parser.error("need at least 3 cycles after --warmup to judge growth")
+
+    texts = [u["text"] for u in load_corpus(args.corpus) if u["kind"] in KINDS]
+    spoken = [u["text"] for u in load_corpus(args.corpus) if u["kind"] == "query"]
+
+    samples = []
+    started = time.perf_counter()
+    with local_mode.open_site(args) as site, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(viewport={"width": 1280, "height": 800})
+        context.add_init_script(fake_speech.INIT_JS)
+        site.install(context)
+        try:
+            page = context.new_page()
+            cdp = context.new_cdp_session(page)
+            cdp.send("Performance.enable")
+            open_chat(page, site)
+            for cycle in range(args.cycles):
+                if cycle:
+                    page.locator(TOGGLE_BUTTON).click()
+                    waits.chat_window_ready(page)
+                send_messages(page, texts, args.messages_per_cycle, args.timeout_ms)
+                toggle_voice(page, spoken, args.voice_toggles, args.timeout_ms)
+                rendered = page.evaluate(READ_RENDERED_JS, waits.ASSISTANT_BUBBLE)
+                page.locator(TOGGLE_BUTTON).click()
+                waits.chat_window_closed(page)
+
+                result = {"cycle": cycle + 1, "rendered_bubbles": rendered, **sample(cdp, page)}
+                samples.append(result)
+                print(f"   [{cycle + 1}/{args.cycles}] heap {result['heap_mb']} MB, {result['nodes']:.0f} nodes,"
+                      f" {result['listeners']:.0f} listeners, {rendered} bubbles rendered")
+        finally:
+            browser.close()
+
+    measured = samples[args.warmup:]
+    report = {
+        "cycles": args.cycles,
+        "warmup": args.warmup,
+        "measured_cycles": len(measured),
+        "messages": args.cycles * args.messages_per_cycle,
+        "voice_inputs": args.cycles * args.voice_toggles,
+        "elapsed_s": round(time.perf_counter() - started, 1),
+        "growth": {key: growth([s[key] for s in measured]) for key, _ in METRICS.values()},
+        "samples": samples,
+    }
+
+    print(f"\n🧪 Soak, {report['messages']} messages and {report['voice_inputs']} voice inputs"
+          f" over {args.cycles} cycles ({report['elapsed_s']:.0f} s):")
+    for key, result in report["growth"].items():
+        print(f"   {key:>10}: {result.get('first')} -> {result.get('last')}, trend {result['trend']}"
+              f"{' (sustained)' if result['sustained'] else ''}")
+
+    report["problems"] = problems(report, args)
+    for problem in report["problems"]:
+        print(f"   ❌ {problem}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report: {args.output}")
+    return 1 if report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Percentile summaries and baseline comparison for the harness benchmarks.
+"""
+
+import json
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; None for no samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    """{count, mean, p50, p95, p99, max} of the non-None samples, in ms."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 1),
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def slope(values):
+    """Least-squares change per sample of an evenly spaced series; None under two samples."""
+    if len(values) < 2:
+        return None
+    n = len(values)
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def compare(current, baseline, threshold_pct, min_delta_ms=5.0, keys=("p50", "p95", "p99")):
+    """
+    Compare {name: summary} against a baseline of the same shape.
+
+    A percentile regresses when it is more than threshold_pct slower than the
+    baseline and the absolute difference exceeds min_delta_ms (so a 2 ms -> 3 ms
+    render step doesn't fail the run). Returns a list of regression dicts.
+    """
+    regressions = []
+    for name, summary in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in keys:
+            now, before = summary.get(key), base.get(key)
+            if now is None or before is None:
+                continue
+            if now - before > min_delta_ms and now > before * (1 + threshold_pct / 100):
+                regressions.append({
+                    "metric": name,
+                    "percentile": key,
+                    "baseline_ms": before,
+                    "current_ms": now,
+                    "change_pct": round((now - before) / before * 100, 1) if before else None,
+                })
+    return regressions
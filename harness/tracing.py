@@ -0,0 +1,322 @@
+"""
+Timed step spans for the Playwright scripts, exported as Chrome trace or OTLP JSON.
+
+    tracer = tracing.Tracer("test_chatbot")
+    tracer.attach(page)
+    with tracer.span("open_window", selector=TOGGLE_BUTTON) as span:
+        ...
+        span.set(count=3)
+    tracer.write_chrome_trace("/tmp/chatbot_trace.json")
+
+Spans nest (a span opened inside another is its child) and carry free-form
+attributes: the selector used, candidates tried, elements matched. Once
+attached to a page, the tracer files every network request and console
+error under the innermost span open when it happened, so a slow or failing
+step shows the traffic behind it. A span that exits on an exception, or that
+is marked with fail(), has error status.
+
+The Chrome trace loads in chrome://tracing or https://ui.perfetto.dev: steps
+on one track, requests on another, console errors as instant events. The
+OTLP file is the JSON form of an ExportTraceServiceRequest, for any
+OpenTelemetry collector or viewer.
+
+Recording is a perf_counter() and a dict per span or request, cheap enough
+to leave on; Playwright's own tracing (screenshots and DOM snapshots) is
+what costs, so the scripts only keep its zip when a run fails
+(retain_on_failure()).
+"""
+
+import contextlib
+import json
+import os
+import time
+
+# Console errors / requests kept per span; past this they are only counted
+MAX_EVENTS = 100
+
+STEP_TID = 1
+NETWORK_TID = 2
+
+
+def _hex_id(nbytes):
+    return os.urandom(nbytes).hex()
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else json.dumps(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    def __init__(self, tracer, name, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = _hex_id(8)
+        self.parent = parent
+        self.attributes = dict(attributes)
+        self.start = tracer.now()
+        self.end = None
+        self.error = None
+        self.requests = []
+        self.events = []
+        self.dropped = 0
+
+    def set(self, **attributes):
+        """Add or overwrite attributes."""
+        self.attributes.update(attributes)
+        return self
+
+    def fail(self, message):
+        """Mark the span failed without raising, for steps that carry on."""
+        self.error = str(message)
+        return self
+
+    def add_event(self, name, **attributes):
+        if len(self.events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        self.events.append({"name": name, "at": self.tracer.now(), "attributes": attributes})
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else self.tracer.now()
+        return round((end - self.start) * 1000, 1)
+
+    @property
+    def depth(self):
+        return 0 if self.parent is None else self.parent.depth + 1
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "requests": len(self.requests),
+            "failed_requests": sum(1 for r in self.requests if r["failed"]),
+            "console_errors": sum(1 for e in self.events if e["name"] == "console.error"),
+            **self.attributes,
+        }
+
+
+class Tracer:
+    """Records spans for one run; see the module docstring."""
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = _hex_id(16)
+        self.origin = time.perf_counter()
+        self.origin_ns = time.time_ns()
+        self.spans = []
+        self.stack = []
+        self.requests = {}
+
+    def now(self):
+        """Seconds since the tracer started."""
+        return time.perf_counter() - self.origin
+
+    def _unix_ns(self, at):
+        return str(self.origin_ns + int(at * 1e9))
+
+    @property
+    def current(self):
+        return self.stack[-1] if self.stack else None
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        span = Span(self, name, self.current, attributes)
+        self.spans.append(span)
+        self.stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = span.error or f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = self.now()
+            self.stack.pop()
+
+    @property
+    def failed(self):
+        return any(span.error for span in self.spans)
+
+    # -- page events -------------------------------------------------------
+
+    def attach(self, page):
+        """File the page's requests and console errors under the open span."""
+        page.on("request", self._request_started)
+        page.on("response", self._response)
+        page.on("requestfinished", lambda request: self._request_ended(request, None))
+        page.on("requestfailed", lambda request: self._request_ended(request, request.failure))
+        page.on("console", self._console)
+        page.on("pageerror", lambda err: self._error_event("pageerror", str(err)))
+
+    def _request_started(self, request):
+        span = self.current
+        record = {
+            "url": request.url,
+            "method": request.method,
+            "resource_type": request.resource_type,
+            "span": span.span_id if span else None,
+            "start": self.now(),
+            "end": None,
+            "status": None,
+            "failed": False,
+        }
+        self.requests[request] = record
+        if span is None:
+            return
+        if len(span.requests) < MAX_EVENTS:
+            span.requests.append(record)
+        else:
+            span.dropped += 1
+
+    def _response(self, response):
+        record = self.requests.get(response.request)
+        if record:
+            record["status"] = response.status
+
+    def _request_ended(self, request, failure):
+        record = self.requests.get(request)
+        if not record:
+            return
+        record["end"] = self.now()
+        if failure:
+            record["failed"] = True
+            record["failure"] = failure
+        elif record["status"] is not None and record["status"] >= 400:
+            record["failed"] = True
+
+    def _console(self, msg):
+        if msg.type == "error":
+            self._error_event("console.error", msg.text)
+
+    def _error_event(self, name, text):
+        span = self.current
+        if span is not None:
+            span.add_event(name, message=text[:500])
+
+    # -- export ------------------------------------------------------------
+
+    def chrome_trace(self):
+        """Trace Event Format: complete events for spans and requests, instants for errors."""
+        pid = os.getpid()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": STEP_TID, "args": {"name": "steps"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": NETWORK_TID, "args": {"name": "network"}},
+        ]
+        names = {span.span_id: span.name for span in self.spans}
+        for span in self.spans:
+            events.append({
+                "name": span.name, "cat": "step", "ph": "X", "pid": pid, "tid": STEP_TID,
+                "ts": round(span.start * 1e6), "dur": round(span.duration_ms * 1000),
+                "args": span.summary(),
+            })
+            for event in span.events:
+                events.append({
+                    "name": event["name"], "cat": "console", "ph": "i", "s": "t", "pid": pid, "tid": STEP_TID,
+                    "ts": round(event["at"] * 1e6), "args": {"span": span.name, **event["attributes"]},
+                })
+        end = self.now()
+        for record in self.requests.values():
+            finished = record["end"] if record["end"] is not None else end
+            events.append({
+                "name": f"{record['method']} {record['url'].split('?')[0]}", "cat": "network", "ph": "X",
+                "pid": pid, "tid": NETWORK_TID,
+                "ts": round(record["start"] * 1e6), "dur": round((finished - record["start"]) * 1e6),
+                "args": {key: record[key] for key in ("url", "resource_type", "status", "failed")}
+                        | {"span": names.get(record["span"])},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": self.trace_id}}
+
+    def otlp(self):
+        """OTLP/JSON ExportTraceServiceRequest: one span per step, requests as child spans."""
+        spans = []
+        for span in self.spans:
+            end = span.end if span.end is not None else self.now()
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent.span_id if span.parent else "",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": self._unix_ns(span.start),
+                "endTimeUnixNano": self._unix_ns(end),
+                "attributes": _otlp_attributes(span.attributes),
+                "events": [{"timeUnixNano": self._unix_ns(e["at"]), "name": e["name"],
+                            "attributes": _otlp_attributes(e["attributes"])} for e in span.events],
+                "droppedEventsCount": span.dropped,
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            })
+            for record in span.requests:
+                finished = record["end"] if record["end"] is not None else end
+                spans.append({
+                    "traceId": self.trace_id,
+                    "spanId": _hex_id(8),
+                    "parentSpanId": span.span_id,
+                    "name": f"{record['method']} {record['url'].split('?')[0]}",
+                    "kind": 3,
+                    "startTimeUnixNano": self._unix_ns(record["start"]),
+                    "endTimeUnixNano": self._unix_ns(finished),
+                    "attributes": _otlp_attributes({
+                        "http.request.method": record["method"],
+                        "url.full": record["url"],
+                        "http.response.status_code": record["status"],
+                        "resource_type": record["resource_type"],
+                    }),
+                    "status": {"code": 2, "message": record.get("failure") or ""} if record["failed"] else {"code": 0},
+                })
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.name})},
+            "scopeSpans": [{"scope": {"name": "harness.tracing"}, "spans": spans}],
+        }]}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def write_otlp(self, path):
+        with open(path, "w") as f:
+            json.dump(self.otlp(), f)
+        return path
+
+    def steps(self):
+        """Top-level spans, as summary dicts for a results file."""
+        return [span.summary() for span in self.spans if span.parent is None]
+
+    def print_waterfall(self, slow_ms=1000):
+        """One line per span, indented by depth; spans over slow_ms are flagged."""
+        for span in self.spans:
+            status = "❌" if span.error else ("🐢" if span.duration_ms > slow_ms else "✅")
+            extra = f", {len(span.requests)} requests" if span.requests else ""
+            print(f"   {status} {'  ' * span.depth}{span.name}: {span.duration_ms:.0f} ms{extra}"
+                  + (f" ({span.error[:80]})" if span.error else ""))
+
+
+@contextlib.contextmanager
+def retain_on_failure(context, tracer, path):
+    """Record a Playwright trace for the block; keep the zip at `path` only if the run failed.
+
+    With path None nothing is recorded at all.
+    """
+    if not path:
+        yield
+        return
+    context.tracing.start(screenshots=True, snapshots=True)
+    failed = True
+    try:
+        yield
+        failed = tracer.failed
+    finally:
+        context.tracing.stop(path=path if failed else None)
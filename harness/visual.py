@@ -0,0 +1,212 @@
+"""
+Visual checks for the Playwright scripts: clipped captures compared against baselines.
+
+    checker = visual.Checker(page)
+    checker.capture("window_open", waits.CHAT_WINDOW, regions=WINDOW_REGIONS)
+    ...
+    report = checker.finish()
+
+capture() is the only part on the Playwright thread: one page.evaluate for
+the element's box and one CDP Page.captureScreenshot clipped to it, with
+Chromium's fast PNG encoder (optimizeForSpeed). Everything after that runs
+in a thread pool while the script carries on: the capture is written out,
+decoded (harness/png.py) and compared with baselines/visual/<name>.png.
+The first capture of a name, or any capture with update=True, becomes the
+baseline.
+
+The comparison is pixelmatch's perceptual colour distance (YIQ,
+https://github.com/mapbox/pixelmatch), over whole frames at once in NumPy.
+Regions give parts of the frame their own rules: each is a box in
+fractions of the frame, a per-pixel threshold (0-1, how different a pixel
+must look to count) and max_ratio, the share of its pixels allowed to
+differ. A pixel belongs to the last region that covers it, so a loose box
+for timestamps can sit inside a strict one for the whole window. A diff
+image (baseline faded to grey, differing pixels red) is only encoded for
+captures that fail.
+
+finish() waits for the pool and reports per capture: capture_ms on the
+Playwright thread, then decode_ms / compare_ms / encode_ms in the pool.
+"""
+
+import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from harness import png
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(HERE, "baselines", "visual")
+OUTPUT_DIR = "/tmp/visual"
+
+# pixelmatch's largest possible YIQ distance
+MAX_DELTA = 35215.0
+FRAME = {"name": "frame", "box": (0, 0, 1, 1), "threshold": 0.1, "max_ratio": 0.001}
+
+CLIP_JS = """(selector) => {
+    const el = selector ? document.querySelector(selector) : null
+    const rect = el ? el.getBoundingClientRect() : { x: 0, y: 0, width: innerWidth, height: innerHeight }
+    return { x: rect.x + scrollX, y: rect.y + scrollY, width: rect.width, height: rect.height }
+}"""
+
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _yiq(rgb):
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    return (0.29889531 * r + 0.58662247 * g + 0.11448223 * b,
+            0.59597799 * r - 0.27417610 * g - 0.32180189 * b,
+            0.21147017 * r - 0.52261711 * g + 0.31114694 * b)
+
+
+def _rgb(pixels):
+    """Float RGB over a white background, whatever the channel count."""
+    pixels = pixels.astype(np.float32)
+    if pixels.shape[2] in (1, 2):
+        pixels = np.concatenate([pixels[..., :1]] * 3 + [pixels[..., 1:]], axis=2)
+    if pixels.shape[2] == 4:
+        alpha = pixels[..., 3:] / 255
+        return 255 + (pixels[..., :3] - 255) * alpha
+    return pixels
+
+
+def perceptual_delta(a, b):
+    """Per-pixel YIQ distance between two same-sized frames, 0 (same) to 1."""
+    ya, ia, qa = _yiq(_rgb(a))
+    yb, ib, qb = _yiq(_rgb(b))
+    delta = 0.5053 * (ya - yb) ** 2 + 0.299 * (ia - ib) ** 2 + 0.1957 * (qa - qb) ** 2
+    return np.sqrt(delta / MAX_DELTA)
+
+
+def _region_map(shape, regions):
+    """Which region owns each pixel, and that region's threshold per pixel."""
+    height, width = shape
+    owner = np.zeros(shape, dtype=np.int16)
+    threshold = np.empty(shape, dtype=np.float32)
+    for index, region in enumerate(regions):
+        x0, y0, x1, y1 = region["box"]
+        rows = slice(round(y0 * height), round(y1 * height))
+        cols = slice(round(x0 * width), round(x1 * width))
+        owner[rows, cols] = index
+        threshold[rows, cols] = region["threshold"]
+    return owner, threshold
+
+
+def compare(baseline, current, regions=()):
+    """{regions: [...], failed, mask} for two frames; regions as in the module docstring."""
+    regions = [FRAME, *regions]
+    owner, threshold = _region_map(current.shape[:2], regions)
+    differs = perceptual_delta(baseline, current) > threshold
+
+    totals = np.bincount(owner.ravel(), minlength=len(regions))
+    changed = np.bincount(owner[differs], minlength=len(regions))
+    results = []
+    for region, total, count in zip(regions, totals, changed):
+        ratio = float(count) / total if total else 0.0
+        results.append({
+            "name": region["name"],
+            "pixels": int(total),
+            "changed": int(count),
+            "ratio": round(ratio, 5),
+            "max_ratio": region["max_ratio"],
+            "failed": bool(ratio > region["max_ratio"]),
+        })
+    return {"regions": results, "failed": any(r["failed"] for r in results), "mask": differs}
+
+
+def diff_image(baseline, mask):
+    """The baseline faded to grey, with the differing pixels in red."""
+    y, _, _ = _yiq(_rgb(baseline))
+    faded = (255 - (255 - y) * 0.3).astype(np.uint8)
+    image = np.repeat(faded[..., None], 3, axis=2)
+    image[mask] = (255, 0, 0)
+    return image
+
+
+class Checker:
+    """Captures on the Playwright thread; writes and compares in a pool."""
+
+    def __init__(self, page, baseline_dir=BASELINE_DIR, output_dir=OUTPUT_DIR, update=False, workers=2):
+        self.page = page
+        self.cdp = page.context.new_cdp_session(page)
+        self.baseline_dir = baseline_dir
+        self.output_dir = output_dir
+        self.update = update
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="visual")
+        self.pending = []
+        self.last_capture_ms = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def capture(self, name, selector=None, regions=(), compare=True):
+        """Capture `selector`'s box (the viewport without one) as <name>.png; returns its path."""
+        started = time.perf_counter()
+        clip = self.page.evaluate(CLIP_JS, selector)
+        shot = self.cdp.send("Page.captureScreenshot", {
+            "format": "png",
+            "clip": {**clip, "scale": 1},
+            "optimizeForSpeed": True,
+        })
+        capture_ms = self.last_capture_ms = _ms(started)
+
+        path = os.path.join(self.output_dir, f"{name}.png")
+        self.pending.append(self.pool.submit(self._process, name, shot["data"], path, list(regions), compare,
+                                             capture_ms))
+        return path
+
+    def _process(self, name, data, path, regions, check, capture_ms):
+        result = {"name": name, "path": path, "capture_ms": capture_ms, "status": "captured"}
+        encoded = base64.b64decode(data)
+        with open(path, "wb") as f:
+            f.write(encoded)
+        if not check:
+            return result
+
+        baseline_path = os.path.join(self.baseline_dir, f"{name}.png")
+        if self.update or not os.path.exists(baseline_path):
+            os.makedirs(self.baseline_dir, exist_ok=True)
+            with open(baseline_path, "wb") as f:
+                f.write(encoded)
+            result["status"] = "updated" if self.update else "new"
+            return result
+
+        started = time.perf_counter()
+        with open(baseline_path, "rb") as f:
+            baseline = png.decode(f.read())
+        current = png.decode(encoded)
+        result["decode_ms"] = _ms(started)
+
+        if baseline.shape[:2] != current.shape[:2]:
+            result.update(status="failed", reason=f"size {baseline.shape[1]}x{baseline.shape[0]}"
+                                                  f" -> {current.shape[1]}x{current.shape[0]}")
+            return result
+
+        started = time.perf_counter()
+        outcome = compare(baseline, current, regions)
+        result["compare_ms"] = _ms(started)
+        result["regions"] = outcome["regions"]
+        result["status"] = "failed" if outcome["failed"] else "passed"
+
+        if outcome["failed"]:
+            started = time.perf_counter()
+            result["diff"] = os.path.join(self.output_dir, f"{name}.diff.png")
+            with open(result["diff"], "wb") as f:
+                f.write(png.encode(diff_image(baseline, outcome["mask"])))
+            result["encode_ms"] = _ms(started)
+        return result
+
+    def finish(self):
+        """Wait for every capture's comparison; {captures, failed, totals}."""
+        captures = [future.result() for future in self.pending]
+        self.pending = []
+        self.pool.shutdown()
+        totals = {key: round(sum(c.get(key, 0) for c in captures), 1)
+                  for key in ("capture_ms", "decode_ms", "compare_ms", "encode_ms")}
+        return {
+            "captures": captures,
+            "failed": [c["name"] for c in captures if c["status"] == "failed"],
+            "totals": totals,
+        }
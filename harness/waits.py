@@ -0,0 +1,213 @@
+"""
+Event-driven readiness waits for the chatbot scripts.
+
+Each primitive runs as a single page.evaluate() of an async function that
+resolves as soon as the UI is actually ready (MutationObserver /
+transitionend, never a fixed sleep) and reports how long it waited:
+
+    {"waited_ms": 123.4}
+
+The helpers return whatever page.evaluate() returns, so they work with both
+Playwright APIs: call them directly with sync_api, await them with async_api.
+A wait that times out raises like any other page.evaluate() error.
+"""
+
+DEFAULT_TIMEOUT_MS = 15000
+
+WIDGET = ".fixed.bottom-6.right-6"
+CHAT_WINDOW = WIDGET + " > .bg-slate-800.rounded-2xl"
+MESSAGES = CHAT_WINDOW + " .overflow-y-auto"
+# MessageBubble renders assistant replies as .justify-start > .group; the
+# typing indicator is also .justify-start but has no .group wrapper
+ASSISTANT_BUBBLE = MESSAGES + " > .justify-start > .group"
+TYPING_INDICATOR = MESSAGES + " .animate-bounce"
+# A reply still streaming in from Gemini
+STREAMING = MESSAGES + " [data-streaming]"
+
+# Shared scaffolding: waitFor(check, root, timeoutMs) resolves with the wait
+# duration once check() is truthy, re-checking on every DOM mutation under root
+# and on transitionend/animationend.
+_WAIT_FOR = """
+const waitFor = (check, root, timeoutMs) => new Promise((resolve, reject) => {
+    const started = performance.now()
+    const done = () => ({ waited_ms: Math.round((performance.now() - started) * 10) / 10 })
+    if (check()) return resolve(done())
+
+    let timer = null
+    const observer = new MutationObserver(() => poke())
+    const cleanup = () => {
+        observer.disconnect()
+        document.removeEventListener('transitionend', poke, true)
+        document.removeEventListener('animationend', poke, true)
+        clearTimeout(timer)
+    }
+    function poke() {
+        if (!check()) return
+        cleanup()
+        resolve(done())
+    }
+    observer.observe(root, { childList: true, subtree: true, attributes: true, characterData: true })
+    document.addEventListener('transitionend', poke, true)
+    document.addEventListener('animationend', poke, true)
+    timer = setTimeout(() => {
+        cleanup()
+        reject(new Error(`wait timed out after ${timeoutMs} ms`))
+    }, timeoutMs)
+})
+"""
+
+APP_MOUNTED_JS = _WAIT_FOR + """
+return waitFor(() => {
+    const app = document.querySelector('#app')
+    return !!(app && app.__vue_app__ && app.children.length)
+}, document.documentElement, timeoutMs)
+"""
+
+CHAT_WINDOW_READY_JS = _WAIT_FOR + """
+// Transition's enter-active classes (ease-out) are removed on transitionend
+return waitFor(() => {
+    const win = document.querySelector(selectors.window)
+    return !!win
+        && !win.classList.contains('ease-out')
+        && win.getAnimations().every(a => a.playState === 'finished')
+}, document.body, timeoutMs)
+"""
+
+CHAT_WINDOW_CLOSED_JS = _WAIT_FOR + """
+return waitFor(() => !document.querySelector(selectors.window), document.body, timeoutMs)
+"""
+
+# ChatWindow only renders the latest messages, so the count comes from its
+# data-assistant-count (every assistant message so far) where the build has it
+_ASSISTANT_COUNT = """
+const assistantCount = () => {
+    const messages = document.querySelector(selectors.messages)
+    const counted = messages && messages.dataset.assistantCount
+    return counted !== undefined && counted !== null
+        ? Number(counted)
+        : document.querySelectorAll(selectors.bubble).length
+}
+"""
+
+COUNT_ASSISTANT_BUBBLES_JS = _ASSISTANT_COUNT + """
+return assistantCount()
+"""
+
+ASSISTANT_BUBBLE_JS = _WAIT_FOR + _ASSISTANT_COUNT + """
+return waitFor(
+    () => assistantCount() > baseline,
+    document.querySelector(selectors.messages) || document.body,
+    timeoutMs,
+)
+"""
+
+PROCESSING_DONE_JS = _WAIT_FOR + """
+// isProcessing drives the typing indicator; a streamed reply is done once its
+// bubble drops data-streaming
+return waitFor(() => {
+    return !!document.querySelector(selectors.window + ' textarea')
+        && !document.querySelector(selectors.typing)
+        && !document.querySelector(selectors.streaming)
+}, document.body, timeoutMs)
+"""
+
+# Not DOM-driven: resolves when performance.mark(name) has been recorded, with
+# the mark's startTime (ms since navigation start) alongside the wait
+PERFORMANCE_MARK_JS = """
+const found = () => performance.getEntriesByName(name, 'mark')[0]
+return new Promise((resolve, reject) => {
+    const started = performance.now()
+    const done = () => ({
+        waited_ms: Math.round((performance.now() - started) * 10) / 10,
+        start_ms: Math.round(found().startTime * 10) / 10,
+    })
+    if (found()) return resolve(done())
+
+    const observer = new PerformanceObserver(() => {
+        if (!found()) return
+        observer.disconnect()
+        clearTimeout(timer)
+        resolve(done())
+    })
+    observer.observe({ type: 'mark' })
+    const timer = setTimeout(() => {
+        observer.disconnect()
+        reject(new Error(`wait for mark ${name} timed out after ${timeoutMs} ms`))
+    }, timeoutMs)
+})
+"""
+
+# useOutbox's queue is empty: right away if nothing is pending, otherwise at
+# the next outbox:drained mark (cleared first, so an earlier drain won't do)
+OUTBOX_DRAINED_JS = """
+const outbox = window.__fiDebug && window.__fiDebug.outbox
+if (outbox && outbox.pending === 0) return { waited_ms: 0, start_ms: null }
+performance.clearMarks(name)
+""" + PERFORMANCE_MARK_JS
+
+# useGeminiQueue has nothing queued, backing off or running: right away if
+# so already, otherwise at the next gemini:idle mark
+GEMINI_IDLE_JS = """
+const queue = window.__fiDebug && window.__fiDebug.gemini
+if (!queue || (queue.queued === 0 && queue.running === 0)) return { waited_ms: 0, start_ms: null }
+performance.clearMarks(name)
+""" + PERFORMANCE_MARK_JS
+
+_SELECTORS = {
+    "window": CHAT_WINDOW,
+    "messages": MESSAGES,
+    "bubble": ASSISTANT_BUBBLE,
+    "typing": TYPING_INDICATOR,
+    "streaming": STREAMING,
+}
+
+
+def _run(page, body, **args):
+    params = ", ".join(args)
+    source = f"async ({{ {params} }}) => {{ {body} }}"
+    return page.evaluate(source, args)
+
+
+def app_mounted(page, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """The Vue app is mounted on #app and has rendered."""
+    return _run(page, APP_MOUNTED_JS, timeoutMs=timeout_ms)
+
+
+def chat_window_ready(page, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """ChatWindow is in the DOM and ChatWidget's enter Transition has finished."""
+    return _run(page, CHAT_WINDOW_READY_JS, selectors=_SELECTORS, timeoutMs=timeout_ms)
+
+
+def chat_window_closed(page, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """ChatWindow's leave Transition has finished and it is gone."""
+    return _run(page, CHAT_WINDOW_CLOSED_JS, selectors=_SELECTORS, timeoutMs=timeout_ms)
+
+
+def count_assistant_bubbles(page):
+    """Number of assistant messages so far, the baseline for assistant_bubble_appended()."""
+    return _run(page, COUNT_ASSISTANT_BUBBLES_JS, selectors=_SELECTORS)
+
+
+def assistant_bubble_appended(page, baseline, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """A new assistant MessageBubble appeared beyond `baseline`."""
+    return _run(page, ASSISTANT_BUBBLE_JS, selectors=_SELECTORS, baseline=baseline, timeoutMs=timeout_ms)
+
+
+def processing_done(page, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """useChatbot.isProcessing is false again and no reply is still streaming."""
+    return _run(page, PROCESSING_DONE_JS, selectors=_SELECTORS, timeoutMs=timeout_ms)
+
+
+def performance_mark(page, name, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """performance.mark(name) was recorded; also returns its start_ms."""
+    return _run(page, PERFORMANCE_MARK_JS, name=name, timeoutMs=timeout_ms)
+
+
+def outbox_drained(page, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """Every write queued in useOutbox has reached Supabase (or been rejected)."""
+    return _run(page, OUTBOX_DRAINED_JS, name="outbox:drained", timeoutMs=timeout_ms)
+
+
+def gemini_idle(page, timeout_ms=DEFAULT_TIMEOUT_MS):
+    """Every Gemini call in useGeminiQueue has finished, retries included."""
+    return _run(page, GEMINI_IDLE_JS, name="gemini:idle", timeoutMs=timeout_ms)
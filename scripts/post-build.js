@@ -1,9 +1,11 @@
 // Post-build script: Create a redirect at repo root for Hostinger
 // This allows Hostinger to serve from / and redirect to /dist/
+// It also writes the service worker (dist/sw.js) with this build's precache list
 
-import { writeFileSync, readFileSync } from 'fs';
-import { join, dirname } from 'path';
+import { writeFileSync, readFileSync, readdirSync, statSync } from 'fs';
+import { join, dirname, relative, sep } from 'path';
 import { fileURLToPath } from 'url';
+import { createHash } from 'crypto';
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
 const rootDir = join(__dirname, '..');
@@ -36,3 +38,35 @@ try {
   console.error('❌ dist/index.html not found - build may have failed');
   process.exit(1);
 }
+
+// Generate the service worker: every file in dist/ is precached, under a
+// version that changes whenever any of them does
+const distDir = join(rootDir, 'dist');
+
+function listFiles(dir) {
+  return readdirSync(dir).flatMap(name => {
+    const path = join(dir, name);
+    return statSync(path).isDirectory() ? listFiles(path) : [path];
+  });
+}
+
+const precache = listFiles(distDir)
+  .map(path => '/' + relative(distDir, path).split(sep).join('/'))
+  .filter(url => url !== '/sw.js' && !url.endsWith('.map'))
+  .sort();
+
+const hash = createHash('sha256');
+for (const url of precache) {
+  hash.update(url);
+  hash.update(readFileSync(join(distDir, url)));
+}
+const version = hash.digest('hex').slice(0, 12);
+
+const worker = readFileSync(join(__dirname, 'service-worker.js'), 'utf-8');
+writeFileSync(join(distDir, 'sw.js'), [
+  `const VERSION = ${JSON.stringify(version)};`,
+  `const PRECACHE = ${JSON.stringify(precache, null, 2)};`,
+  '',
+  worker,
+].join('\n'));
+console.log(`✅ Created dist/sw.js precaching ${precache.length} files (version ${version})`);
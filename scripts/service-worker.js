@@ -0,0 +1,147 @@
+// Service worker for the built app. scripts/post-build.js writes it to
+// dist/sw.js with two constants in front of this file:
+//
+//   VERSION   hash of the build's files; a new build gets new caches (both
+//             the precache and the API cache) and activate drops the old ones
+//   PRECACHE  every file in dist/ ('/index.html', '/assets/index-*.js', ...)
+//
+// Hashed assets and the favicon are served from the precache and never
+// revalidated: a new build has new names. Navigations go to the network
+// first, so a deploy shows up on the next visit, and fall back to the cached
+// app shell offline.
+//
+// The Supabase reads the offline dashboard paints from are cached too:
+//   - the snapshot tables are stale-while-revalidate, so a repeat visit
+//     paints the last-known figures without waiting for Supabase (the raw
+//     reads reconcile them, as on a cold load)
+//   - the aggregate RPCs are network-first, with the last-known response
+//     when the network is down or slower than NETWORK_TIMEOUT_MS
+// Raw table reads are not cached: every keyset page of TransactionsPage is
+// a distinct URL, and the cache would grow with each one scrolled. The API
+// cache is also capped at MAX_API_ENTRIES, oldest write dropped first.
+// Writes always go straight to the network.
+
+/* global VERSION, PRECACHE */
+
+const PRECACHE_NAME = `fi-precache-${VERSION}`
+const API_CACHE_NAME = `fi-api-${VERSION}`
+const CACHE_PREFIXES = ['fi-precache-', 'fi-api-']
+const SHELL = '/index.html'
+const NETWORK_TIMEOUT_MS = 4000
+// A few snapshot rows and one RPC answer per month start: this is headroom
+const MAX_API_ENTRIES = 50
+
+const SUPABASE_PATH = /^\/rest\/v1\/([a-z_]+|rpc\/[a-z_]+)$/
+const SNAPSHOT_TABLES = ['net_worth_snapshots', 'dashboard_metrics']
+// Read-only RPCs, called with POST: cached under their body
+const READ_RPCS = ['rpc/expense_category_totals', 'rpc/income_breakdown']
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(PRECACHE_NAME)
+      .then(cache => cache.addAll(PRECACHE))
+      .then(() => self.skipWaiting())
+  )
+})
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys().then(names => Promise.all(
+      names
+        .filter(name => CACHE_PREFIXES.some(prefix => name.startsWith(prefix)))
+        .filter(name => name !== PRECACHE_NAME && name !== API_CACHE_NAME)
+        .map(name => caches.delete(name))
+    ))
+  )
+})
+
+self.addEventListener('fetch', event => {
+  const { request } = event
+  const url = new URL(request.url)
+
+  if (url.origin === self.location.origin) {
+    if (request.mode === 'navigate') {
+      event.respondWith(navigation(request))
+    } else if (request.method === 'GET' && PRECACHE.includes(url.pathname)) {
+      event.respondWith(precached(request))
+    }
+    return
+  }
+
+  const match = url.hostname.endsWith('.supabase.co') && url.pathname.match(SUPABASE_PATH)
+  if (!match) return
+  const resource = match[1]
+  if (request.method === 'GET' && SNAPSHOT_TABLES.includes(resource)) {
+    event.respondWith(staleWhileRevalidate(event, request, request))
+  } else if (request.method === 'POST' && READ_RPCS.includes(resource)) {
+    event.respondWith(request.clone().text().then(body => {
+      // The Cache API only stores GETs: key the answer by URL and body
+      const key = `${request.url}?__body=${encodeURIComponent(body)}`
+      return networkFirst(event, request, key)
+    }))
+  }
+})
+
+async function navigation(request) {
+  try {
+    return await fetch(request)
+  } catch (err) {
+    const shell = await caches.match(SHELL, { cacheName: PRECACHE_NAME })
+    if (shell) return shell
+    throw err
+  }
+}
+
+async function precached(request) {
+  const cached = await caches.match(request, { cacheName: PRECACHE_NAME })
+  return cached || fetch(request)
+}
+
+// Successful responses only: an error page must not replace the last good one
+async function store(key, response) {
+  if (!response.ok) return
+  const cache = await caches.open(API_CACHE_NAME)
+  await cache.put(key, response)
+  // keys() lists entries in the order they were written
+  const keys = await cache.keys()
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - MAX_API_ENTRIES)).map(old => cache.delete(old)))
+}
+
+// The network answer, saved under `key` before the event is let go
+function fetchAndStore(event, request, key) {
+  return fetch(request).then(response => {
+    event.waitUntil(store(key, response.clone()))
+    return response
+  })
+}
+
+async function staleWhileRevalidate(event, request, key) {
+  const cache = await caches.open(API_CACHE_NAME)
+  const cached = await cache.match(key, { ignoreVary: true })
+  const network = fetchAndStore(event, request, key)
+  if (!cached) return network
+  // Revalidation outlives the response; failures are fine, the copy stays
+  event.waitUntil(network.catch(() => undefined))
+  return cached
+}
+
+async function networkFirst(event, request, key) {
+  const network = fetchAndStore(event, request, key)
+  event.waitUntil(network.catch(() => undefined))
+
+  let timer
+  const timeout = new Promise(resolve => {
+    timer = setTimeout(resolve, NETWORK_TIMEOUT_MS)
+  })
+  try {
+    const response = await Promise.race([network, timeout])
+    if (response) return response
+  } catch (err) {
+    // Offline: the cached answer, if any
+  } finally {
+    clearTimeout(timer)
+  }
+
+  const cached = await caches.match(key, { cacheName: API_CACHE_NAME, ignoreVary: true })
+  return cached || network
+}
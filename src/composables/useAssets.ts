@@ -1,5 +1,6 @@
 import { ref, computed } from 'vue'
 import { useSupabase } from './useSupabase'
+import { ensureFresh, markFetched, notifyInsert } from './useDataStore'
 import type { FinancialAsset } from '@/types/database'
 
 export const ASSET_TYPES = [
@@ -11,10 +12,12 @@ export const ASSET_TYPES = [
   { value: 'other', label: 'Other' },
 ] as const
 
+// Shared by every useAssets() caller
+const assets = ref<FinancialAsset[]>([])
+
 export function useAssets() {
   const { supabase, userId } = useSupabase()
 
-  const assets = ref<FinancialAsset[]>([])
   const loading = ref(false)
   const error = ref<string | null>(null)
 
@@ -47,6 +50,7 @@ export function useAssets() {
       if (fetchError) throw fetchError
 
       assets.value = data || []
+      markFetched('financial_assets')
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to fetch assets'
     } finally {
@@ -71,6 +75,7 @@ export function useAssets() {
       if (insertError) throw insertError
 
       assets.value.unshift(data)
+      notifyInsert('financial_assets', data)
       return data
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to add asset'
@@ -80,6 +85,10 @@ export function useAssets() {
     }
   }
 
+  function loadAssets() {
+    return ensureFresh('financial_assets', fetchAssets)
+  }
+
   return {
     assets,
     loading,
@@ -87,6 +96,7 @@ export function useAssets() {
     totalAssets,
     assetsByType,
     fetchAssets,
+    loadAssets,
     addAsset,
   }
 }
@@ -0,0 +1,110 @@
+// Small LRU cache with per-entry TTL, persisted to sessionStorage so cached
+// Gemini intents and replies survive a reload within the same tab.
+
+export interface CacheStats {
+  hits: number
+  misses: number
+  evictions: number
+  size: number
+}
+
+interface CacheEntry<T> {
+  value: T
+  expires: number
+}
+
+export interface CacheOptions {
+  maxEntries: number
+  ttlMs: number
+}
+
+const STORAGE_PREFIX = 'fi-cache:'
+
+// Utterances differing only in case, spacing or trailing punctuation share an entry
+export function normalizeKey(text: string): string {
+  return text.toLowerCase().replace(/\s+/g, ' ').replace(/[\s?!.]+$/, '').trim()
+}
+
+// FNV-1a; enough to tell two context summaries apart, not a security hash
+export function hashString(text: string): string {
+  let hash = 0x811c9dc5
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i)
+    hash = Math.imul(hash, 0x01000193)
+  }
+  return (hash >>> 0).toString(16)
+}
+
+export function createCache<T>(name: string, options: CacheOptions) {
+  const storageKey = STORAGE_PREFIX + name
+  // Map iteration order is insertion order: first key = least recently used
+  const entries = new Map<string, CacheEntry<T>>()
+  const stats: CacheStats = { hits: 0, misses: 0, evictions: 0, size: 0 }
+
+  function load(): void {
+    try {
+      const stored = sessionStorage.getItem(storageKey)
+      if (!stored) return
+      const now = Date.now()
+      for (const [key, entry] of JSON.parse(stored) as [string, CacheEntry<T>][]) {
+        if (entry.expires > now) entries.set(key, entry)
+      }
+      stats.size = entries.size
+    } catch (err) {
+      console.warn(`[Cache] Could not restore ${name}:`, err)
+    }
+  }
+
+  function persist(): void {
+    try {
+      sessionStorage.setItem(storageKey, JSON.stringify([...entries]))
+    } catch (err) {
+      // Quota exceeded or storage disabled: keep working from memory
+      console.warn(`[Cache] Could not persist ${name}:`, err)
+    }
+  }
+
+  function get(key: string): T | undefined {
+    const entry = entries.get(key)
+    if (!entry || entry.expires <= Date.now()) {
+      if (entry) {
+        entries.delete(key)
+        stats.size = entries.size
+        persist()
+      }
+      stats.misses++
+      return undefined
+    }
+    // Move to the most recently used end
+    entries.delete(key)
+    entries.set(key, entry)
+    stats.hits++
+    return entry.value
+  }
+
+  function set(key: string, value: T): void {
+    entries.delete(key)
+    entries.set(key, { value, expires: Date.now() + options.ttlMs })
+    while (entries.size > options.maxEntries) {
+      entries.delete(entries.keys().next().value as string)
+      stats.evictions++
+    }
+    stats.size = entries.size
+    persist()
+  }
+
+  function clear(): void {
+    entries.clear()
+    stats.size = 0
+    sessionStorage.removeItem(storageKey)
+  }
+
+  load()
+
+  return {
+    get,
+    set,
+    clear,
+    stats
+  }
+}
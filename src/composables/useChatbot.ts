@@ -1,11 +1,16 @@
-import { ref, computed } from 'vue'
-import { useGemini, type ParsedIntent } from './useGemini'
+import { ref, computed, nextTick, watch } from 'vue'
+import { useGemini, type EntryAction, type IntentEntry, type ParsedIntent } from './useGemini'
+import { cancelLane } from './useGeminiQueue'
+import { normalizeKey } from './useCache'
 import { useVoice } from './useVoice'
 import { useExpenses } from './useExpenses'
 import { usePassiveIncome } from './usePassiveIncome'
 import { useFDs } from './useFDs'
 import { useFIProgress } from './useFIProgress'
 import { useAssets } from './useAssets'
+import { onSync } from './useDataStore'
+import type { OutboxTable } from './useOutbox'
+import type { VoiceStats } from '@/types/debug'
 
 export interface ChatMessage {
   id: string
@@ -14,6 +19,8 @@ export interface ChatMessage {
   timestamp: Date
   intent?: ParsedIntent
   status?: 'pending' | 'confirmed' | 'cancelled'
+  // Reply still being streamed in from Gemini
+  streaming?: boolean
 }
 
 interface PendingAction {
@@ -21,21 +28,156 @@ interface PendingAction {
   messageId: string
 }
 
+// One entry of a confirmed intent: queued in the outbox as `id` (the row's
+// client_id), or not, with `error`. Supabase rejecting it later sets `error` too.
+interface EntryResult {
+  entry: IntentEntry
+  id?: string
+  error?: string
+}
+
+// The reply to a confirmation. It says "queued" until Supabase has
+// acknowledged or rejected every entry, then what was saved.
+interface Receipt {
+  message: ChatMessage
+  results: EntryResult[]
+  waiting: number
+  offline: boolean
+}
+
+const ENTRY_ACTIONS: EntryAction[] = ['add_expense', 'add_income', 'add_fd']
+const OUTBOX_TABLES: OutboxTable[] = ['expenses', 'passive_income', 'fd_tracker']
+
+// useGeminiQueue lane for parsing typed and spoken messages: a newer message
+// aborts the parse of the one before it
+const CHAT_LANE = 'chat'
+
+// Voice input is parsed speculatively: once the interim transcript has held
+// still for STABLE_MS, its parse starts while the user may still be talking,
+// and the final transcript reuses it when it says the same thing
+const STABLE_MS = 300
+const MIN_SPECULATIVE_WORDS = 3
+const VOICE_LANE = 'voice'
+
+const voiceStats: VoiceStats = { speculated: 0, reused: 0, discarded: 0 }
+window.__fiDebug = { ...window.__fiDebug, voice: voiceStats }
+
+interface Speculation {
+  text: string
+  intent: Promise<ParsedIntent>
+}
+
+// Lowercase words and numbers; decimals ("1.5", "7.25%") keep their point,
+// digit groups ("1,200") lose their commas
+function transcriptWords(text: string): string[] {
+  return text.toLowerCase()
+    .replace(/(\d),(?=\d)/g, '$1')
+    .replace(/[^a-z0-9.%\s]/g, ' ')
+    .replace(/\.(?!\d)/g, ' ')
+    .split(/\s+/)
+    .filter(Boolean)
+}
+
+// Endings the recogniser adds or drops while it revises a word
+const INFLECTIONS = ['s', 'es', 'ed', 'ing', 'al', 'ly']
+
+// One word is the other plus an inflection: "grocery" / "groceries",
+// "rent" / "rental", "save" / "saving". Lookalikes such as "milk" / "mile"
+// or "food" / "foot" are different words.
+function sameStem(a: string, b: string): boolean {
+  const [short, long] = a.length <= b.length ? [a, b] : [b, a]
+  if (short.length < 3) return false
+  const stems = new Set([short, short.replace(/y$/, 'i'), short.replace(/e$/, '')])
+  return [...stems].some(stem => long.startsWith(stem) && INFLECTIONS.includes(long.slice(stem.length)))
+}
+
+/**
+ * Whether a speculative parse of `interim` also holds for `final`: the same
+ * words but for case, punctuation and at most one word the recogniser revised
+ * to a variant of itself. Any added or dropped word, or any changed number,
+ * needs a fresh parse.
+ */
+export function sameUtterance(interim: string, final: string): boolean {
+  const a = transcriptWords(interim)
+  const b = transcriptWords(final)
+  if (a.length !== b.length) return false
+  const changed = a.filter((word, i) => word !== b[i]).length
+  if (changed === 0) return true
+  if (changed > 1) return false
+  const i = a.findIndex((word, j) => word !== b[j])
+  return !/\d/.test(a[i] + b[i]) && sameStem(a[i], b[i])
+}
+
+// performance.mark() hooks around sendMessage, read by the Playwright latency
+// benchmark (harness/bench_chat.py): parse -> fetch -> render. Streamed
+// replies also mark their first rendered token (chat:ttft).
+const SEND_STAGES = ['send', 'parsed', 'fetched', 'first-token', 'rendered'] as const
+type SendStage = typeof SEND_STAGES[number]
+const SEND_MEASURES = ['parse', 'fetch', 'render', 'total', 'ttft']
+
+// Oldest messages are dropped past this; ChatWindow renders fewer still
+const MAX_MESSAGES = 200
+
+function markSend(stage: SendStage): void {
+  if (stage === 'send') {
+    // Only the latest send's entries are kept, or a long session's
+    // performance timeline grows with every message
+    SEND_STAGES.forEach(s => performance.clearMarks(`chat:${s}`))
+    SEND_MEASURES.forEach(m => performance.clearMeasures(`chat:${m}`))
+  }
+  performance.mark(`chat:${stage}`)
+}
+
+function measureSend(): void {
+  performance.measure('chat:parse', 'chat:send', 'chat:parsed')
+  performance.measure('chat:fetch', 'chat:parsed', 'chat:fetched')
+  performance.measure('chat:render', 'chat:fetched', 'chat:rendered')
+  performance.measure('chat:total', 'chat:send', 'chat:rendered')
+  if (performance.getEntriesByName('chat:first-token', 'mark').length) {
+    performance.measure('chat:ttft', 'chat:send', 'chat:first-token')
+  }
+}
+
 export function useChatbot() {
   const messages = ref<ChatMessage[]>([])
-  const isOpen = ref(false)
   const pendingAction = ref<PendingAction | null>(null)
+  // Assistant messages added so far, trimmed ones included
+  const assistantCount = ref(0)
 
   // Composables
-  const { parseUserInput, generateResponse, isLoading: geminiLoading, isConfigured } = useGemini()
-  const { isListening, isSpeaking, startListening, stopListening, speak, isSupported: voiceSupported } = useVoice()
-  const { addExpense, fetchExpenses, expenses } = useExpenses()
-  const { addIncome, fetchIncomes, incomes } = usePassiveIncome()
-  const { addFD, fetchFDs, activeFDs, upcomingMaturities, totalFDValue } = useFDs()
-  const { fiProgress } = useFIProgress()
-  const { assets, netWorth, fetchAssets } = useAssets()
-
-  const isProcessing = computed(() => geminiLoading.value)
+  const { parseUserInput, streamResponse, isLoading: geminiLoading, isConfigured } = useGemini()
+  const { isListening, isSpeaking, transcript, startListening, stopListening, speak, isSupported: voiceSupported } = useVoice()
+  const { addExpenses, loadMonthlyTotals, monthlyTotals } = useExpenses()
+  const { addIncomes } = usePassiveIncome()
+  const { addFDs, loadFDs, activeFDs, upcomingMaturities, totalFDValue } = useFDs()
+  const { fiProgress, load: loadMonthlyIncome } = useFIProgress()
+  // useAssets has no liabilities, so net worth is the asset total
+  const { assets, totalAssets: netWorth, loadAssets } = useAssets()
+
+  // A speculative parse runs quietly; the send that reuses it shows as processing
+  const awaitingSpeculation = ref(false)
+  const isProcessing = computed(() => geminiLoading.value || awaitingSpeculation.value)
+
+  // The reply currently streaming in, if any
+  let activeStream: AbortController | null = null
+  // Bumped per sendMessage; a send that is no longer the latest drops its reply
+  let sendSeq = 0
+
+  // Receipts by the client_id of each entry still in the outbox
+  const receipts = new Map<string, Receipt>()
+  OUTBOX_TABLES.forEach(table => onSync(table, (queued, saved, error) => {
+    const id = (queued as { id: string }).id
+    const receipt = receipts.get(id)
+    if (!receipt) return
+    receipts.delete(id)
+    receipt.waiting--
+    if (!saved) {
+      const result = receipt.results.find(r => r.id === id)!
+      result.error = error || 'rejected by the server'
+      addMessage('system', `${describeEntry(result.entry)} was not saved: ${result.error}`)
+    }
+    receipt.message.content = receiptText(receipt)
+  }))
 
   function generateId(): string {
     return Date.now().toString(36) + Math.random().toString(36).substr(2)
@@ -51,97 +193,128 @@ export function useChatbot() {
       status: intent ? 'pending' : undefined
     }
     messages.value.push(message)
-    return message
+    if (role === 'assistant') assistantCount.value++
+    if (messages.value.length > MAX_MESSAGES) {
+      messages.value.splice(0, messages.value.length - MAX_MESSAGES)
+    }
+    // The reactive copy, so later edits (streamed tokens, status) re-render
+    return messages.value[messages.value.length - 1]
+  }
+
+  // Stop a streaming reply: the user sent something else or closed the chat
+  function cancelStream(): void {
+    activeStream?.abort()
+    activeStream = null
+  }
+
+  async function streamReply(text: string): Promise<boolean> {
+    const controller = new AbortController()
+    activeStream = controller
+    let reply = null as ChatMessage | null
+
+    await streamResponse(buildContext(), text, chunk => {
+      if (reply) {
+        reply.content += chunk
+        return
+      }
+      markSend('fetched')
+      reply = addMessage('assistant', chunk)
+      reply.streaming = true
+      nextTick(() => markSend('first-token'))
+    }, controller.signal)
+
+    if (activeStream === controller) activeStream = null
+    if (reply) {
+      reply.streaming = false
+    } else if (!controller.signal.aborted) {
+      markSend('fetched')
+      addMessage('assistant', 'Sorry, I did not get a reply. Please try again.')
+    }
+    return !controller.signal.aborted
   }
 
-  async function sendMessage(text: string): Promise<void> {
+  // `parsed`: a parse of `text` already under way (handleVoiceInput's speculation)
+  async function sendMessage(text: string, parsed?: Promise<ParsedIntent>): Promise<void> {
     if (!text.trim()) return
 
+    cancelStream()
+    const seq = ++sendSeq
+    markSend('send')
+
     // Add user message
     addMessage('user', text)
 
     // Parse with Gemini
-    const intent = await parseUserInput(text)
-
-    if (intent.action === 'unknown') {
-      // General query - generate conversational response
-      const context = buildContext()
-      const response = await generateResponse(context, text)
-      addMessage('assistant', response)
-      return
+    let intent: ParsedIntent
+    if (parsed) {
+      awaitingSpeculation.value = true
+      try {
+        intent = await parsed
+      } finally {
+        awaitingSpeculation.value = false
+      }
+      if (intent.superseded && seq === sendSeq) intent = await parseUserInput(text, { lane: CHAT_LANE })
+    } else {
+      intent = await parseUserInput(text, { lane: CHAT_LANE })
     }
-
-    if (intent.action === 'query') {
+    // Overtaken by a newer message: that send owns the marks and the reply
+    if (intent.superseded || seq !== sendSeq) return
+    markSend('parsed')
+
+    // A batch Gemini returned without its entries is nothing to save
+    if (intent.action === 'unknown' || (intent.action === 'add_batch' && !intent.entries?.length)) {
+      // General query - stream a conversational response into a new bubble
+      await loadContext()
+      // Superseded by a newer message: that send owns the marks now
+      if (seq !== sendSeq || !await streamReply(text)) return
+    } else if (intent.action === 'query') {
       // Handle query
       const response = await handleQuery(intent)
+      if (seq !== sendSeq) return
+      markSend('fetched')
       addMessage('assistant', response)
-      return
+    } else {
+      // Data entry action - ask for confirmation
+      markSend('fetched')
+      // A batch always lists its entries, so each one can be checked before saving
+      const confirmMessage = intent.action === 'add_batch'
+        ? getConfirmationMessage(intent)
+        : intent.rawResponse || getConfirmationMessage(intent)
+      const assistantMsg = addMessage('assistant', `${confirmMessage}\n\nShould I save this? (Say "yes" to confirm or "no" to cancel)`, intent)
+
+      pendingAction.value = {
+        intent,
+        messageId: assistantMsg.id
+      }
     }
 
-    // Data entry action - ask for confirmation
-    const confirmMessage = intent.rawResponse || getConfirmationMessage(intent)
-    const assistantMsg = addMessage('assistant', `${confirmMessage}\n\nShould I save this? (Say "yes" to confirm or "no" to cancel)`, intent)
-
-    pendingAction.value = {
-      intent,
-      messageId: assistantMsg.id
-    }
+    // MessageBubble is in the DOM once the next tick has flushed
+    await nextTick()
+    markSend('rendered')
+    measureSend()
   }
 
   async function confirmAction(): Promise<void> {
     if (!pendingAction.value) return
 
     const { intent, messageId } = pendingAction.value
+    const entries: IntentEntry[] = intent.action === 'add_batch'
+      ? intent.entries || []
+      : [{ action: intent.action as EntryAction, data: intent.data || {} }]
 
     try {
-      let result: string
-
-      switch (intent.action) {
-        case 'add_expense':
-          await addExpense({
-            category: intent.data?.category || 'other',
-            amount: intent.data?.amount || 0,
-            description: intent.data?.description || '',
-            expense_date: new Date().toISOString().split('T')[0],
-            is_recurring: false
-          })
-          result = `Expense of Rs ${intent.data?.amount?.toLocaleString('en-IN')} saved successfully!`
-          break
-
-        case 'add_income':
-          await addIncome({
-            source_type: (intent.data?.source_type as 'fd_interest' | 'dividend' | 'rental' | 'business' | 'other') || 'other',
-            source_name: intent.data?.source_name || 'Unknown',
-            amount: intent.data?.amount || 0,
-            income_date: new Date().toISOString().split('T')[0]
-          })
-          result = `Income of Rs ${intent.data?.amount?.toLocaleString('en-IN')} recorded!`
-          break
-
-        case 'add_fd':
-          const today = new Date().toISOString().split('T')[0]
-          await addFD({
-            bank_name: intent.data?.bank_name || 'Unknown Bank',
-            principal: intent.data?.principal || 0,
-            interest_rate: intent.data?.interest_rate || 0,
-            start_date: today,
-            maturity_date: intent.data?.maturity_date || today,
-            interest_payout: 'maturity',
-            status: 'active',
-            auto_renew: false
-          })
-          result = `FD of Rs ${intent.data?.principal?.toLocaleString('en-IN')} created!`
-          break
-
-        default:
-          result = 'Action completed.'
-      }
+      const results = await saveEntries(entries)
+      const queued = results.filter(r => r.id)
+      if (queued.length === 0) throw new Error(results[0]?.error || 'Nothing was saved')
 
       // Update message status
       const msg = messages.value.find(m => m.id === messageId)
       if (msg) msg.status = 'confirmed'
 
-      addMessage('assistant', result)
+      // Kept locally either way; the outbox sends it once there is a connection
+      const receipt: Receipt = { message: addMessage('assistant', ''), results, waiting: queued.length, offline: !navigator.onLine }
+      receipt.message.content = receiptText(receipt)
+      queued.forEach(r => receipts.set(r.id!, receipt))
     } catch (error) {
       addMessage('assistant', `Failed to save: ${error instanceof Error ? error.message : 'Unknown error'}`)
     }
@@ -149,6 +322,76 @@ export function useChatbot() {
     pendingAction.value = null
   }
 
+  function receiptText({ results, waiting, offline }: Receipt): string {
+    const ok = results.filter(r => !r.error).length
+    let text: string
+    if (results.length === 1) {
+      const [result] = results
+      text = result.error
+        ? `Not saved: ${describeEntry(result.entry)} (${result.error})`
+        : `${describeEntry(result.entry)} ${waiting ? 'queued, saving now...' : 'saved!'}`
+    } else {
+      text = `${waiting ? `Queued ${ok} of ${results.length} entries, saving now` : `Saved ${ok} of ${results.length} entries`}:\n${results.map(r =>
+        r.error ? `- Not saved: ${describeEntry(r.entry)} (${r.error})` : `- ${describeEntry(r.entry)}`
+      ).join('\n')}`
+    }
+    if (waiting && offline) text += '\n\nYou are offline, so it will sync when you are back online.'
+    return text
+  }
+
+  // Each table's entries are queued together, so the outbox sends them as one
+  // bulk insert per table. The results come back per entry, in the batch's order.
+  async function saveEntries(entries: IntentEntry[]): Promise<EntryResult[]> {
+    const today = new Date().toISOString().split('T')[0]
+    const groups = ENTRY_ACTIONS.map(action => entries.filter(entry => entry.action === action))
+
+    const outcomes = await Promise.allSettled(groups.map((group, i): Promise<{ id: string }[]> => {
+      if (group.length === 0) return Promise.resolve([])
+      switch (ENTRY_ACTIONS[i]) {
+        case 'add_expense':
+          return addExpenses(group.map(({ data }) => ({
+            category: data.category || 'other',
+            amount: data.amount || 0,
+            description: data.description || '',
+            expense_date: today,
+            is_recurring: false
+          })))
+        case 'add_income':
+          return addIncomes(group.map(({ data }) => ({
+            source_type: (data.source_type as 'fd_interest' | 'dividend' | 'rental' | 'business' | 'other') || 'other',
+            source_name: data.source_name || 'Unknown',
+            amount: data.amount || 0,
+            income_date: today
+          })))
+        default:
+          return addFDs(group.map(({ data }) => ({
+            bank_name: data.bank_name || 'Unknown Bank',
+            principal: data.principal || 0,
+            interest_rate: data.interest_rate || 0,
+            start_date: today,
+            maturity_date: data.maturity_date || today,
+            interest_payout: 'maturity' as const,
+            status: 'active' as const,
+            auto_renew: false
+          })))
+      }
+    }))
+
+    const results = new Map<IntentEntry, EntryResult>()
+    groups.forEach((group, i) => {
+      const outcome = outcomes[i]
+      group.forEach((entry, row) => {
+        if (outcome.status === 'rejected') {
+          const reason = outcome.reason
+          results.set(entry, { entry, error: reason instanceof Error ? reason.message : 'Unknown error' })
+        } else {
+          results.set(entry, { entry, id: outcome.value[row].id })
+        }
+      })
+    })
+    return entries.map(entry => results.get(entry)!)
+  }
+
   async function cancelAction(): Promise<void> {
     if (!pendingAction.value) return
 
@@ -161,6 +404,42 @@ export function useChatbot() {
   }
 
   async function handleVoiceInput(): Promise<void> {
+    let speculation = null as Speculation | null
+    let stableTimer: ReturnType<typeof setTimeout> | null = null
+
+    // Every interim result restarts the clock; one that holds still is parsed
+    // (in its own lane, so a newer speculation aborts the older)
+    const stopWatching = watch(transcript, text => {
+      if (stableTimer) clearTimeout(stableTimer)
+      stableTimer = setTimeout(() => {
+        if (!isListening.value || transcriptWords(text).length < MIN_SPECULATIVE_WORDS) return
+        if (speculation && normalizeKey(speculation.text) === normalizeKey(text)) return
+        speculation = { text, intent: parseUserInput(text, { lane: VOICE_LANE, quiet: true }) }
+        voiceStats.speculated++
+        performance.clearMarks('voice:speculated')
+        performance.mark('voice:speculated')
+      }, STABLE_MS)
+    })
+
+    function dropSpeculation(): void {
+      if (!speculation) return
+      voiceStats.discarded++
+      cancelLane(VOICE_LANE)
+      speculation = null
+    }
+
+    // The final transcript's parse, if the speculation matches it
+    function takeSpeculation(text: string): Promise<ParsedIntent> | undefined {
+      if (!speculation || !sameUtterance(speculation.text, text)) {
+        dropSpeculation()
+        return undefined
+      }
+      voiceStats.reused++
+      const { intent } = speculation
+      speculation = null
+      return intent
+    }
+
     try {
       const text = await startListening()
       if (text.trim()) {
@@ -168,41 +447,59 @@ export function useChatbot() {
         const lower = text.toLowerCase().trim()
         if (pendingAction.value) {
           if (lower === 'yes' || lower.includes('confirm') || lower.includes('save')) {
+            dropSpeculation()
             await confirmAction()
           } else if (lower === 'no' || lower.includes('cancel')) {
+            dropSpeculation()
             await cancelAction()
           } else {
-            await sendMessage(text)
+            await sendMessage(text, takeSpeculation(text))
           }
         } else {
-          await sendMessage(text)
+          await sendMessage(text, takeSpeculation(text))
         }
       }
     } catch (error) {
       addMessage('system', `Voice input error: ${error instanceof Error ? error.message : 'Failed to recognize speech'}`)
+    } finally {
+      stopWatching()
+      if (stableTimer) clearTimeout(stableTimer)
+      dropSpeculation()
+    }
+  }
+
+  // Only the tables a query reads; the shared store skips them while fresh
+  function loadForQuery(queryType: NonNullable<ParsedIntent['data']>['query_type']): Promise<unknown> {
+    switch (queryType) {
+      case 'net_worth':
+        return loadAssets()
+      case 'expenses':
+        return loadMonthlyTotals()
+      case 'income':
+      case 'fi_progress':
+        return loadMonthlyIncome()
+      case 'fd_maturity':
+        return loadFDs()
+      default:
+        return loadContext()
     }
   }
 
+  // Everything buildContext() reads
+  function loadContext(): Promise<unknown> {
+    return Promise.all([loadAssets(), loadMonthlyIncome(), loadFDs()])
+  }
+
   async function handleQuery(intent: ParsedIntent): Promise<string> {
-    await Promise.all([
-      fetchExpenses({ limit: 100 }),
-      fetchIncomes({ limit: 100 }),
-      fetchFDs(),
-      fetchAssets()
-    ])
+    await loadForQuery(intent.data?.query_type)
 
     switch (intent.data?.query_type) {
       case 'net_worth':
         return `Your current net worth is Rs ${netWorth.value.toLocaleString('en-IN')}.\n\nThis includes ${assets.value.length} assets with total value of Rs ${assets.value.reduce((s, a) => s + (a.current_value || a.principal || 0), 0).toLocaleString('en-IN')}.`
 
       case 'expenses':
-        const thisMonth = expenses.value.filter(e => {
-          const expDate = new Date(e.expense_date)
-          const now = new Date()
-          return expDate.getMonth() === now.getMonth() && expDate.getFullYear() === now.getFullYear()
-        })
-        const total = thisMonth.reduce((s, e) => s + e.amount, 0)
-        return `This month's expenses: Rs ${total.toLocaleString('en-IN')}\n\nTop categories:\n${getExpenseBreakdown(thisMonth)}`
+        const total = monthlyTotals.value.reduce((s, t) => s + t.total, 0)
+        return `This month's expenses: Rs ${total.toLocaleString('en-IN')}\n\nTop categories:\n${getExpenseBreakdown(monthlyTotals.value)}`
 
       case 'income':
         return `Monthly passive income: Rs ${fiProgress.value.monthlyIncome.toLocaleString('en-IN')}\n\nBreakdown:\n${getIncomeBreakdown(fiProgress.value.incomeBreakdown)}`
@@ -241,20 +538,32 @@ export function useChatbot() {
         return `I'll record income of Rs ${intent.data?.amount?.toLocaleString('en-IN')} from ${intent.data?.source_name}.`
       case 'add_fd':
         return `I'll create an FD in ${intent.data?.bank_name} for Rs ${intent.data?.principal?.toLocaleString('en-IN')} at ${intent.data?.interest_rate}%.`
+      case 'add_batch': {
+        const entries = intent.entries || []
+        const total = entries.reduce((s, e) => s + (e.data.amount ?? e.data.principal ?? 0), 0)
+        return `I'll record ${entries.length} entries (Rs ${total.toLocaleString('en-IN')} in all):\n${entries.map(e => `- ${describeEntry(e)}`).join('\n')}`
+      }
       default:
         return 'Ready to save this entry.'
     }
   }
 
-  function getExpenseBreakdown(expenses: { category: string; amount: number }[]): string {
-    const byCategory: Record<string, number> = {}
-    expenses.forEach(e => {
-      byCategory[e.category] = (byCategory[e.category] || 0) + e.amount
-    })
-    return Object.entries(byCategory)
-      .sort((a, b) => b[1] - a[1])
+  function describeEntry({ action, data }: IntentEntry): string {
+    switch (action) {
+      case 'add_expense':
+        return `Expense of Rs ${data.amount?.toLocaleString('en-IN')} for ${data.description || data.category}`
+      case 'add_income':
+        return `Income of Rs ${data.amount?.toLocaleString('en-IN')} from ${data.source_name}`
+      case 'add_fd':
+        return `FD in ${data.bank_name} for Rs ${data.principal?.toLocaleString('en-IN')} at ${data.interest_rate}%`
+    }
+  }
+
+  function getExpenseBreakdown(totals: { category: string; total: number }[]): string {
+    return [...totals]
+      .sort((a, b) => b.total - a.total)
       .slice(0, 5)
-      .map(([cat, amt]) => `- ${cat}: Rs ${amt.toLocaleString('en-IN')}`)
+      .map(({ category, total }) => `- ${category}: Rs ${total.toLocaleString('en-IN')}`)
       .join('\n')
   }
 
@@ -275,7 +584,7 @@ export function useChatbot() {
   return {
     // State
     messages,
-    isOpen,
+    assistantCount,
     isProcessing,
     isListening,
     isSpeaking,
@@ -290,9 +599,7 @@ export function useChatbot() {
     cancelAction,
     speak,
     stopListening,
-    initialize,
-
-    // Helpers
-    toggle: () => { isOpen.value = !isOpen.value }
+    cancelStream,
+    initialize
   }
 }
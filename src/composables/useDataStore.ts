@@ -0,0 +1,159 @@
+// Freshness bookkeeping for the shared table state in useExpenses, usePassiveIncome,
+// useFDs, useAssets, useFIProgress and useSnapshot. Those composables keep their rows in
+// module-level refs, so the dashboard and the chatbot read the same copy; this
+// module decides when a copy is good enough and when to go back to Supabase.
+
+export type StoreKey = 'expenses' | 'expenses:month' | 'passive_income' | 'passive_income:month' | 'fd_tracker' | 'financial_assets' | 'snapshot'
+
+// First day of the current month (YYYY-MM-DD), the start of the ':month' entries
+export function startOfMonth(): string {
+  // Local calendar month: toISOString() would shift east-of-UTC midnights back a day
+  const now = new Date()
+  return `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}-01`
+}
+
+// Older than this, cached rows are still served but refreshed in the background
+export const STALE_AFTER_MS = 60 * 1000
+
+interface Freshness {
+  fetchedAt: number | null
+  // Rows covered by the last fetch: a limit, or null for the whole table
+  limit: number | null
+  inflight: Promise<void> | null
+  // Rows the in-flight fetch will cover, as `limit`
+  inflightLimit: number | null
+}
+
+export interface StoreStats {
+  fetches: Record<string, number>
+  hits: number
+  revalidations: number
+}
+
+type InsertListener = (row: unknown) => void
+// `saved` is null when the server rejected the write, with its `error`
+type SyncListener = (queued: unknown, saved: unknown | null, error?: string) => void
+
+const freshness = new Map<StoreKey, Freshness>()
+const listeners = new Map<StoreKey, InsertListener[]>()
+const syncListeners = new Map<StoreKey, SyncListener[]>()
+const stats: StoreStats = { fetches: {}, hits: 0, revalidations: 0 }
+
+window.__fiDebug = { ...window.__fiDebug, store: stats }
+
+function entry(key: StoreKey): Freshness {
+  let state = freshness.get(key)
+  if (!state) {
+    state = { fetchedAt: null, limit: null, inflight: null, inflightLimit: null }
+    freshness.set(key, state)
+  }
+  return state
+}
+
+// Whether rows fetched with limit `covered` (null: the whole table) include the first `limit`
+function within(covered: number | null, limit?: number): boolean {
+  return covered === null || (limit !== undefined && limit <= covered)
+}
+
+function covers(state: Freshness, limit?: number): boolean {
+  return state.fetchedAt !== null && within(state.limit, limit)
+}
+
+function start(key: StoreKey, fetcher: () => Promise<void>): Promise<void> {
+  stats.fetches[key] = (stats.fetches[key] || 0) + 1
+  return fetcher()
+}
+
+// A fetch already in flight for fewer rows goes first; this one follows it,
+// unless what it brought back turns out to be enough
+function run(key: StoreKey, state: Freshness, fetcher: () => Promise<void>, limit?: number): Promise<void> {
+  const request = state.inflight
+    ? state.inflight.catch(() => undefined).then(() => covers(state, limit) ? undefined : start(key, fetcher))
+    : start(key, fetcher)
+  const inflight: Promise<void> = request.finally(() => {
+    if (state.inflight === inflight) {
+      state.inflight = null
+      state.inflightLimit = null
+    }
+  })
+  state.inflight = inflight
+  state.inflightLimit = limit ?? null
+  return inflight
+}
+
+/**
+ * Stale-while-revalidate load of `key`.
+ *
+ * Fresh rows: resolves immediately. Stale rows: resolves immediately and
+ * refreshes in the background. No usable rows: waits for `fetcher`.
+ * Concurrent callers share one in-flight request when it covers their
+ * `limit`; otherwise theirs is chained after it.
+ */
+export function ensureFresh(key: StoreKey, fetcher: () => Promise<void>, limit?: number): Promise<void> {
+  const state = entry(key)
+
+  if (covers(state, limit)) {
+    stats.hits++
+    if (!state.inflight && Date.now() - (state.fetchedAt as number) > STALE_AFTER_MS) {
+      stats.revalidations++
+      run(key, state, fetcher, limit)
+    }
+    return Promise.resolve()
+  }
+
+  if (state.inflight && within(state.inflightLimit, limit)) return state.inflight
+  return run(key, state, fetcher, limit)
+}
+
+// Called by the fetch functions after a successful unfiltered fetch
+export function markFetched(key: StoreKey, limit?: number): void {
+  const state = entry(key)
+  state.fetchedAt = Date.now()
+  state.limit = limit ?? null
+}
+
+// Whether `key` has rows from a completed fetch, stale or not
+export function hasFetched(key: StoreKey): boolean {
+  return entry(key).fetchedAt !== null
+}
+
+// A filtered fetch replaced the shared rows: the next ensureFresh() must refetch
+export function invalidate(key: StoreKey): void {
+  entry(key).fetchedAt = null
+}
+
+export function onInsert(key: StoreKey, listener: InsertListener): void {
+  listeners.set(key, [...(listeners.get(key) || []), listener])
+}
+
+// Inserted rows are merged locally instead of refetching the table
+export function notifyInsert(key: StoreKey, row: unknown): void {
+  listeners.get(key)?.forEach(listener => listener(row))
+}
+
+export function onSync(key: StoreKey, listener: SyncListener): void {
+  syncListeners.set(key, [...(syncListeners.get(key) || []), listener])
+}
+
+// A queued insert (useOutbox) reached Supabase or was rejected: the optimistic
+// row, stored under its client_id, is swapped for the server's row or dropped
+export function notifySync(key: StoreKey, queued: unknown, saved: unknown | null, error?: string): void {
+  syncListeners.get(key)?.forEach(listener => listener(queued, saved, error))
+}
+
+/**
+ * Binary-search insert into `rows`, which is ordered by `before` (true when
+ * `a` sorts ahead of `b`). Ties go ahead of the rows already there, like the
+ * unshift they replace. Returns the index the row landed at.
+ */
+export function insertSorted<T>(rows: T[], row: T, before: (a: T, b: T) => boolean): number {
+  let low = 0
+  let high = rows.length
+  while (low < high) {
+    const mid = (low + high) >> 1
+    if (before(rows[mid], row)) low = mid + 1
+    else high = mid
+  }
+  rows.splice(low, 0, row)
+  return low
+}
@@ -1,6 +1,8 @@
 import { ref } from 'vue'
 import { useSupabase } from './useSupabase'
-import type { Expense } from '@/types/database'
+import { ensureFresh, markFetched, invalidate, notifyInsert, onSync, insertSorted, startOfMonth } from './useDataStore'
+import { queueInserts, queuedRows } from './useOutbox'
+import type { Expense, PageCursor, ExpenseCategoryTotal } from '@/types/database'
 
 export const EXPENSE_CATEGORIES = [
   'housing',
@@ -14,10 +16,58 @@ export const EXPENSE_CATEGORIES = [
   'other',
 ] as const
 
+// Shared by every useExpenses() caller, so the dashboard and chatbot read one copy
+const expenses = ref<Expense[]>([])
+// This month's totals per category (expense_category_totals RPC), largest first
+const monthlyTotals = ref<ExpenseCategoryTotal[]>([])
+// Queued expenses (by client_id) that monthlyTotals includes: the RPC cannot
+// see them yet, so only these come back out if Supabase rejects them
+const countedQueued = new Set<string>()
+
+// `sign` -1 takes a rejected optimistic expense back out
+function addToMonthlyTotals(expense: Expense, sign = 1): void {
+  if (expense.expense_date < startOfMonth()) return
+
+  const existing = monthlyTotals.value.find(t => t.category === expense.category)
+  if (existing) {
+    existing.total += sign * expense.amount
+    existing.entries += sign
+    if (existing.entries <= 0) monthlyTotals.value.splice(monthlyTotals.value.indexOf(existing), 1)
+  } else if (sign > 0) {
+    monthlyTotals.value.push({ category: expense.category, total: expense.amount, entries: 1 })
+  }
+  monthlyTotals.value.sort((a, b) => b.total - a.total)
+}
+
+function countQueued(expense: Expense): void {
+  addToMonthlyTotals(expense)
+  countedQueued.add(expense.id)
+}
+
+// fetchExpenses order: newest first
+function newerExpense(a: Expense, b: Expense): boolean {
+  return a.expense_date > b.expense_date
+}
+
+// The optimistic row keeps its place and takes the server's id. One that
+// landed after a fetch it missed (restored from an earlier session) needs a refetch.
+onSync('expenses', (queued, saved) => {
+  const index = expenses.value.findIndex(e => e.id === (queued as Expense).id)
+  // One restored from an earlier session was never added here
+  if (countedQueued.delete((queued as Expense).id) && !saved) addToMonthlyTotals(queued as Expense, -1)
+
+  if (index < 0) {
+    if (saved) invalidate('expenses')
+  } else if (saved) {
+    expenses.value[index] = saved as Expense
+  } else {
+    expenses.value.splice(index, 1)
+  }
+})
+
 export function useExpenses() {
   const { supabase, userId } = useSupabase()
 
-  const expenses = ref<Expense[]>([])
   const loading = ref(false)
   const error = ref<string | null>(null)
 
@@ -50,6 +100,13 @@ export function useExpenses() {
       if (fetchError) throw fetchError
 
       expenses.value = data || []
+      if (options?.startDate || options?.endDate || options?.category) {
+        invalidate('expenses')
+      } else {
+        // Still in the outbox, so not in Supabase yet
+        queuedRows('expenses', expenses.value).forEach(expense => insertSorted(expenses.value, expense, newerExpense))
+        markFetched('expenses', options?.limit)
+      }
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to fetch expenses'
     } finally {
@@ -57,37 +114,98 @@ export function useExpenses() {
     }
   }
 
-  async function addExpense(expense: Omit<Expense, 'id' | 'user_id' | 'created_at'>) {
+  async function fetchMonthlyTotals() {
     loading.value = true
     error.value = null
 
     try {
-      const { data, error: insertError } = await supabase
-        .from('expenses')
-        .insert({
-          ...expense,
-          user_id: userId,
-        })
-        .select()
-        .single()
+      // Grouped in Postgres, so the payload is one row per category
+      const { data, error: fetchError } = await supabase
+        .rpc('expense_category_totals', { p_user_id: userId, p_start: startOfMonth() })
+
+      if (fetchError) throw fetchError
+
+      monthlyTotals.value = (data || []).map((t: ExpenseCategoryTotal) => ({ ...t, total: Number(t.total) }))
+      countedQueued.clear()
+      queuedRows<Expense>('expenses', []).forEach(countQueued)
+      markFetched('expenses:month')
+    } catch (e) {
+      error.value = e instanceof Error ? e.message : 'Failed to fetch expense totals'
+    } finally {
+      loading.value = false
+    }
+  }
+
+  function loadMonthlyTotals() {
+    return ensureFresh('expenses:month', fetchMonthlyTotals)
+  }
+
+  // One keyset page: `limit` expenses older than `after`, newest first. Ordered
+  // by (expense_date, id) so rows sharing a date are neither skipped nor repeated.
+  // Leaves the shared `expenses` copy alone.
+  async function fetchExpensePage(after: PageCursor | null, limit: number): Promise<Expense[]> {
+    let query = supabase
+      .from('expenses')
+      .select('*')
+      .eq('user_id', userId)
+      .order('expense_date', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limit)
 
-      if (insertError) throw insertError
+    if (after) {
+      query = query.or(`expense_date.lt.${after.date},and(expense_date.eq.${after.date},id.lt.${after.id})`)
+    }
+
+    const { data, error: fetchError } = await query
+    if (fetchError) throw fetchError
+    return data || []
+  }
 
-      expenses.value.unshift(data)
-      return data
+  // Shown at once and queued for Supabase (useOutbox); the row's id is its
+  // client_id until the write lands
+  async function addExpense(expense: Omit<Expense, 'id' | 'user_id' | 'created_at'>) {
+    const [saved] = await addExpenses([expense])
+    return saved
+  }
+
+  // Several expenses at once (a batched chat entry); the outbox sends them in
+  // one request
+  async function addExpenses(rows: Omit<Expense, 'id' | 'user_id' | 'created_at'>[]): Promise<Expense[]> {
+    loading.value = true
+    error.value = null
+
+    try {
+      const saved = await queueInserts<Expense>('expenses', rows.map(expense => ({ ...expense, user_id: userId })))
+      saved.forEach(expense => {
+        insertSorted(expenses.value, expense, newerExpense)
+        countQueued(expense)
+        notifyInsert('expenses', expense)
+      })
+      return saved
     } catch (e) {
-      error.value = e instanceof Error ? e.message : 'Failed to add expense'
+      error.value = e instanceof Error ? e.message : 'Failed to add expenses'
       throw e
     } finally {
       loading.value = false
     }
   }
 
+  // Latest `limit` expenses, from the shared copy when it is fresh enough
+  function loadExpenses(limit?: number) {
+    return ensureFresh('expenses', () => fetchExpenses({ limit }), limit)
+  }
+
   return {
     expenses,
+    monthlyTotals,
     loading,
     error,
     fetchExpenses,
+    fetchExpensePage,
+    loadExpenses,
+    fetchMonthlyTotals,
+    loadMonthlyTotals,
     addExpense,
+    addExpenses,
   }
 }
@@ -1,11 +1,31 @@
 import { ref, computed } from 'vue'
 import { useSupabase } from './useSupabase'
+import { ensureFresh, markFetched, invalidate, notifyInsert, onSync, insertSorted } from './useDataStore'
+import { queueInserts, queuedRows } from './useOutbox'
 import type { FDTracker } from '@/types/database'
 
+// Shared by every useFDs() caller
+const fds = ref<FDTracker[]>([])
+
+// fetchFDs order: soonest maturity first
+function maturesFirst(a: FDTracker, b: FDTracker): boolean {
+  return a.maturity_date < b.maturity_date
+}
+
+onSync('fd_tracker', (queued, saved) => {
+  const index = fds.value.findIndex(fd => fd.id === (queued as FDTracker).id)
+  if (index < 0) {
+    if (saved) invalidate('fd_tracker')
+  } else if (saved) {
+    fds.value[index] = saved as FDTracker
+  } else {
+    fds.value.splice(index, 1)
+  }
+})
+
 export function useFDs() {
   const { supabase, userId } = useSupabase()
 
-  const fds = ref<FDTracker[]>([])
   const loading = ref(false)
   const error = ref<string | null>(null)
 
@@ -47,6 +67,12 @@ export function useFDs() {
       if (fetchError) throw fetchError
 
       fds.value = data || []
+      if (status) {
+        invalidate('fd_tracker')
+      } else {
+        queuedRows('fd_tracker', fds.value).forEach(fd => insertSorted(fds.value, fd, maturesFirst))
+        markFetched('fd_tracker')
+      }
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to fetch FDs'
     } finally {
@@ -54,29 +80,28 @@ export function useFDs() {
     }
   }
 
+  // Shown at once and queued for Supabase (useOutbox), like addExpense
   async function addFD(fd: Omit<FDTracker, 'id' | 'user_id' | 'created_at'>) {
+    const [saved] = await addFDs([fd])
+    return saved
+  }
+
+  async function addFDs(rows: Omit<FDTracker, 'id' | 'user_id' | 'created_at'>[]): Promise<FDTracker[]> {
     loading.value = true
     error.value = null
 
     try {
-      // Calculate maturity amount if not provided
-      const maturityAmount = fd.maturity_amount || calculateMaturityAmount(fd.principal, fd.interest_rate, fd.start_date, fd.maturity_date)
-
-      const { data, error: insertError } = await supabase
-        .from('fd_tracker')
-        .insert({
-          ...fd,
-          maturity_amount: maturityAmount,
-          user_id: userId,
-        })
-        .select()
-        .single()
-
-      if (insertError) throw insertError
-
-      fds.value.unshift(data)
-      fds.value.sort((a, b) => new Date(a.maturity_date).getTime() - new Date(b.maturity_date).getTime())
-      return data
+      const saved = await queueInserts<FDTracker>('fd_tracker', rows.map(fd => ({
+        ...fd,
+        // Calculate maturity amount if not provided
+        maturity_amount: fd.maturity_amount || calculateMaturityAmount(fd.principal, fd.interest_rate, fd.start_date, fd.maturity_date),
+        user_id: userId,
+      })))
+      saved.forEach(fd => {
+        insertSorted(fds.value, fd, maturesFirst)
+        notifyInsert('fd_tracker', fd)
+      })
+      return saved
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to add FD'
       throw e
@@ -85,6 +110,10 @@ export function useFDs() {
     }
   }
 
+  function loadFDs() {
+    return ensureFresh('fd_tracker', () => fetchFDs())
+  }
+
   function calculateMaturityAmount(principal: number, rate: number, startDate: string, maturityDate: string): number {
     const start = new Date(startDate)
     const end = new Date(maturityDate)
@@ -107,7 +136,9 @@ export function useFDs() {
     totalFDValue,
     upcomingMaturities,
     fetchFDs,
+    loadFDs,
     addFD,
+    addFDs,
     getDaysUntilMaturity,
   }
 }
@@ -1,62 +1,97 @@
 import { ref, computed, onMounted } from 'vue'
 import { useSupabase } from './useSupabase'
-import type { FIProgress, PassiveIncome } from '@/types/database'
+import { ensureFresh, markFetched, onInsert, onSync, startOfMonth } from './useDataStore'
+import { queuedRows } from './useOutbox'
+import type { FIProgress, IncomeSourceTotal, PassiveIncome } from '@/types/database'
+
+// This month's income per source_type (income_breakdown RPC), shared by the
+// dashboard ring and the chatbot
+const monthlyIncome = ref<IncomeSourceTotal[]>([])
+// Queued incomes (by client_id) that monthlyIncome includes: the RPC cannot
+// see them yet, so only these come back out if Supabase rejects them
+const countedQueued = new Set<string>()
+
+// `sign` -1 takes a rejected optimistic income back out
+function addToMonthlyIncome(income: PassiveIncome, sign = 1): void {
+  if (income.income_date < startOfMonth()) return
+
+  const existing = monthlyIncome.value.find(t => t.source_type === income.source_type)
+  if (existing) {
+    existing.total += sign * income.amount
+    existing.entries += sign
+    if (existing.entries <= 0) monthlyIncome.value.splice(monthlyIncome.value.indexOf(existing), 1)
+  } else if (sign > 0) {
+    monthlyIncome.value.push({ source_type: income.source_type, total: income.amount, entries: 1 })
+  }
+}
+
+function countQueued(income: PassiveIncome): void {
+  addToMonthlyIncome(income)
+  countedQueued.add(income.id)
+}
+
+// Income recorded from the chat or the form counts towards FI progress right away
+onInsert('passive_income', row => countQueued(row as PassiveIncome))
+onSync('passive_income', (queued, saved) => {
+  // One restored from an earlier session was never added here
+  if (countedQueued.delete((queued as PassiveIncome).id) && !saved) addToMonthlyIncome(queued as PassiveIncome, -1)
+})
+
+// Per-source totals bucketed into the FIProgress shape; also used for the
+// dashboard's snapshot render (useSnapshot)
+export function buildFIProgress(totals: Pick<IncomeSourceTotal, 'source_type' | 'total'>[], fiTarget: number): FIProgress {
+  const breakdown = {
+    fd_interest: 0,
+    dividend: 0,
+    rental: 0,
+    business: 0,
+    other: 0,
+  }
+
+  totals.forEach(income => {
+    const type = income.source_type as keyof typeof breakdown
+    if (type in breakdown) {
+      breakdown[type] += income.total
+    } else {
+      breakdown.other += income.total
+    }
+  })
+
+  const total = Object.values(breakdown).reduce((sum, val) => sum + val, 0)
+  const progress = (total / fiTarget) * 100
+
+  return {
+    monthlyIncome: total,
+    targetIncome: fiTarget,
+    progress: Math.min(progress, 100),
+    gap: Math.max(fiTarget - total, 0),
+    incomeBreakdown: breakdown,
+  }
+}
 
 export function useFIProgress() {
   const { supabase, userId, fiTarget } = useSupabase()
 
   const loading = ref(true)
   const error = ref<string | null>(null)
-  const monthlyIncome = ref<PassiveIncome[]>([])
-
-  const fiProgress = computed<FIProgress>(() => {
-    const breakdown = {
-      fd_interest: 0,
-      dividend: 0,
-      rental: 0,
-      business: 0,
-      other: 0,
-    }
 
-    monthlyIncome.value.forEach(income => {
-      const type = income.source_type as keyof typeof breakdown
-      if (type in breakdown) {
-        breakdown[type] += income.amount
-      } else {
-        breakdown.other += income.amount
-      }
-    })
-
-    const total = Object.values(breakdown).reduce((sum, val) => sum + val, 0)
-    const progress = (total / fiTarget) * 100
-
-    return {
-      monthlyIncome: total,
-      targetIncome: fiTarget,
-      progress: Math.min(progress, 100),
-      gap: Math.max(fiTarget - total, 0),
-      incomeBreakdown: breakdown,
-    }
-  })
+  const fiProgress = computed(() => buildFIProgress(monthlyIncome.value, fiTarget))
 
   async function fetchMonthlyIncome() {
     loading.value = true
     error.value = null
 
     try {
-      const startOfMonth = new Date()
-      startOfMonth.setDate(1)
-      startOfMonth.setHours(0, 0, 0, 0)
-
+      // Summed per source_type in Postgres: one row per type, however many entries
       const { data, error: fetchError } = await supabase
-        .from('passive_income')
-        .select('*')
-        .eq('user_id', userId)
-        .gte('income_date', startOfMonth.toISOString().split('T')[0])
+        .rpc('income_breakdown', { p_user_id: userId, p_start: startOfMonth() })
 
       if (fetchError) throw fetchError
 
-      monthlyIncome.value = data || []
+      monthlyIncome.value = (data || []).map((t: IncomeSourceTotal) => ({ ...t, total: Number(t.total) }))
+      countedQueued.clear()
+      queuedRows<PassiveIncome>('passive_income', []).forEach(countQueued)
+      markFetched('passive_income:month')
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to fetch income'
     } finally {
@@ -64,12 +99,18 @@ export function useFIProgress() {
     }
   }
 
-  onMounted(fetchMonthlyIncome)
+  async function loadMonthlyIncome() {
+    await ensureFresh('passive_income:month', fetchMonthlyIncome)
+    loading.value = false
+  }
+
+  onMounted(loadMonthlyIncome)
 
   return {
     fiProgress,
     loading,
     error,
     refresh: fetchMonthlyIncome,
+    load: loadMonthlyIncome,
   }
 }
@@ -1,26 +1,68 @@
 import { GoogleGenerativeAI, GenerativeModel } from '@google/generative-ai'
 import { ref } from 'vue'
+import { parseIntentLocally, FAST_PATH_THRESHOLD } from './useIntentParser'
+import { createCache, normalizeKey, hashString } from './useCache'
+import { schedule, cancelLane, isRateLimited, SupersededError } from './useGeminiQueue'
 
 const apiKey = import.meta.env.VITE_GEMINI_API_KEY
 
-let genAI: GoogleGenerativeAI | null = null
 let model: GenerativeModel | null = null
 
-// Debug: Log API key status (not the key itself)
-console.log('[Gemini] API Key configured:', !!apiKey, apiKey ? `(${apiKey.substring(0, 8)}...)` : '')
+// Built on first use rather than at import, so loading the chat chunk stays cheap
+function getModel(): GenerativeModel | null {
+  if (!model && apiKey) {
+    try {
+      model = new GoogleGenerativeAI(apiKey).getGenerativeModel({ model: 'gemini-2.5-flash' })
+      console.log('[Gemini] Model initialized successfully')
+    } catch (err) {
+      console.error('[Gemini] Failed to initialize:', err)
+    }
+  }
+  return model
+}
+
+type IntentPath = 'fast' | 'cache' | 'gemini'
+
+export interface IntentStats {
+  fastPath: number
+  cached: number
+  gemini: number
+  fastPathMs: number
+  geminiMs: number
+  last: { path: IntentPath; ms: number; intent: ParsedIntent } | null
+}
+
+// Repeated utterances (quick suggestions especially) skip Gemini entirely.
+// Replies are keyed on the context hash too, so they go stale with the data.
+const intentCache = createCache<ParsedIntent>('intent', { maxEntries: 100, ttlMs: 30 * 60 * 1000 })
+const responseCache = createCache<string>('response', { maxEntries: 50, ttlMs: 10 * 60 * 1000 })
 
-if (apiKey) {
-  try {
-    genAI = new GoogleGenerativeAI(apiKey)
-    model = genAI.getGenerativeModel({ model: 'gemini-2.5-flash' })
-    console.log('[Gemini] Model initialized successfully')
-  } catch (err) {
-    console.error('[Gemini] Failed to initialize:', err)
+const intentStats: IntentStats = { fastPath: 0, cached: 0, gemini: 0, fastPathMs: 0, geminiMs: 0, last: null }
+window.__fiDebug = {
+  ...window.__fiDebug,
+  intent: intentStats,
+  cache: { intent: intentCache.stats, response: responseCache.stats }
+}
+
+function recordIntent(path: IntentPath, started: number, intent: ParsedIntent): ParsedIntent {
+  const ms = performance.now() - started
+  if (path === 'fast') {
+    intentStats.fastPath++
+    intentStats.fastPathMs += ms
+  } else if (path === 'cache') {
+    intentStats.cached++
+  } else {
+    intentStats.gemini++
+    intentStats.geminiMs += ms
   }
+  intentStats.last = { path, ms, intent }
+  return intent
 }
 
+export type EntryAction = 'add_expense' | 'add_income' | 'add_fd'
+
 export interface ParsedIntent {
-  action: 'add_expense' | 'add_income' | 'add_fd' | 'query' | 'unknown'
+  action: EntryAction | 'add_batch' | 'query' | 'unknown'
   data?: {
     amount?: number
     category?: string
@@ -33,8 +75,22 @@ export interface ParsedIntent {
     maturity_date?: string
     query_type?: 'net_worth' | 'expenses' | 'income' | 'fd_maturity' | 'fi_progress'
   }
+  // add_batch: several entries from one utterance, confirmed and saved together
+  entries?: IntentEntry[]
   confidence: number
   rawResponse?: string
+  // A newer parse in the same lane replaced this one before Gemini answered
+  superseded?: boolean
+}
+
+export interface IntentEntry {
+  action: EntryAction
+  data: NonNullable<ParsedIntent['data']>
+}
+
+function isEntry(entry: unknown): entry is IntentEntry {
+  const { action, data } = (entry || {}) as Partial<IntentEntry>
+  return (action === 'add_expense' || action === 'add_income' || action === 'add_fd') && !!data
 }
 
 const SYSTEM_PROMPT = `You are a financial assistant for a personal finance dashboard. Your job is to parse natural language into structured financial data.
@@ -44,11 +100,13 @@ When the user wants to:
 2. ADD INCOME - Extract: amount (number), source_type (fd_interest/dividend/rental/business/other), source_name
 3. ADD FD - Extract: bank_name, principal (number), interest_rate (number), maturity_date (YYYY-MM-DD format)
 4. QUERY - Identify what they're asking about: net_worth, expenses, income, fd_maturity, fi_progress
+5. ADD SEVERAL ENTRIES AT ONCE - Use action "add_batch" with an "entries" list, one {"action","data"} per entry, instead of "data"
 
 Respond ONLY with valid JSON in this exact format:
 {
-  "action": "add_expense" | "add_income" | "add_fd" | "query" | "unknown",
+  "action": "add_expense" | "add_income" | "add_fd" | "add_batch" | "query" | "unknown",
   "data": { ... extracted fields ... },
+  "entries": [ ... add_batch only ... ],
   "confidence": 0.0 to 1.0,
   "message": "Human readable confirmation or clarification"
 }
@@ -63,19 +121,79 @@ Response: {"action":"add_income","data":{"amount":10000,"source_type":"rental","
 User: "Add FD in SBI for 1 lakh at 7% maturing March 2026"
 Response: {"action":"add_fd","data":{"bank_name":"SBI","principal":100000,"interest_rate":7,"maturity_date":"2026-03-31"},"confidence":0.9,"message":"Creating FD in SBI: Rs 1,00,000 at 7% maturing March 2026."}
 
+User: "Spent 500 on groceries, 200 on auto and 1500 on electricity"
+Response: {"action":"add_batch","entries":[{"action":"add_expense","data":{"amount":500,"category":"food","description":"groceries"}},{"action":"add_expense","data":{"amount":200,"category":"transport","description":"auto"}},{"action":"add_expense","data":{"amount":1500,"category":"utilities","description":"electricity"}}],"confidence":0.9,"message":"Recording 3 expenses totalling Rs 2,200."}
+
 User: "What's my net worth?"
 Response: {"action":"query","data":{"query_type":"net_worth"},"confidence":1.0,"message":"Let me check your current net worth."}
 
 Always use INR (Indian Rupees). Convert lakhs/crores to numbers (1 lakh = 100000, 1 crore = 10000000).`
 
+function responsePrompt(context: string, question: string): string {
+  return `You are a helpful financial assistant. Here's the user's financial context:
+
+${context}
+
+User's question: ${question}
+
+Provide a helpful, concise response. Use Indian Rupees (Rs) format. Be encouraging about their financial journey.`
+}
+
+function errorMessage(err: unknown, fallback: string): string {
+  // Still rate limited after useGeminiQueue's retries
+  if (isRateLimited(err)) return 'Gemini is busy right now. Please try again in a moment.'
+  return err instanceof Error ? err.message : fallback
+}
+
+export interface ParseOptions {
+  // Parses in the same lane supersede each other (see useGeminiQueue)
+  lane?: string
+  // Leave isLoading alone: a speculative parse while the user is still talking
+  quiet?: boolean
+}
+
 export function useGemini() {
   const isLoading = ref(false)
   const error = ref<string | null>(null)
   const isConfigured = ref(!!apiKey)
 
-  async function parseUserInput(input: string): Promise<ParsedIntent> {
+  // A cancelled stream finishing late must not clear the loading state of the
+  // request that replaced it, so only the latest caller may reset it
+  let loadingToken = 0
+
+  function startLoading(): number {
+    isLoading.value = true
+    error.value = null
+    return ++loadingToken
+  }
+
+  function stopLoading(token: number): void {
+    if (token === loadingToken) isLoading.value = false
+  }
+
+  async function parseUserInput(input: string, options: ParseOptions = {}): Promise<ParsedIntent> {
     console.log('[Gemini] parseUserInput called with:', input)
+    const started = performance.now()
+    const { lane, quiet } = options
 
+    // Common utterances never need the network round trip. Answering without
+    // Gemini still supersedes whatever the lane had in flight.
+    const local = parseIntentLocally(input)
+    if (local.confidence >= FAST_PATH_THRESHOLD) {
+      console.log('[Gemini] Fast-path intent:', local)
+      if (lane) cancelLane(lane)
+      return recordIntent('fast', started, local)
+    }
+
+    const cacheKey = normalizeKey(input)
+    const cached = intentCache.get(cacheKey)
+    if (cached) {
+      console.log('[Gemini] Cached intent:', cached)
+      if (lane) cancelLane(lane)
+      return recordIntent('cache', started, cached)
+    }
+
+    const model = getModel()
     if (!model) {
       console.warn('[Gemini] Model not initialized')
       return {
@@ -85,15 +203,14 @@ export function useGemini() {
       }
     }
 
-    isLoading.value = true
-    error.value = null
+    const token = quiet ? null : startLoading()
 
     try {
       console.log('[Gemini] Sending request to Gemini API...')
-      const result = await model.generateContent([
+      const result = await schedule(signal => model.generateContent([
         { text: SYSTEM_PROMPT },
         { text: `User: ${input}` }
-      ])
+      ], { signal }), { key: `intent:${cacheKey}`, lane })
 
       const response = result.response.text()
       console.log('[Gemini] Response received:', response.substring(0, 200))
@@ -114,62 +231,133 @@ export function useGemini() {
       const parsed = JSON.parse(jsonStr)
       console.log('[Gemini] Parsed intent:', parsed)
 
-      return {
+      const intent: ParsedIntent = {
         action: parsed.action || 'unknown',
         data: parsed.data,
+        entries: Array.isArray(parsed.entries) ? parsed.entries.filter(isEntry) : undefined,
         confidence: parsed.confidence || 0.5,
         rawResponse: parsed.message || response
       }
+      intentCache.set(cacheKey, intent)
+      return recordIntent('gemini', started, intent)
     } catch (err) {
+      if (err instanceof SupersededError) {
+        console.log('[Gemini] Parse superseded:', input)
+        return { action: 'unknown', confidence: 0, superseded: true }
+      }
       console.error('[Gemini] Error:', err)
-      error.value = err instanceof Error ? err.message : 'Failed to parse input'
+      error.value = errorMessage(err, 'Failed to parse input')
       return {
         action: 'unknown',
         confidence: 0,
         rawResponse: error.value
       }
     } finally {
-      isLoading.value = false
+      if (token !== null) stopLoading(token)
     }
   }
 
   async function generateResponse(context: string, question: string): Promise<string> {
     console.log('[Gemini] generateResponse called')
 
+    const cacheKey = `${normalizeKey(question)}#${hashString(context)}`
+    const cached = responseCache.get(cacheKey)
+    if (cached) {
+      console.log('[Gemini] Cached response')
+      return cached
+    }
+
+    const model = getModel()
     if (!model) {
       console.warn('[Gemini] Model not initialized for response')
       return 'Gemini API not configured. Please set VITE_GEMINI_API_KEY.'
     }
 
-    isLoading.value = true
-    error.value = null
+    const token = startLoading()
 
     try {
-      const prompt = `You are a helpful financial assistant. Here's the user's financial context:
-
-${context}
-
-User's question: ${question}
-
-Provide a helpful, concise response. Use Indian Rupees (Rs) format. Be encouraging about their financial journey.`
-
       console.log('[Gemini] Generating response...')
-      const result = await model.generateContent(prompt)
+      const result = await schedule(signal => model.generateContent(responsePrompt(context, question), { signal }),
+        { key: `response:${cacheKey}` })
       const response = result.response.text()
       console.log('[Gemini] Response generated:', response.substring(0, 100))
+      responseCache.set(cacheKey, response)
       return response
     } catch (err) {
       console.error('[Gemini] generateResponse error:', err)
-      error.value = err instanceof Error ? err.message : 'Failed to generate response'
+      error.value = errorMessage(err, 'Failed to generate response')
       return `Sorry, I encountered an error: ${error.value}`
     } finally {
-      isLoading.value = false
+      stopLoading(token)
+    }
+  }
+
+  // Like generateResponse, but hands each piece of the reply to onChunk as it
+  // arrives. isLoading drops at the first chunk, when the reply bubble takes
+  // over from the typing indicator. Aborting `signal` keeps what arrived so far.
+  async function streamResponse(
+    context: string,
+    question: string,
+    onChunk: (text: string) => void,
+    signal?: AbortSignal
+  ): Promise<string> {
+    console.log('[Gemini] streamResponse called')
+
+    const cacheKey = `${normalizeKey(question)}#${hashString(context)}`
+    const cached = responseCache.get(cacheKey)
+    if (cached) {
+      console.log('[Gemini] Cached response')
+      onChunk(cached)
+      return cached
+    }
+
+    const model = getModel()
+    if (!model) {
+      console.warn('[Gemini] Model not initialized for response')
+      const message = 'Gemini API not configured. Please set VITE_GEMINI_API_KEY.'
+      onChunk(message)
+      return message
+    }
+
+    const token = startLoading()
+    let text = ''
+
+    try {
+      console.log('[Gemini] Streaming response...')
+      // The whole stream holds its queue slot; once chunks have been shown,
+      // a failure is reported rather than retried from the start
+      await schedule(async taskSignal => {
+        const result = await model.generateContentStream(responsePrompt(context, question), { signal: taskSignal })
+        for await (const chunk of result.stream) {
+          const piece = chunk.text()
+          if (!piece) continue
+          if (!text) stopLoading(token)
+          text += piece
+          onChunk(piece)
+        }
+      }, { signal, canRetry: () => !text })
+      console.log('[Gemini] Stream complete:', text.substring(0, 100))
+      responseCache.set(cacheKey, text)
+      return text
+    } catch (err) {
+      if (signal?.aborted || err instanceof SupersededError) {
+        console.log('[Gemini] Stream cancelled')
+        return text
+      }
+      console.error('[Gemini] streamResponse error:', err)
+      error.value = errorMessage(err, 'Failed to generate response')
+      const message = `Sorry, I encountered an error: ${error.value}`
+      onChunk(text ? `\n\n${message}` : message)
+      return text + message
+    } finally {
+      stopLoading(token)
     }
   }
 
   return {
     parseUserInput,
     generateResponse,
+    streamResponse,
     isLoading,
     error,
     isConfigured
@@ -0,0 +1,247 @@
+// Every Gemini call from useGemini goes through this queue. Identical prompts
+// already in flight in the same lane share one request; a request in a lane (the chat input)
+// aborts the one it replaces, so an older reply can never land after a newer
+// one; at most MAX_CONCURRENT run at once and the rest wait their turn; 429s
+// and 5xx are retried with jittered exponential backoff, and a 429 also holds
+// back everything queued until its backoff has passed.
+
+export interface GeminiQueueStats {
+  // Waiting for a slot or a retry / running now, and the deepest the queue has been
+  queued: number
+  running: number
+  peakQueued: number
+  peakRunning: number
+  // Attempts sent to Gemini, retries included
+  requests: number
+  deduped: number
+  superseded: number
+  retries: number
+  rateLimited: number
+  // Gave up: not retryable, or out of retries
+  failed: number
+  // Queued -> first attempt started, per request
+  waitMs: number[]
+}
+
+export interface ScheduleOptions {
+  // Requests with the same key and lane while one is in flight share its result
+  key?: string
+  // At most one live request per lane: a newer one aborts the older
+  lane?: string
+  // Aborts this request from outside (the chat's stop / new message)
+  signal?: AbortSignal
+  // Checked before a retry; false once the caller has used partial output
+  canRetry?: () => boolean
+}
+
+// What a superseded or aborted request rejects with
+export class SupersededError extends Error {
+  constructor() {
+    super('Superseded by a newer request')
+    this.name = 'SupersededError'
+  }
+}
+
+interface Task {
+  run: (signal: AbortSignal) => Promise<unknown>
+  options: ScheduleOptions
+  // inFlight key: options.key within its lane
+  shareKey: string | null
+  controller: AbortController
+  promise: Promise<unknown>
+  resolve: (value: unknown) => void
+  reject: (reason: unknown) => void
+  queuedAt: number
+  attempt: number
+  settled: boolean
+}
+
+const MAX_CONCURRENT = 2
+const MAX_RETRIES = 3
+const BASE_BACKOFF_MS = 500
+const MAX_BACKOFF_MS = 8 * 1000
+// waitMs keeps this many of the latest samples
+const MAX_SAMPLES = 500
+
+const waiting: Task[] = []
+// By shareKey. A task in one lane is never shared with another lane's caller:
+// cancelLane() would abort it under them.
+const inFlight = new Map<string, Task>()
+const lanes = new Map<string, Task>()
+let running = 0
+// Waiting out a retry backoff, outside `waiting` until it ends
+let backingOff = 0
+// A 429 pauses the queue until then (epoch ms)
+let pausedUntil = 0
+let pauseTimer: ReturnType<typeof setTimeout> | null = null
+
+const stats: GeminiQueueStats = {
+  queued: 0, running: 0, peakQueued: 0, peakRunning: 0, requests: 0, deduped: 0,
+  superseded: 0, retries: 0, rateLimited: 0, failed: 0, waitMs: []
+}
+
+window.__fiDebug = { ...window.__fiDebug, gemini: stats }
+
+// GoogleGenerativeAIFetchError carries the HTTP status; anything else has none
+function statusOf(err: unknown): number {
+  return (err as { status?: number } | null)?.status ?? 0
+}
+
+function retryable(err: unknown): boolean {
+  const status = statusOf(err)
+  return status === 429 || status >= 500
+}
+
+export function isRateLimited(err: unknown): boolean {
+  return statusOf(err) === 429
+}
+
+// Same shape as useOutbox's: half the doubled ceiling plus up to half again
+function backoff(attempt: number): number {
+  const ceiling = Math.min(MAX_BACKOFF_MS, BASE_BACKOFF_MS * 2 ** (attempt - 1))
+  return ceiling / 2 + Math.random() * ceiling / 2
+}
+
+// gemini:idle marks the queue emptying, for the Playwright harness
+// (harness/bench_gemini.py) to wait on
+function track(): void {
+  const queued = waiting.length + backingOff
+  if (!queued && !running && (stats.queued || stats.running)) {
+    performance.clearMarks('gemini:idle')
+    performance.mark('gemini:idle')
+  }
+  stats.queued = queued
+  stats.running = running
+  stats.peakQueued = Math.max(stats.peakQueued, queued)
+  stats.peakRunning = Math.max(stats.peakRunning, running)
+}
+
+function release(task: Task): void {
+  const { lane } = task.options
+  if (task.shareKey && inFlight.get(task.shareKey) === task) inFlight.delete(task.shareKey)
+  if (lane && lanes.get(lane) === task) lanes.delete(lane)
+}
+
+function settle(task: Task, outcome: () => void): void {
+  if (task.settled) return
+  task.settled = true
+  release(task)
+  outcome()
+}
+
+function abort(task: Task): void {
+  if (task.settled) return
+  stats.superseded++
+  const index = waiting.indexOf(task)
+  if (index >= 0) waiting.splice(index, 1)
+  // A running attempt frees its slot once the aborted fetch actually settles
+  task.controller.abort()
+  settle(task, () => task.reject(new SupersededError()))
+  track()
+}
+
+function pump(): void {
+  const pause = pausedUntil - Date.now()
+  if (pause > 0) {
+    if (pauseTimer === null) {
+      pauseTimer = setTimeout(() => {
+        pauseTimer = null
+        pump()
+      }, pause)
+    }
+    track()
+    return
+  }
+  while (running < MAX_CONCURRENT && waiting.length) {
+    start(waiting.shift()!)
+  }
+  track()
+}
+
+async function start(task: Task): Promise<void> {
+  running++
+  stats.requests++
+  if (task.attempt === 0) {
+    stats.waitMs.push(Date.now() - task.queuedAt)
+    if (stats.waitMs.length > MAX_SAMPLES) stats.waitMs.shift()
+  }
+
+  try {
+    const value = await task.run(task.controller.signal)
+    settle(task, () => task.resolve(value))
+  } catch (err) {
+    if (task.settled) return
+    if (isRateLimited(err)) stats.rateLimited++
+
+    const canRetry = task.options.canRetry ? task.options.canRetry() : true
+    if (retryable(err) && canRetry && task.attempt < MAX_RETRIES) {
+      task.attempt++
+      stats.retries++
+      const delay = backoff(task.attempt)
+      console.warn(`[Gemini] ${statusOf(err)} from Gemini, retry ${task.attempt} in ${Math.round(delay)} ms`)
+      if (isRateLimited(err)) pausedUntil = Math.max(pausedUntil, Date.now() + delay)
+      backingOff++
+      setTimeout(() => {
+        backingOff--
+        // Back to the front: it has waited its turn already
+        if (!task.settled) waiting.unshift(task)
+        pump()
+      }, delay)
+    } else {
+      stats.failed++
+      settle(task, () => task.reject(err))
+    }
+  } finally {
+    running--
+    pump()
+  }
+}
+
+/**
+ * Run `run` when a slot is free, with the queue's dedupe, lane and retry
+ * rules. `run` gets the signal to hand to the SDK; rejects with
+ * SupersededError when aborted through a lane or options.signal.
+ */
+export function schedule<T>(run: (signal: AbortSignal) => Promise<T>, options: ScheduleOptions = {}): Promise<T> {
+  const { key, lane, signal } = options
+
+  const shareKey = key ? `${lane || ''}\n${key}` : null
+  const shared = shareKey ? inFlight.get(shareKey) : undefined
+  if (shared) {
+    stats.deduped++
+    return shared.promise as Promise<T>
+  }
+  if (lane) cancelLane(lane)
+
+  let resolve!: (value: unknown) => void
+  let reject!: (reason: unknown) => void
+  const promise = new Promise<unknown>((res, rej) => {
+    resolve = res
+    reject = rej
+  })
+  const task: Task = {
+    run, options, shareKey, promise, resolve, reject,
+    controller: new AbortController(),
+    queuedAt: Date.now(),
+    attempt: 0,
+    settled: false
+  }
+
+  if (signal?.aborted) {
+    abort(task)
+    return promise as Promise<T>
+  }
+  signal?.addEventListener('abort', () => abort(task), { once: true })
+  if (shareKey) inFlight.set(shareKey, task)
+  if (lane) lanes.set(lane, task)
+
+  waiting.push(task)
+  pump()
+  return promise as Promise<T>
+}
+
+// Abort whatever is queued or running in `lane`
+export function cancelLane(lane: string): void {
+  const task = lanes.get(lane)
+  if (task) abort(task)
+}
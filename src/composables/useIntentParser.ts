@@ -0,0 +1,291 @@
+import type { EntryAction, IntentEntry, ParsedIntent } from './useGemini'
+
+// Rule-based parser for the utterance shapes in useGemini's SYSTEM_PROMPT.
+// Anything it is not confident about goes to Gemini instead.
+export const FAST_PATH_THRESHOLD = 0.85
+
+type QueryType = NonNullable<NonNullable<ParsedIntent['data']>['query_type']>
+
+const MULTIPLIERS: Record<string, number> = {
+  k: 1000,
+  thousand: 1000,
+  l: 100000,
+  lac: 100000,
+  lacs: 100000,
+  lakh: 100000,
+  lakhs: 100000,
+  cr: 10000000,
+  crore: 10000000,
+  crores: 10000000,
+}
+
+const MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december']
+
+const EXPENSE_KEYWORDS: Record<string, string[]> = {
+  food: ['grocery', 'groceries', 'food', 'restaurant', 'lunch', 'dinner', 'breakfast', 'swiggy', 'zomato', 'vegetables', 'milk', 'snacks', 'coffee', 'tea'],
+  transport: ['auto', 'taxi', 'uber', 'ola', 'cab', 'bus', 'train', 'metro', 'petrol', 'fuel', 'diesel', 'parking', 'flight', 'toll'],
+  utilities: ['electricity', 'water', 'gas', 'internet', 'wifi', 'broadband', 'mobile', 'phone', 'recharge', 'bill', 'eb'],
+  entertainment: ['movie', 'movies', 'netflix', 'prime', 'hotstar', 'concert', 'game', 'games', 'outing'],
+  healthcare: ['doctor', 'medicine', 'medicines', 'hospital', 'pharmacy', 'medical', 'clinic', 'dental', 'insurance'],
+  education: ['school', 'fees', 'tuition', 'books', 'course', 'college', 'exam'],
+  personal: ['haircut', 'salon', 'clothes', 'shopping', 'gift', 'gym'],
+  housing: ['rent', 'maintenance', 'repair', 'furniture', 'house'],
+}
+
+const INCOME_SOURCES: [RegExp, string][] = [
+  [/\b(rent|rental|tenant)\b/, 'rental'],
+  [/\bdividends?\b/, 'dividend'],
+  [/\b(interest|fd)\b/, 'fd_interest'],
+  [/\b(business|consulting|freelance|shop)\b/, 'business'],
+]
+
+const BANKS = ['SBI', 'HDFC', 'ICICI', 'Axis', 'Kotak', 'PNB', 'BOB', 'Canara', 'IDFC', 'IndusInd', 'Yes Bank', 'Union Bank', 'Indian Bank', 'Bank of Baroda', 'Post Office']
+
+const QUERY_PATTERNS: [RegExp, QueryType][] = [
+  [/\bnet\s*worth\b|\btotal assets\b|\bhow much am i worth\b/, 'net_worth'],
+  [/\bmatur|\bfds?\b.*\b(due|expir|upcoming)/, 'fd_maturity'],
+  [/\bfi\b|\bfinancial (freedom|independence)\b|\bprogress\b/, 'fi_progress'],
+  [/\bincome\b|\bearn(ed|ing|ings)?\b/, 'income'],
+  [/\bspen[dt]\b|\bspending\b|\bexpenses?\b/, 'expenses'],
+]
+
+// The chat window's suggestion chips, sent as they read: the most repeated inputs
+const SUGGESTION_QUERIES: Record<string, QueryType> = {
+  'my net worth': 'net_worth',
+  'fi progress': 'fi_progress',
+}
+
+// Advice and open-ended questions are conversational; only Gemini can answer those
+const ADVICE = /\b(tips?|advice|should|suggest|recommend|why|how (can|do|to|should)|better|faster|plan|think|compare|reduce|cut|improve|increase|afford|enough)\b/
+const QUESTION = /\?$|^(what|what's|whats|how|show|tell|list|which|when|am i|do i)\b/
+const EXPENSE_VERBS = /\b(spent|spend|paid|pay|bought|buy|expense|cost)\b/
+const INCOME_VERBS = /\b(received|receive|got|earned|credited|income|collected)\b/
+const FD_WORDS = /\b(fd|fixed deposit)\b/
+
+function findAmounts(text: string): number[] {
+  const amounts: number[] = []
+  text = text.replace(/\b\d{4}-\d{2}-\d{2}\b/g, ' ')
+  const pattern = /(?:rs\.?|₹|inr)?\s*(\d+(?:\.\d+)?)\s*(k|thousand|l|lacs?|lakhs?|cr|crores?)?\b(\s*%|\s*(?:years?|yrs?|months?|days?))?/g
+  let match: RegExpExecArray | null
+  while ((match = pattern.exec(text)) !== null) {
+    // "7%" is a rate and "1 year" a tenure, not amounts
+    if (match[3]) continue
+    // "March 2026" is a date
+    const before = text.slice(0, match.index).trim().split(/\s+/).pop() || ''
+    if (!match[2] && MONTHS.includes(before)) continue
+
+    const multiplier = match[2] ? MULTIPLIERS[match[2]] : 1
+    amounts.push(Math.round(parseFloat(match[1]) * multiplier))
+  }
+  return amounts
+}
+
+function formatAmount(amount: number): string {
+  return amount.toLocaleString('en-IN')
+}
+
+function toDateString(date: Date): string {
+  const month = String(date.getMonth() + 1).padStart(2, '0')
+  const day = String(date.getDate()).padStart(2, '0')
+  return `${date.getFullYear()}-${month}-${day}`
+}
+
+function parseMaturity(text: string, today: Date): string | undefined {
+  const iso = text.match(/\b(\d{4}-\d{2}-\d{2})\b/)
+  if (iso) return iso[1]
+
+  // "maturing March 2026" -> last day of that month
+  const monthYear = text.match(new RegExp(`\\b(${MONTHS.join('|')}|${MONTHS.map(m => m.slice(0, 3)).join('|')})\\s+(\\d{4})\\b`))
+  if (monthYear) {
+    const month = MONTHS.findIndex(m => m.startsWith(monthYear[1].slice(0, 3)))
+    return toDateString(new Date(Number(monthYear[2]), month + 1, 0))
+  }
+
+  // "for 1 year" / "for 18 months"
+  const tenure = text.match(/\b(\d+(?:\.\d+)?)\s*(years?|yrs?|months?|days?)\b/)
+  if (tenure) {
+    const value = parseFloat(tenure[1])
+    const maturity = new Date(today)
+    if (tenure[2].startsWith('y')) maturity.setMonth(maturity.getMonth() + Math.round(value * 12))
+    else if (tenure[2].startsWith('m')) maturity.setMonth(maturity.getMonth() + Math.round(value))
+    else maturity.setDate(maturity.getDate() + Math.round(value))
+    return toDateString(maturity)
+  }
+
+  return undefined
+}
+
+function findBank(original: string): string | undefined {
+  const lower = original.toLowerCase()
+  const known = BANKS.find(bank => new RegExp(`\\b${bank.toLowerCase()}\\b`).test(lower))
+  if (known) return known
+
+  const named = original.match(/\b(?:in|with|at)\s+([A-Z][A-Za-z]+(?:\s+Bank)?)/)
+  return named ? named[1] : undefined
+}
+
+function expenseCategory(text: string): string | undefined {
+  const words = text.split(/[^a-z]+/)
+  for (const [category, keywords] of Object.entries(EXPENSE_KEYWORDS)) {
+    if (keywords.some(keyword => words.includes(keyword))) return category
+  }
+  return undefined
+}
+
+function objectPhrase(text: string): string | undefined {
+  const match = text.match(/\b(?:on|for)\s+([a-z][a-z\s]*?)(?:\s+(?:today|yesterday|bill))?$/)
+  return match ? match[1].trim() : undefined
+}
+
+function queryIntent(queryType: QueryType): ParsedIntent {
+  return {
+    action: 'query',
+    data: { query_type: queryType },
+    confidence: 0.95,
+    rawResponse: 'Let me check that for you.'
+  }
+}
+
+function parseQuery(text: string): ParsedIntent | null {
+  const suggestion = SUGGESTION_QUERIES[text.replace(/[\s?.!]+$/, '')]
+  if (suggestion) return queryIntent(suggestion)
+
+  if (!QUESTION.test(text) || ADVICE.test(text)) return null
+  const match = QUERY_PATTERNS.find(([pattern]) => pattern.test(text))
+  return match ? queryIntent(match[1]) : null
+}
+
+function parseFD(text: string, original: string, amount: number, today: Date): ParsedIntent {
+  const rate = text.match(/(\d+(?:\.\d+)?)\s*%/)
+  const bank = findBank(original)
+  const maturity = parseMaturity(text, today)
+
+  let confidence = 0.95
+  if (!bank) confidence -= 0.2
+  if (!rate) confidence -= 0.2
+  if (!maturity) confidence -= 0.1
+
+  return {
+    action: 'add_fd',
+    data: {
+      bank_name: bank,
+      principal: amount,
+      interest_rate: rate ? parseFloat(rate[1]) : undefined,
+      maturity_date: maturity
+    },
+    confidence,
+    rawResponse: `Creating FD in ${bank || 'your bank'}: Rs ${formatAmount(amount)}${rate ? ` at ${rate[1]}%` : ''}${maturity ? ` maturing ${maturity}` : ''}.`
+  }
+}
+
+function parseIncome(text: string, original: string, amount: number): ParsedIntent {
+  const source = INCOME_SOURCES.find(([pattern]) => pattern.test(text))
+  const from = original.match(/\bfrom\s+([A-Za-z][A-Za-z\s]*)$/)
+  const sourceType = source ? source[1] : 'other'
+  const sourceName = from ? from[1].trim() : objectPhrase(text) || sourceType.replace('_', ' ')
+
+  return {
+    action: 'add_income',
+    data: { amount, source_type: sourceType, source_name: sourceName },
+    confidence: source ? 0.95 : 0.7,
+    rawResponse: `Recording Rs ${formatAmount(amount)} ${sourceType.replace('_', ' ')} income.`
+  }
+}
+
+function parseExpense(text: string, amount: number): ParsedIntent {
+  const category = expenseCategory(text)
+  const description = objectPhrase(text) || category || 'expense'
+
+  return {
+    action: 'add_expense',
+    data: { amount, category: category || 'other', description },
+    confidence: category ? 0.95 : 0.7,
+    rawResponse: `Recording Rs ${formatAmount(amount)} expense for ${description}${category ? ` under ${category.charAt(0).toUpperCase()}${category.slice(1)} category` : ''}.`
+  }
+}
+
+// Which kind of entry a clause is from its own words, if it says
+function entryAction(text: string): EntryAction | null {
+  if (FD_WORDS.test(text) && !/\binterest\b/.test(text)) return 'add_fd'
+  if (INCOME_VERBS.test(text) && !EXPENSE_VERBS.test(text)) return 'add_income'
+  if (EXPENSE_VERBS.test(text)) return 'add_expense'
+  return null
+}
+
+function parseEntry(action: EntryAction, text: string, original: string, amount: number, today: Date): ParsedIntent {
+  if (action === 'add_fd') return parseFD(text, original, amount, today)
+  if (action === 'add_income') return parseIncome(text, original, amount)
+  return parseExpense(text, amount)
+}
+
+// "spent 500 on groceries, 200 on auto and 1500 on electricity": one clause
+// per amount. A clause without an amount ("bread and butter") belongs to the
+// one before it.
+function splitClauses(normalized: string): string[] {
+  const clauses: string[] = []
+  for (const part of normalized.split(/\s*(?:[,;]|\band\b|\bthen\b|\bplus\b)\s*/i)) {
+    if (!part) continue
+    if (clauses.length && findAmounts(part.toLowerCase()).length === 0) {
+      clauses[clauses.length - 1] += ` and ${part}`
+    } else {
+      clauses.push(part)
+    }
+  }
+  return clauses
+}
+
+// Clauses without a verb of their own ("200 on auto") take the previous
+// clause's kind, so "received 10000 rent and 2500 dividend" is two incomes
+function parseBatch(normalized: string, today: Date): ParsedIntent {
+  const clauses = splitClauses(normalized)
+  const entries: IntentEntry[] = []
+  let confidence = 1
+  let previous: EntryAction | null = null
+
+  for (const clause of clauses) {
+    const text = clause.toLowerCase()
+    const amounts = findAmounts(text)
+    const action = entryAction(text) || previous || (/^\d/.test(text) || /\b(on|for)\b/.test(text) ? 'add_expense' : null)
+    if (amounts.length !== 1 || !action) {
+      return { action: 'unknown', confidence: 0 }
+    }
+    const entry = parseEntry(action, text, clause, amounts[0], today)
+    entries.push({ action, data: entry.data! })
+    confidence = Math.min(confidence, entry.confidence)
+    previous = action
+  }
+
+  const total = entries.reduce((sum, entry) => sum + (entry.data.amount ?? entry.data.principal ?? 0), 0)
+  return {
+    action: 'add_batch',
+    entries,
+    confidence,
+    rawResponse: `Recording ${entries.length} entries totalling Rs ${formatAmount(total)}.`
+  }
+}
+
+export function parseIntentLocally(input: string, today: Date = new Date()): ParsedIntent {
+  const original = input.trim()
+  // Same length and offsets as `text`, so clauses split on it keep their case
+  const normalized = original.replace(/(\d),(?=\d)/g, '$1').replace(/\s+/g, ' ')
+  const text = normalized.toLowerCase()
+
+  // Questions first, so "what did I spend in 2025?" isn't an expense of 2025
+  const query = parseQuery(text)
+  if (query) return query
+
+  const amounts = findAmounts(text)
+  if (amounts.length === 0) {
+    return { action: 'unknown', confidence: 0 }
+  }
+  // "500 on food and 200 on auto": one entry per amount, confirmed together
+  if (amounts.length > 1) {
+    return parseBatch(normalized, today)
+  }
+
+  const action = entryAction(text) || (/^\d/.test(text) || /\b(on|for)\b/.test(text) ? 'add_expense' : null)
+  if (!action) {
+    return { action: 'unknown', confidence: 0 }
+  }
+  return parseEntry(action, text, original, amounts[0], today)
+}
@@ -0,0 +1,305 @@
+import { ref } from 'vue'
+import { useSupabase } from './useSupabase'
+import { notifySync } from './useDataStore'
+
+// Inserts from the forms and the chatbot go through here instead of straight
+// to Supabase: the row is kept in IndexedDB, handed back at once for the
+// table composable to show, and sent in the background. Writes queued close
+// together share one bulk request per table; failed sends are retried with
+// backoff until the connection comes back. Each write carries a client_id,
+// which is also the optimistic row's id until the server's id replaces it,
+// and the upsert on client_id (20261018030000_outbox_client_ids.sql) makes a
+// retried batch return the rows it already created instead of duplicating them.
+
+export type OutboxTable = 'expenses' | 'passive_income' | 'fd_tracker'
+
+export interface OutboxWrite {
+  client_id: string
+  table: OutboxTable
+  // The insert payload, client_id included
+  row: Record<string, unknown>
+  queuedAt: number
+}
+
+export interface OutboxStats {
+  queued: number
+  // Writes not yet acknowledged by Supabase
+  pending: number
+  // Requests sent, and rows acknowledged by them
+  batches: number
+  sent: number
+  retries: number
+  rejected: number
+  // Queued -> acknowledged, per write
+  syncMs: number[]
+  lastError: string | null
+}
+
+const DB_NAME = 'fi-outbox'
+const STORE_NAME = 'writes'
+// Writes queued within this window go out in the same request
+const COALESCE_MS = 50
+const MAX_BATCH = 200
+const BASE_BACKOFF_MS = 1000
+const MAX_BACKOFF_MS = 30 * 1000
+// syncMs keeps this many of the latest samples
+const MAX_SAMPLES = 500
+
+// Queue order: Map iterates in insertion order
+const writes = new Map<string, OutboxWrite>()
+const pending = ref(0)
+const lastError = ref<string | null>(null)
+const stats: OutboxStats = { queued: 0, pending: 0, batches: 0, sent: 0, retries: 0, rejected: 0, syncMs: [], lastError: null }
+
+window.__fiDebug = { ...window.__fiDebug, outbox: stats }
+
+let timer: ReturnType<typeof setTimeout> | null = null
+let flushing: Promise<void> | null = null
+// Consecutive flushes that left retryable writes behind
+let failures = 0
+
+let dbPromise: Promise<IDBDatabase | null> | null = null
+
+function openDb(): Promise<IDBDatabase | null> {
+  if (!dbPromise) {
+    dbPromise = new Promise(resolve => {
+      if (typeof indexedDB === 'undefined') return resolve(null)
+      const request = indexedDB.open(DB_NAME, 1)
+      request.onupgradeneeded = () => request.result.createObjectStore(STORE_NAME, { keyPath: 'client_id' })
+      request.onsuccess = () => resolve(request.result)
+      request.onerror = () => {
+        console.warn('[Outbox] IndexedDB unavailable, queued writes will not survive a reload:', request.error)
+        resolve(null)
+      }
+    })
+  }
+  return dbPromise
+}
+
+async function persist(apply: (store: IDBObjectStore) => void): Promise<void> {
+  const db = await openDb()
+  if (!db) return
+  await new Promise<void>((resolve, reject) => {
+    const tx = db.transaction(STORE_NAME, 'readwrite')
+    apply(tx.objectStore(STORE_NAME))
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+}
+
+async function readQueued(): Promise<OutboxWrite[]> {
+  const db = await openDb()
+  if (!db) return []
+  return new Promise((resolve, reject) => {
+    const request = db.transaction(STORE_NAME).objectStore(STORE_NAME).getAll()
+    request.onsuccess = () => resolve(request.result as OutboxWrite[])
+    request.onerror = () => reject(request.error)
+  })
+}
+
+// outbox:drained marks the queue emptying, for the Playwright harness
+// (harness/bench_outbox.py) to wait on
+function setPending(): void {
+  if (writes.size === 0 && stats.pending > 0) {
+    performance.clearMarks('outbox:drained')
+    performance.mark('outbox:drained')
+  }
+  pending.value = writes.size
+  stats.pending = writes.size
+}
+
+// What the table composables show until the server's row arrives
+function optimisticRow(write: OutboxWrite): Record<string, unknown> {
+  return { ...write.row, id: write.client_id, created_at: new Date(write.queuedAt).toISOString() }
+}
+
+function retryable(status: number): boolean {
+  // 0: the request never got an answer (offline, DNS, CORS, aborted)
+  return status === 0 || status === 408 || status === 429 || status >= 500
+}
+
+// Full jitter on top of the doubling, so reconnecting tabs do not retry in step
+function backoff(attempt: number): number {
+  const ceiling = Math.min(MAX_BACKOFF_MS, BASE_BACKOFF_MS * 2 ** (attempt - 1))
+  return ceiling / 2 + Math.random() * ceiling / 2
+}
+
+function scheduleFlush(delay = COALESCE_MS): void {
+  if (timer !== null) return
+  timer = setTimeout(() => {
+    timer = null
+    flush()
+  }, delay)
+}
+
+async function settle(table: OutboxTable, batch: OutboxWrite[], saved: Map<string, unknown> | null, error?: string): Promise<void> {
+  try {
+    await persist(store => batch.forEach(write => store.delete(write.client_id)))
+  } catch (e) {
+    console.warn('[Outbox] Could not clear sent writes from IndexedDB:', e)
+  }
+  const now = Date.now()
+  batch.forEach(write => {
+    writes.delete(write.client_id)
+    const row = saved ? saved.get(write.client_id) ?? null : null
+    if (row) {
+      stats.syncMs.push(now - write.queuedAt)
+      if (stats.syncMs.length > MAX_SAMPLES) stats.syncMs.shift()
+    }
+    notifySync(table, optimisticRow(write), row, error)
+  })
+  setPending()
+}
+
+// One bulk upsert; true when nothing in `batch` needs another attempt
+async function send(table: OutboxTable, batch: OutboxWrite[]): Promise<boolean> {
+  const { supabase } = useSupabase()
+  let status = 0
+  let message = 'Network error'
+
+  try {
+    const response = await supabase
+      .from(table)
+      .upsert(batch.map(write => write.row), { onConflict: 'client_id' })
+      .select()
+    status = response.status
+    stats.batches++
+
+    if (!response.error) {
+      const saved = new Map<string, unknown>((response.data || []).map((row): [string, unknown] => [row.client_id, row]))
+      const landed = batch.filter(write => saved.has(write.client_id))
+      stats.sent += landed.length
+      await settle(table, landed, saved)
+      return landed.length === batch.length
+    }
+    message = response.error.message
+  } catch (e) {
+    message = e instanceof Error ? e.message : message
+  }
+
+  lastError.value = message
+  stats.lastError = message
+  if (retryable(status)) return false
+
+  // Rejected outright: find the offending rows instead of dropping the batch
+  if (batch.length > 1) {
+    const results = await Promise.all(batch.map(write => send(table, [write])))
+    return results.every(Boolean)
+  }
+  console.error(`[Outbox] ${table} rejected a queued write:`, message, batch[0].row)
+  stats.rejected++
+  await settle(table, batch, null, message)
+  return true
+}
+
+async function sendAll(): Promise<void> {
+  const byTable = new Map<OutboxTable, OutboxWrite[]>()
+  writes.forEach(write => {
+    const queued = byTable.get(write.table)
+    if (queued) queued.push(write)
+    else byTable.set(write.table, [write])
+  })
+
+  const requests: Promise<boolean>[] = []
+  byTable.forEach((queued, table) => {
+    for (let i = 0; i < queued.length; i += MAX_BATCH) {
+      requests.push(send(table, queued.slice(i, i + MAX_BATCH)))
+    }
+  })
+  const done = (await Promise.all(requests)).every(Boolean)
+
+  if (!done) {
+    failures++
+    stats.retries++
+    const delay = backoff(failures)
+    console.warn(`[Outbox] ${writes.size} writes not sent, retrying in ${Math.round(delay)} ms`)
+    scheduleFlush(delay)
+    return
+  }
+  failures = 0
+  lastError.value = null
+  stats.lastError = null
+  // Queued while this flush was in flight
+  if (writes.size) scheduleFlush()
+}
+
+/**
+ * Send everything queued now. Concurrent calls share one flush; offline, it
+ * waits for the browser's 'online' event instead of burning retries.
+ */
+export function flush(): Promise<void> {
+  if (flushing) return flushing
+  if (!writes.size || !navigator.onLine) return Promise.resolve()
+
+  flushing = sendAll().finally(() => {
+    flushing = null
+  })
+  return flushing
+}
+
+/**
+ * Queue inserts into `table`. Resolves once they are in IndexedDB, with the
+ * optimistic rows (id = client_id) in the order given.
+ */
+export async function queueInserts<T>(table: OutboxTable, rows: Record<string, unknown>[]): Promise<T[]> {
+  const queuedAt = Date.now()
+  const batch = rows.map(row => {
+    const clientId = crypto.randomUUID()
+    const write: OutboxWrite = { client_id: clientId, table, row: { ...row, client_id: clientId }, queuedAt }
+    writes.set(clientId, write)
+    return write
+  })
+  stats.queued += batch.length
+  setPending()
+
+  try {
+    await persist(store => batch.forEach(write => store.put(write)))
+  } catch (e) {
+    // Still sent from memory; only a reload before then would lose them
+    console.warn('[Outbox] Could not persist queued writes:', e)
+  }
+  scheduleFlush()
+  return batch.map(write => optimisticRow(write) as T)
+}
+
+// Queued rows of `table` missing from a fresh fetch, to merge back into it
+export function queuedRows<T extends { client_id?: string | null }>(table: OutboxTable, fetched: T[]): T[] {
+  const present = new Set(fetched.map(row => row.client_id))
+  return [...writes.values()]
+    .filter(write => write.table === table && !present.has(write.client_id))
+    .map(write => optimisticRow(write) as T)
+}
+
+// Writes left over from an earlier session go out as soon as we can
+readQueued()
+  .then(restored => {
+    restored
+      .sort((a, b) => a.queuedAt - b.queuedAt)
+      .forEach(write => {
+        if (!writes.has(write.client_id)) writes.set(write.client_id, write)
+      })
+    setPending()
+    if (restored.length) {
+      console.log(`[Outbox] Restored ${restored.length} queued writes`)
+      scheduleFlush(0)
+    }
+  })
+  .catch(e => console.warn('[Outbox] Could not read queued writes:', e))
+
+window.addEventListener('online', () => {
+  failures = 0
+  if (timer !== null) {
+    clearTimeout(timer)
+    timer = null
+  }
+  flush()
+})
+
+export function useOutbox() {
+  return {
+    pending,
+    lastError,
+    flush,
+  }
+}
@@ -1,11 +1,31 @@
 import { ref } from 'vue'
 import { useSupabase } from './useSupabase'
-import type { PassiveIncome } from '@/types/database'
+import { ensureFresh, markFetched, invalidate, notifyInsert, onSync, insertSorted } from './useDataStore'
+import { queueInserts, queuedRows } from './useOutbox'
+import type { PassiveIncome, PageCursor } from '@/types/database'
+
+// Shared by every usePassiveIncome() caller
+const incomes = ref<PassiveIncome[]>([])
+
+// fetchIncomes order: newest first
+function newerIncome(a: PassiveIncome, b: PassiveIncome): boolean {
+  return a.income_date > b.income_date
+}
+
+onSync('passive_income', (queued, saved) => {
+  const index = incomes.value.findIndex(i => i.id === (queued as PassiveIncome).id)
+  if (index < 0) {
+    if (saved) invalidate('passive_income')
+  } else if (saved) {
+    incomes.value[index] = saved as PassiveIncome
+  } else {
+    incomes.value.splice(index, 1)
+  }
+})
 
 export function usePassiveIncome() {
   const { supabase, userId } = useSupabase()
 
-  const incomes = ref<PassiveIncome[]>([])
   const loading = ref(false)
   const error = ref<string | null>(null)
 
@@ -35,6 +55,12 @@ export function usePassiveIncome() {
       if (fetchError) throw fetchError
 
       incomes.value = data || []
+      if (options?.startDate || options?.endDate) {
+        invalidate('passive_income')
+      } else {
+        queuedRows('passive_income', incomes.value).forEach(income => insertSorted(incomes.value, income, newerIncome))
+        markFetched('passive_income', options?.limit)
+      }
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to fetch incomes'
     } finally {
@@ -42,24 +68,44 @@ export function usePassiveIncome() {
     }
   }
 
+  // One keyset page: `limit` incomes older than `after`, newest first. Ordered
+  // by (income_date, id) so rows sharing a date are neither skipped nor repeated.
+  // Leaves the shared `incomes` copy alone.
+  async function fetchIncomePage(after: PageCursor | null, limit: number): Promise<PassiveIncome[]> {
+    let query = supabase
+      .from('passive_income')
+      .select('*')
+      .eq('user_id', userId)
+      .order('income_date', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limit)
+
+    if (after) {
+      query = query.or(`income_date.lt.${after.date},and(income_date.eq.${after.date},id.lt.${after.id})`)
+    }
+
+    const { data, error: fetchError } = await query
+    if (fetchError) throw fetchError
+    return data || []
+  }
+
+  // Shown at once and queued for Supabase (useOutbox), like addExpense
   async function addIncome(income: Omit<PassiveIncome, 'id' | 'user_id' | 'created_at'>) {
+    const [saved] = await addIncomes([income])
+    return saved
+  }
+
+  async function addIncomes(rows: Omit<PassiveIncome, 'id' | 'user_id' | 'created_at'>[]): Promise<PassiveIncome[]> {
     loading.value = true
     error.value = null
 
     try {
-      const { data, error: insertError } = await supabase
-        .from('passive_income')
-        .insert({
-          ...income,
-          user_id: userId,
-        })
-        .select()
-        .single()
-
-      if (insertError) throw insertError
-
-      incomes.value.unshift(data)
-      return data
+      const saved = await queueInserts<PassiveIncome>('passive_income', rows.map(income => ({ ...income, user_id: userId })))
+      saved.forEach(income => {
+        insertSorted(incomes.value, income, newerIncome)
+        notifyInsert('passive_income', income)
+      })
+      return saved
     } catch (e) {
       error.value = e instanceof Error ? e.message : 'Failed to add income'
       throw e
@@ -68,11 +114,19 @@ export function usePassiveIncome() {
     }
   }
 
+  // Latest `limit` incomes, from the shared copy when it is fresh enough
+  function loadIncomes(limit?: number) {
+    return ensureFresh('passive_income', () => fetchIncomes({ limit }), limit)
+  }
+
   return {
     incomes,
     loading,
     error,
     fetchIncomes,
+    fetchIncomePage,
+    loadIncomes,
     addIncome,
+    addIncomes,
   }
 }
@@ -0,0 +1,161 @@
+import { ref, computed } from 'vue'
+import { useSupabase } from './useSupabase'
+import { ensureFresh, markFetched, invalidate, onInsert, onSync, startOfMonth } from './useDataStore'
+import { buildFIProgress } from './useFIProgress'
+import { useOutbox } from './useOutbox'
+import type { DashboardMetric, NetWorthSnapshot } from '@/types/database'
+
+// Precomputed dashboard figures, kept current by the triggers in
+// supabase/migrations/20261018010000_dashboard_snapshots.sql. Two tiny reads
+// instead of the asset rows and both aggregate RPCs, so the dashboard can
+// paint before the raw data arrives.
+
+export interface SnapshotStats {
+  // Milliseconds since navigation start, per dashboard render source
+  snapshotPaintMs: number | null
+  reconciledMs: number | null
+  // Snapshot figures that disagreed with the raw rows on the last reconcile
+  drift: string[]
+}
+
+const snapshot = ref<NetWorthSnapshot | null>(null)
+const metrics = ref<Record<string, DashboardMetric>>({})
+const stats: SnapshotStats = { snapshotPaintMs: null, reconciledMs: null, drift: [] }
+
+window.__fiDebug = { ...window.__fiDebug, snapshot: stats }
+
+// The triggers have already moved the stored figures on
+onInsert('expenses', () => invalidate('snapshot'))
+onInsert('passive_income', () => invalidate('snapshot'))
+onInsert('fd_tracker', () => invalidate('snapshot'))
+onInsert('financial_assets', () => invalidate('snapshot'))
+// Queued inserts (useOutbox) only reach the triggers when they are sent
+onSync('expenses', () => invalidate('snapshot'))
+onSync('passive_income', () => invalidate('snapshot'))
+onSync('fd_tracker', () => invalidate('snapshot'))
+
+// A month metric left over from last month says nothing about this one
+function currentMonth(metric: DashboardMetric | undefined): Record<string, unknown> | null {
+  const data = metric?.metric_data
+  if (!data || data.month !== startOfMonth()) return null
+  return data
+}
+
+function numbers(record: unknown): Record<string, number> {
+  const result: Record<string, number> = {}
+  Object.entries((record || {}) as Record<string, unknown>).forEach(([key, value]) => {
+    result[key] = Number(value)
+  })
+  return result
+}
+
+export function useSnapshot() {
+  const { supabase, userId, fiTarget } = useSupabase()
+  const { pending } = useOutbox()
+
+  const loading = ref(false)
+  const error = ref<string | null>(null)
+
+  const netWorth = computed(() => {
+    if (!snapshot.value) return null
+    return {
+      totalAssets: Number(snapshot.value.total_assets || 0),
+      assetsByType: numbers(snapshot.value.breakdown),
+    }
+  })
+
+  const monthlyExpenses = computed(() => {
+    const data = currentMonth(metrics.value.monthly_expenses)
+    if (!data) return null
+    return Object.values(numbers(data.categories)).reduce((sum, total) => sum + total, 0)
+  })
+
+  const fiProgress = computed(() => {
+    const data = currentMonth(metrics.value.monthly_income)
+    if (!data) return null
+    const totals = Object.entries(numbers(data.sources)).map(([source_type, total]) => ({ source_type, total }))
+    return buildFIProgress(totals, fiTarget)
+  })
+
+  async function fetchSnapshot() {
+    loading.value = true
+    error.value = null
+
+    try {
+      const [snapshotResult, metricsResult] = await Promise.all([
+        supabase
+          .from('net_worth_snapshots')
+          .select('*')
+          .eq('user_id', userId)
+          .order('snapshot_date', { ascending: false })
+          .limit(1),
+        supabase
+          .from('dashboard_metrics')
+          .select('*')
+          .eq('user_id', userId),
+      ])
+
+      if (snapshotResult.error) throw snapshotResult.error
+      if (metricsResult.error) throw metricsResult.error
+
+      snapshot.value = snapshotResult.data?.[0] || null
+      const byName: Record<string, DashboardMetric> = {}
+      ;(metricsResult.data || []).forEach((metric: DashboardMetric) => {
+        byName[metric.metric_name] = metric
+      })
+      metrics.value = byName
+      markFetched('snapshot')
+    } catch (e) {
+      error.value = e instanceof Error ? e.message : 'Failed to fetch snapshot'
+    } finally {
+      loading.value = false
+    }
+  }
+
+  function loadSnapshot() {
+    return ensureFresh('snapshot', fetchSnapshot)
+  }
+
+  // Called once the raw figures are on screen; the snapshot should have agreed.
+  // The live totals include writes still queued in the outbox, which the
+  // triggers have not seen yet, so there is nothing to compare until it drains.
+  function reconcile(live: { totalAssets: number; monthlyExpenses: number; monthlyIncome: number }) {
+    if (pending.value > 0) {
+      stats.drift = []
+      return
+    }
+
+    const drift: string[] = []
+    const close = (a: number, b: number) => Math.abs(a - b) < 0.01
+
+    if (netWorth.value && !close(netWorth.value.totalAssets, live.totalAssets)) drift.push('net_worth')
+    if (monthlyExpenses.value !== null && !close(monthlyExpenses.value, live.monthlyExpenses)) drift.push('monthly_expenses')
+    if (fiProgress.value && !close(fiProgress.value.monthlyIncome, live.monthlyIncome)) drift.push('monthly_income')
+
+    stats.drift = drift
+    if (drift.length) {
+      // Stale or missing triggers; the raw figures win and the next load refetches
+      console.warn('[Snapshot] drift:', drift.join(', '))
+      invalidate('snapshot')
+    }
+  }
+
+  function markPaint(source: 'snapshot' | 'reconciled') {
+    performance.mark(`dashboard:${source}`)
+    if (source === 'snapshot') stats.snapshotPaintMs = performance.now()
+    else stats.reconciledMs = performance.now()
+  }
+
+  return {
+    snapshot,
+    netWorth,
+    monthlyExpenses,
+    fiProgress,
+    loading,
+    error,
+    fetchSnapshot,
+    loadSnapshot,
+    reconcile,
+    markPaint,
+  }
+}
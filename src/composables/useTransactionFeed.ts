@@ -0,0 +1,246 @@
+import { ref, computed, markRaw } from 'vue'
+import { useExpenses } from './useExpenses'
+import { usePassiveIncome } from './usePassiveIncome'
+import { onInsert, onSync, insertSorted } from './useDataStore'
+import type { Expense, PassiveIncome, PageCursor } from '@/types/database'
+
+// TransactionsPage's infinite list: incomes and expenses fetched a keyset page
+// at a time and merged newest-first as they arrive, instead of fetching both
+// tables whole and sorting the lot.
+
+export const PAGE_SIZE = 100
+
+export interface Transaction {
+  id: string
+  type: 'income' | 'expense'
+  category: string
+  description: string
+  amount: number
+  date: string
+  // Date.parse(date), computed once when the row arrives
+  time: number
+}
+
+export type FeedFilter = 'all' | 'income' | 'expenses'
+
+interface Source {
+  type: Transaction['type']
+  // Everything fetched so far, newest first
+  rows: Transaction[]
+  cursor: PageCursor | null
+  done: boolean
+}
+
+function fromIncome(income: PassiveIncome): Transaction {
+  return markRaw<Transaction>({
+    id: income.id,
+    type: 'income',
+    category: income.source_type,
+    description: income.source_name,
+    amount: income.amount,
+    date: income.income_date,
+    time: Date.parse(income.income_date),
+  })
+}
+
+function fromExpense(expense: Expense): Transaction {
+  return markRaw<Transaction>({
+    id: expense.id,
+    type: 'expense',
+    category: expense.category,
+    description: expense.description || expense.category,
+    amount: expense.amount,
+    date: expense.expense_date,
+    time: Date.parse(expense.expense_date),
+  })
+}
+
+// Feed order, matching the (date desc, id desc) keyset each table is paged by
+function newer(a: Transaction, b: Transaction): boolean {
+  return a.time > b.time || (a.time === b.time && a.id > b.id)
+}
+
+function emptySource(type: Transaction['type']): Source {
+  return { type, rows: [], cursor: null, done: false }
+}
+
+// Module-level, like the table composables: leaving the page and coming back
+// keeps the rows and the merge position
+const sources = {
+  income: emptySource('income'),
+  expense: emptySource('expense'),
+}
+const filter = ref<FeedFilter>('all')
+const items = ref<Transaction[]>([])
+// Sums of the rows fetched so far, per type
+const totals = ref({ income: 0, expense: 0 })
+// Whether the active sources have rows not yet in `items`
+const hasMore = ref(true)
+// Per active source, how many of its rows are already in `items`
+let positions: number[] = []
+let pending: Promise<void> | null = null
+
+function activeSources(): Source[] {
+  if (filter.value === 'income') return [sources.income]
+  if (filter.value === 'expenses') return [sources.expense]
+  return [sources.income, sources.expense]
+}
+
+/**
+ * K-way merge step: append up to `limit` rows to `items`, always taking the
+ * newest head among the active sources. Stops early when a source that may
+ * still have older rows has run out of fetched ones, since its next page
+ * could sort ahead of every other head. Returns the number appended.
+ */
+function drain(limit: number): number {
+  const active = activeSources()
+  const batch: Transaction[] = []
+
+  while (batch.length < limit) {
+    let best = -1
+    for (let i = 0; i < active.length; i++) {
+      const head = active[i].rows[positions[i]]
+      if (!head) {
+        if (!active[i].done) return flush(batch)
+        continue
+      }
+      if (best < 0 || newer(head, active[best].rows[positions[best]])) best = i
+    }
+    if (best < 0) break
+    batch.push(active[best].rows[positions[best]])
+    positions[best]++
+  }
+  return flush(batch)
+}
+
+function flush(batch: Transaction[]): number {
+  if (batch.length) items.value.push(...batch)
+  hasMore.value = activeSources().some((source, i) => !source.done || positions[i] < source.rows.length)
+  return batch.length
+}
+
+function restartMerge(keep = 0) {
+  positions = activeSources().map(() => 0)
+  items.value = []
+  drain(keep)
+}
+
+// Sorted insert of a new row into its source, then the visible prefix re-merged
+function insertRow(source: Source, row: Transaction) {
+  const last = source.rows[source.rows.length - 1]
+  // Nothing fetched yet, or older than everything fetched: a page will bring it
+  if (!source.done && (!last || newer(last, row))) return
+
+  insertSorted(source.rows, row, newer)
+  totals.value[source.type] += row.amount
+  restartMerge(items.value.length + 1)
+}
+
+// A queued write landed or was rejected (useOutbox). The optimistic row comes
+// out either way; the server's row goes back in by its own id, which may now
+// sort past the fetched range and be left for a page to bring.
+function syncRow(source: Source, queuedId: string, saved: Transaction | null) {
+  const index = source.rows.findIndex(row => row.id === queuedId)
+  if (index >= 0) {
+    totals.value[source.type] -= source.rows[index].amount
+    source.rows.splice(index, 1)
+    restartMerge(Math.max(items.value.length - 1, 0))
+  }
+  if (saved) insertRow(source, saved)
+}
+
+onInsert('passive_income', row => insertRow(sources.income, fromIncome(row as PassiveIncome)))
+onInsert('expenses', row => insertRow(sources.expense, fromExpense(row as Expense)))
+onSync('passive_income', (queued, saved) =>
+  syncRow(sources.income, (queued as PassiveIncome).id, saved ? fromIncome(saved as PassiveIncome) : null))
+onSync('expenses', (queued, saved) =>
+  syncRow(sources.expense, (queued as Expense).id, saved ? fromExpense(saved as Expense) : null))
+
+export function useTransactionFeed() {
+  const { fetchExpensePage } = useExpenses()
+  const { fetchIncomePage } = usePassiveIncome()
+
+  const loading = ref(false)
+  const error = ref<string | null>(null)
+
+  const totalIncome = computed(() => totals.value.income)
+  const totalExpenses = computed(() => totals.value.expense)
+
+  async function fetchNext(source: Source) {
+    const rows = source.type === 'income'
+      ? (await fetchIncomePage(source.cursor, PAGE_SIZE)).map(fromIncome)
+      : (await fetchExpensePage(source.cursor, PAGE_SIZE)).map(fromExpense)
+
+    rows.forEach(row => {
+      source.rows.push(row)
+      totals.value[source.type] += row.amount
+    })
+    const last = rows[rows.length - 1]
+    if (last) source.cursor = { date: last.date, id: last.id }
+    source.done = rows.length < PAGE_SIZE
+  }
+
+  async function fill(count: number) {
+    let wanted = count
+    while (wanted > 0) {
+      wanted -= drain(wanted)
+      const active = activeSources()
+      const starving = active.filter((source, i) => !source.done && positions[i] >= source.rows.length)
+      if (!starving.length) break
+      await Promise.all(starving.map(fetchNext))
+    }
+  }
+
+  // Next `count` rows of the merged feed; concurrent calls share one load
+  function loadMore(count = PAGE_SIZE) {
+    if (pending) return pending
+
+    loading.value = true
+    error.value = null
+    pending = fill(count)
+      .catch(e => {
+        error.value = e instanceof Error ? e.message : 'Failed to fetch transactions'
+      })
+      .finally(() => {
+        loading.value = false
+        pending = null
+      })
+    return pending
+  }
+
+  // First page, unless the feed already has rows from an earlier visit
+  function load() {
+    if (items.value.length) return Promise.resolve()
+    return loadMore()
+  }
+
+  function setFilter(value: FeedFilter) {
+    if (filter.value === value) return
+    filter.value = value
+    restartMerge()
+    return loadMore()
+  }
+
+  async function refresh() {
+    if (pending) await pending
+    sources.income = emptySource('income')
+    sources.expense = emptySource('expense')
+    totals.value = { income: 0, expense: 0 }
+    restartMerge()
+    return loadMore()
+  }
+
+  return {
+    items,
+    filter,
+    loading,
+    error,
+    hasMore,
+    totalIncome,
+    totalExpenses,
+    loadMore,
+    load,
+    setFilter,
+    refresh,
+  }
+}
@@ -54,6 +54,32 @@ let _recognition: SpeechRecognition | null = null
 let _synthesis: SpeechSynthesis | null = null
 let _initialized = false
 
+// One startListening() call, settled by the recognition session it started
+interface Listen {
+  resolve: (text: string) => void
+  reject: (err: Error) => void
+  settled: boolean
+}
+
+// The listen whose recognition is running, from start() until its onend. The
+// recognition's handlers are bound once and settle only this listen, so an
+// old session's late onend never settles the call that replaced it, and
+// repeated listens never stack wrapped handlers on the singleton.
+let _session: Listen | null = null
+// Resolves on that session's onend: start() before then throws InvalidStateError
+let _sessionEnded: Promise<void> = Promise.resolve()
+let _endSession: () => void = () => {}
+
+function settleListen(listen: Listen, error?: string) {
+  if (listen.settled) return
+  listen.settled = true
+  if (error) {
+    listen.reject(new Error(error))
+  } else {
+    listen.resolve(_transcript.value)
+  }
+}
+
 function initializeVoice() {
   if (_initialized) return
   _initialized = true
@@ -91,13 +117,19 @@ function initializeVoice() {
         _transcript.value = finalTranscript || interimTranscript
       }
 
+      // An error is followed by onend; the error settles the listen first
       _recognition.onerror = (event) => {
         _error.value = `Speech recognition error: ${event.error}`
         _isListening.value = false
+        if (_session) settleListen(_session, event.error)
       }
 
       _recognition.onend = () => {
+        const session = _session
+        _session = null
         _isListening.value = false
+        if (session) settleListen(session)
+        _endSession()
       }
     }
 
@@ -111,59 +143,38 @@ export function useVoice() {
   // Initialize on first use
   initializeVoice()
 
-  function startListening(): Promise<string> {
-    return new Promise((resolve, reject) => {
-      if (!_recognition) {
-        reject(new Error('Speech recognition not supported'))
-        return
-      }
+  async function startListening(): Promise<string> {
+    const recognition = _recognition
+    if (!recognition) throw new Error('Speech recognition not supported')
 
-      if (_isListening.value) {
-        stopListening()
-      }
+    // A listen still running gets what it heard once its session ends; only
+    // then can this one start. A loop, as another call may have started first.
+    while (_session) {
+      recognition.stop()
+      await _sessionEnded
+    }
 
+    return new Promise((resolve, reject) => {
       _transcript.value = ''
       _error.value = null
-
-      // Store resolve/reject for use in handlers
-      const handleEnd = () => {
-        _isListening.value = false
-        resolve(_transcript.value)
-      }
-
-      const handleError = (event: Event & { error: string }) => {
-        _isListening.value = false
-        reject(new Error(event.error))
-      }
-
-      // Temporarily override handlers for this promise
-      const origOnEnd = _recognition.onend
-      const origOnError = _recognition.onerror
-
-      _recognition.onend = () => {
-        _recognition!.onend = origOnEnd
-        _recognition!.onerror = origOnError
-        handleEnd()
-      }
-
-      _recognition.onerror = (event) => {
-        _recognition!.onend = origOnEnd
-        _recognition!.onerror = origOnError
-        handleError(event)
-      }
+      _session = { resolve, reject, settled: false }
+      _sessionEnded = new Promise(done => {
+        _endSession = done
+      })
 
       try {
-        _recognition.start()
+        recognition.start()
       } catch (err) {
-        _recognition.onend = origOnEnd
-        _recognition.onerror = origOnError
+        _session = null
+        _endSession()
         reject(err)
       }
     })
   }
 
+  // Before onstart too: a session that has not started yet still needs ending
   function stopListening() {
-    if (_recognition && _isListening.value) {
+    if (_recognition && _session) {
       _recognition.stop()
     }
   }
@@ -3,14 +3,11 @@ import { createRouter, createWebHistory } from 'vue-router'
 import App from './App.vue'
 import './styles/main.css'
 
-import DashboardPage from './pages/DashboardPage.vue'
-import FDListPage from './pages/FDListPage.vue'
-import TransactionsPage from './pages/TransactionsPage.vue'
-
+// Pages are split into their own chunks and fetched on first navigation
 const routes = [
-  { path: '/', component: DashboardPage },
-  { path: '/fds', component: FDListPage },
-  { path: '/transactions', component: TransactionsPage },
+  { path: '/', component: () => import('./pages/DashboardPage.vue') },
+  { path: '/fds', component: () => import('./pages/FDListPage.vue') },
+  { path: '/transactions', component: () => import('./pages/TransactionsPage.vue') },
 ]
 
 const router = createRouter({
@@ -21,3 +18,13 @@ const router = createRouter({
 const app = createApp(App)
 app.use(router)
 app.mount('#app')
+
+// Precache and offline shell: dist/sw.js, written by scripts/post-build.js.
+// Registered after load so it never competes with the first visit.
+if (import.meta.env.PROD && 'serviceWorker' in navigator) {
+  window.addEventListener('load', () => {
+    navigator.serviceWorker.register('/sw.js', { updateViaCache: 'none' }).catch(err => {
+      console.warn('[SW] registration failed:', err)
+    })
+  })
+}
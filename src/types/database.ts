@@ -27,6 +27,8 @@ export interface PassiveIncome {
   income_date: string
   frequency?: 'monthly' | 'quarterly' | 'annually' | 'one_time'
   notes?: string
+  // Set by the offline outbox (useOutbox); null for rows written elsewhere
+  client_id?: string | null
   created_at: string
 }
 
@@ -41,6 +43,7 @@ export interface Expense {
   payment_method?: string
   is_recurring: boolean
   tags?: string[]
+  client_id?: string | null
   created_at: string
 }
 
@@ -83,6 +86,7 @@ export interface FDTracker {
   status: 'active' | 'matured' | 'closed'
   auto_renew: boolean
   notes?: string
+  client_id?: string | null
   created_at: string
 }
 
@@ -123,6 +127,25 @@ export interface FIProgress {
   }
 }
 
+// Rows of the expense_category_totals / income_breakdown RPCs
+export interface ExpenseCategoryTotal {
+  category: string
+  total: number
+  entries: number
+}
+
+export interface IncomeSourceTotal {
+  source_type: string
+  total: number
+  entries: number
+}
+
+// Keyset position: the (date, id) of the last row of the previous page
+export interface PageCursor {
+  date: string
+  id: string
+}
+
 export interface IncomeSource {
   type: string
   amount: number
@@ -0,0 +1,31 @@
+// Debug counters the composables publish on window.__fiDebug, read by the
+// Playwright harness (harness/bench_chat.py, harness/scenarios.py)
+
+import type { CacheStats } from '@/composables/useCache'
+import type { StoreStats } from '@/composables/useDataStore'
+import type { SnapshotStats } from '@/composables/useSnapshot'
+import type { OutboxStats } from '@/composables/useOutbox'
+import type { GeminiQueueStats } from '@/composables/useGeminiQueue'
+import type { IntentStats } from '@/composables/useGemini'
+
+// Speculative parses of interim voice transcripts (useChatbot)
+export interface VoiceStats {
+  speculated: number
+  // Final transcripts that used a speculative parse / speculative parses thrown away
+  reused: number
+  discarded: number
+}
+
+declare global {
+  interface Window {
+    __fiDebug?: {
+      intent?: IntentStats
+      cache?: Record<'intent' | 'response', CacheStats>
+      store?: StoreStats
+      snapshot?: SnapshotStats
+      outbox?: OutboxStats
+      gemini?: GeminiQueueStats
+      voice?: VoiceStats
+    }
+  }
+}
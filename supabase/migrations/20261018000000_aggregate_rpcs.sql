@@ -0,0 +1,52 @@
+-- Aggregates the dashboard and chatbot used to compute from raw rows.
+-- Both return one row per category / source type, so the payload stays the
+-- same size however many expenses or income entries the month has.
+-- harness/aggregates.py runs the same queries on SQLite for local mode;
+-- keep the two in step.
+
+create index if not exists expenses_user_date_idx
+  on public.expenses (user_id, expense_date);
+
+create index if not exists passive_income_user_date_idx
+  on public.passive_income (user_id, income_date);
+
+-- Category totals for expenses dated p_start..p_end (open-ended without p_end)
+create or replace function public.expense_category_totals(
+  p_user_id text,
+  p_start date,
+  p_end date default null
+)
+returns table (category text, total numeric, entries integer)
+language sql
+stable
+as $$
+  select e.category, sum(e.amount) as total, count(*)::integer as entries
+  from public.expenses e
+  where e.user_id = p_user_id
+    and e.expense_date >= p_start
+    and (p_end is null or e.expense_date <= p_end)
+  group by e.category
+  order by total desc
+$$;
+
+-- Income totals per source_type, the rows behind FIProgress.incomeBreakdown
+create or replace function public.income_breakdown(
+  p_user_id text,
+  p_start date,
+  p_end date default null
+)
+returns table (source_type text, total numeric, entries integer)
+language sql
+stable
+as $$
+  select i.source_type, sum(i.amount) as total, count(*)::integer as entries
+  from public.passive_income i
+  where i.user_id = p_user_id
+    and i.income_date >= p_start
+    and (p_end is null or i.income_date <= p_end)
+  group by i.source_type
+  order by total desc
+$$;
+
+grant execute on function public.expense_category_totals(text, date, date) to anon, authenticated;
+grant execute on function public.income_breakdown(text, date, date) to anon, authenticated;
@@ -0,0 +1,244 @@
+-- Dashboard snapshot pipeline.
+--
+-- Triggers on expenses, passive_income, fd_tracker and financial_assets keep
+-- one small row per metric up to date, so the dashboard can paint from
+-- net_worth_snapshots + dashboard_metrics before it has read any raw rows:
+--
+--   net_worth_snapshots  today's total_assets / net_worth, breakdown by asset_type
+--   dashboard_metrics    monthly_expenses  metric_value = month total,
+--                                          metric_data  = {month, categories: {category: total}}
+--                        monthly_income    metric_value = month total,
+--                                          metric_data  = {month, sources: {source_type: total}}
+--                        active_fds        metric_value = active principal, metric_data = {count}
+--
+-- Expense and income inserts apply a delta; anything else (updates, deletes,
+-- the first row of a new month) recounts via the aggregate RPCs.
+-- harness/snapshots.py mirrors this for local mode; keep the two in step.
+
+create table if not exists public.net_worth_snapshots (
+  id uuid primary key default gen_random_uuid(),
+  user_id text not null,
+  snapshot_date date not null default current_date,
+  total_assets numeric,
+  total_liabilities numeric default 0,
+  net_worth numeric,
+  breakdown jsonb,
+  created_at timestamptz not null default now()
+);
+
+create table if not exists public.dashboard_metrics (
+  id uuid primary key default gen_random_uuid(),
+  user_id text not null,
+  metric_name text not null,
+  metric_value numeric,
+  metric_data jsonb,
+  calculated_at timestamptz not null default now()
+);
+
+create unique index if not exists net_worth_snapshots_user_date_key
+  on public.net_worth_snapshots (user_id, snapshot_date);
+
+create unique index if not exists dashboard_metrics_user_metric_key
+  on public.dashboard_metrics (user_id, metric_name);
+
+-- Recounts ------------------------------------------------------------------
+
+create or replace function public.refresh_net_worth_snapshot(p_user_id text)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  with by_type as (
+    select asset_type, sum(coalesce(current_value, principal, 0)) as total
+    from financial_assets
+    where user_id = p_user_id
+    group by asset_type
+  )
+  insert into net_worth_snapshots (user_id, snapshot_date, total_assets, total_liabilities, net_worth, breakdown)
+  select p_user_id, current_date, coalesce(sum(total), 0), 0, coalesce(sum(total), 0),
+         coalesce(jsonb_object_agg(asset_type, total) filter (where asset_type is not null), '{}'::jsonb)
+  from by_type
+  on conflict (user_id, snapshot_date) do update
+    set total_assets = excluded.total_assets,
+        net_worth = excluded.net_worth,
+        breakdown = excluded.breakdown
+$$;
+
+create or replace function public.refresh_monthly_expenses(p_user_id text)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  insert into dashboard_metrics (user_id, metric_name, metric_value, metric_data, calculated_at)
+  select p_user_id, 'monthly_expenses', coalesce(sum(t.total), 0),
+         jsonb_build_object(
+           'month', date_trunc('month', current_date)::date,
+           'categories', coalesce(jsonb_object_agg(t.category, t.total) filter (where t.category is not null), '{}'::jsonb)
+         ),
+         now()
+  from expense_category_totals(p_user_id, date_trunc('month', current_date)::date) t
+  on conflict (user_id, metric_name) do update
+    set metric_value = excluded.metric_value,
+        metric_data = excluded.metric_data,
+        calculated_at = excluded.calculated_at
+$$;
+
+create or replace function public.refresh_monthly_income(p_user_id text)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  insert into dashboard_metrics (user_id, metric_name, metric_value, metric_data, calculated_at)
+  select p_user_id, 'monthly_income', coalesce(sum(t.total), 0),
+         jsonb_build_object(
+           'month', date_trunc('month', current_date)::date,
+           'sources', coalesce(jsonb_object_agg(t.source_type, t.total) filter (where t.source_type is not null), '{}'::jsonb)
+         ),
+         now()
+  from income_breakdown(p_user_id, date_trunc('month', current_date)::date) t
+  on conflict (user_id, metric_name) do update
+    set metric_value = excluded.metric_value,
+        metric_data = excluded.metric_data,
+        calculated_at = excluded.calculated_at
+$$;
+
+create or replace function public.refresh_active_fds(p_user_id text)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  insert into dashboard_metrics (user_id, metric_name, metric_value, metric_data, calculated_at)
+  select p_user_id, 'active_fds', coalesce(sum(principal), 0), jsonb_build_object('count', count(*)), now()
+  from fd_tracker
+  where user_id = p_user_id and status = 'active'
+  on conflict (user_id, metric_name) do update
+    set metric_value = excluded.metric_value,
+        metric_data = excluded.metric_data,
+        calculated_at = excluded.calculated_at
+$$;
+
+-- Security definer and keyed by any p_user_id: only the triggers below (which
+-- run as the owner) may call these, never /rest/v1/rpc with the anon key
+revoke execute on function public.refresh_net_worth_snapshot(text) from public, anon, authenticated;
+revoke execute on function public.refresh_monthly_expenses(text) from public, anon, authenticated;
+revoke execute on function public.refresh_monthly_income(text) from public, anon, authenticated;
+revoke execute on function public.refresh_active_fds(text) from public, anon, authenticated;
+
+-- Triggers ------------------------------------------------------------------
+
+create or replace function public.track_expense_metrics()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  month_start date := date_trunc('month', current_date)::date;
+begin
+  if tg_op = 'INSERT' then
+    if new.expense_date < month_start then
+      return null;
+    end if;
+    update dashboard_metrics
+       set metric_value = metric_value + new.amount,
+           metric_data = jsonb_set(metric_data, array['categories', new.category],
+             to_jsonb(coalesce((metric_data #>> array['categories', new.category])::numeric, 0) + new.amount)),
+           calculated_at = now()
+     where user_id = new.user_id
+       and metric_name = 'monthly_expenses'
+       and metric_data ->> 'month' = month_start::text;
+    if found then
+      return null;
+    end if;
+  end if;
+
+  perform refresh_monthly_expenses(coalesce(new.user_id, old.user_id));
+  return null;
+end
+$$;
+
+create or replace function public.track_income_metrics()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  month_start date := date_trunc('month', current_date)::date;
+begin
+  if tg_op = 'INSERT' then
+    if new.income_date < month_start then
+      return null;
+    end if;
+    update dashboard_metrics
+       set metric_value = metric_value + new.amount,
+           metric_data = jsonb_set(metric_data, array['sources', new.source_type],
+             to_jsonb(coalesce((metric_data #>> array['sources', new.source_type])::numeric, 0) + new.amount)),
+           calculated_at = now()
+     where user_id = new.user_id
+       and metric_name = 'monthly_income'
+       and metric_data ->> 'month' = month_start::text;
+    if found then
+      return null;
+    end if;
+  end if;
+
+  perform refresh_monthly_income(coalesce(new.user_id, old.user_id));
+  return null;
+end
+$$;
+
+create or replace function public.track_fd_metrics()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  perform refresh_active_fds(coalesce(new.user_id, old.user_id));
+  return null;
+end
+$$;
+
+create or replace function public.track_net_worth()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  perform refresh_net_worth_snapshot(coalesce(new.user_id, old.user_id));
+  return null;
+end
+$$;
+
+drop trigger if exists expenses_dashboard_metrics on public.expenses;
+create trigger expenses_dashboard_metrics
+  after insert or update or delete on public.expenses
+  for each row execute function public.track_expense_metrics();
+
+drop trigger if exists passive_income_dashboard_metrics on public.passive_income;
+create trigger passive_income_dashboard_metrics
+  after insert or update or delete on public.passive_income
+  for each row execute function public.track_income_metrics();
+
+drop trigger if exists fd_tracker_dashboard_metrics on public.fd_tracker;
+create trigger fd_tracker_dashboard_metrics
+  after insert or update or delete on public.fd_tracker
+  for each row execute function public.track_fd_metrics();
+
+drop trigger if exists financial_assets_net_worth on public.financial_assets;
+create trigger financial_assets_net_worth
+  after insert or update or delete on public.financial_assets
+  for each row execute function public.track_net_worth();
+
+-- Backfill ------------------------------------------------------------------
+
+select refresh_net_worth_snapshot(user_id) from (select distinct user_id from public.financial_assets) u;
+select refresh_monthly_expenses(user_id) from (select distinct user_id from public.expenses) u;
+select refresh_monthly_income(user_id) from (select distinct user_id from public.passive_income) u;
+select refresh_active_fds(user_id) from (select distinct user_id from public.fd_tracker) u;
@@ -0,0 +1,10 @@
+-- Keyset pagination for TransactionsPage: each page is
+--   where user_id = $1 and (date < $2 or (date = $2 and id < $3))
+--   order by date desc, id desc limit $4
+-- which these indexes answer with a single range scan, however deep the page.
+
+create index if not exists expenses_user_date_id_idx
+  on public.expenses (user_id, expense_date desc, id desc);
+
+create index if not exists passive_income_user_date_id_idx
+  on public.passive_income (user_id, income_date desc, id desc);
@@ -0,0 +1,19 @@
+-- Offline outbox (src/composables/useOutbox.ts): every queued insert carries a
+-- client-generated client_id and is sent as
+--   insert ... on conflict (client_id) do update set ... returning *
+-- so a batch retried after a lost response returns the rows the first attempt
+-- created instead of inserting them twice. Rows written before the outbox, or
+-- by other clients, leave client_id null; nulls never conflict.
+
+alter table public.expenses add column if not exists client_id uuid;
+alter table public.passive_income add column if not exists client_id uuid;
+alter table public.fd_tracker add column if not exists client_id uuid;
+
+create unique index if not exists expenses_client_id_key
+  on public.expenses (client_id);
+
+create unique index if not exists passive_income_client_id_key
+  on public.passive_income (client_id);
+
+create unique index if not exists fd_tracker_client_id_key
+  on public.fd_tracker (client_id);
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Aggregate RPC check: expense_category_totals and income_breakdown (as served
+by the local-mode SQLite stand-in) must match what the app used to compute
+client-side from raw rows - the getExpenseBreakdown grouping in useChatbot
+and the incomeBreakdown bucketing in useFIProgress. The snapshot rows the
+stub derives like the Postgres triggers (harness/snapshots.py) must stay equal
+to the same aggregates as rows are inserted.
+
+Runs without a browser: pytest test_aggregates.py
+"""
+
+import json
+import random
+import urllib.request
+from datetime import date, timedelta
+
+from urllib.parse import parse_qs
+
+from harness import aggregates, dataset, local_mode
+
+USER_ID = local_mode.USER_ID
+CATEGORIES = ("housing", "utilities", "food", "transport", "healthcare", "education",
+              "entertainment", "personal", "other")
+# 'royalty' is not an FIProgress bucket: the client folds it into 'other'
+SOURCE_TYPES = ("fd_interest", "dividend", "rental", "business", "other", "royalty")
+
+
+def make_tables(seed=7, expenses=600, incomes=300, today=None):
+    """Rows across this month, earlier months and another user."""
+    today = today or date.today()
+    rng = random.Random(seed)
+
+    def some_day():
+        return (today - timedelta(days=rng.randrange(0, 120))).isoformat()
+
+    def some_user():
+        return USER_ID if rng.random() < 0.85 else "someone_else"
+
+    return {
+        "expenses": [{
+            "id": f"e{i}", "user_id": some_user(), "category": rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(20, 20000), 2), "expense_date": some_day(),
+            "is_recurring": False,
+        } for i in range(expenses)],
+        "passive_income": [{
+            "id": f"i{i}", "user_id": some_user(), "source_type": rng.choice(SOURCE_TYPES),
+            "source_name": "fixture", "amount": round(rng.uniform(100, 50000), 2),
+            "income_date": some_day(),
+        } for i in range(incomes)],
+    }
+
+
+def month_start(today=None):
+    return (today or date.today()).replace(day=1).isoformat()
+
+
+def client_expense_breakdown(rows, start):
+    """Old client path: this month's rows grouped by category."""
+    by_category = {}
+    for row in rows:
+        if row["user_id"] == USER_ID and row["expense_date"] >= start:
+            by_category[row["category"]] = by_category.get(row["category"], 0) + row["amount"]
+    return by_category
+
+
+def client_income_breakdown(rows, start):
+    """Old useFIProgress path: this month's rows bucketed into FIProgress.incomeBreakdown."""
+    breakdown = {"fd_interest": 0, "dividend": 0, "rental": 0, "business": 0, "other": 0}
+    for row in rows:
+        if row["user_id"] == USER_ID and row["income_date"] >= start:
+            key = row["source_type"] if row["source_type"] in breakdown else "other"
+            breakdown[key] += row["amount"]
+    return breakdown
+
+
+def bucket_income_totals(totals):
+    """New useFIProgress path: the same buckets, filled from RPC rows."""
+    breakdown = {"fd_interest": 0, "dividend": 0, "rental": 0, "business": 0, "other": 0}
+    for row in totals:
+        key = row["source_type"] if row["source_type"] in breakdown else "other"
+        breakdown[key] += row["total"]
+    return breakdown
+
+
+def rounded(mapping):
+    return {key: round(value, 2) for key, value in mapping.items()}
+
+
+def test_expense_category_totals_match_client():
+    tables = make_tables()
+    start = month_start()
+    totals = aggregates.call(tables, "expense_category_totals", {"p_user_id": USER_ID, "p_start": start})
+
+    assert rounded({t["category"]: t["total"] for t in totals}) == \
+        rounded(client_expense_breakdown(tables["expenses"], start))
+    assert [t["total"] for t in totals] == sorted((t["total"] for t in totals), reverse=True)
+    assert sum(t["entries"] for t in totals) == sum(
+        1 for r in tables["expenses"] if r["user_id"] == USER_ID and r["expense_date"] >= start)
+
+
+def test_expense_totals_cover_more_than_100_rows():
+    # The old query fetched the latest 100 rows and filtered in JS
+    tables = make_tables(expenses=1500)
+    start = month_start()
+    this_month = [r for r in tables["expenses"] if r["user_id"] == USER_ID and r["expense_date"] >= start]
+    assert len(this_month) > 100
+
+    totals = aggregates.call(tables, "expense_category_totals", {"p_user_id": USER_ID, "p_start": start})
+    assert round(sum(t["total"] for t in totals), 2) == round(sum(r["amount"] for r in this_month), 2)
+
+
+def test_expense_totals_end_date():
+    tables = make_tables()
+    start = (date.today() - timedelta(days=60)).isoformat()
+    end = (date.today() - timedelta(days=30)).isoformat()
+    totals = aggregates.call(tables, "expense_category_totals",
+                             {"p_user_id": USER_ID, "p_start": start, "p_end": end})
+
+    expected = {}
+    for row in tables["expenses"]:
+        if row["user_id"] == USER_ID and start <= row["expense_date"] <= end:
+            expected[row["category"]] = expected.get(row["category"], 0) + row["amount"]
+    assert rounded({t["category"]: t["total"] for t in totals}) == rounded(expected)
+
+
+def test_income_breakdown_matches_fi_progress():
+    tables = make_tables()
+    start = month_start()
+    totals = aggregates.call(tables, "income_breakdown", {"p_user_id": USER_ID, "p_start": start})
+
+    assert rounded(bucket_income_totals(totals)) == \
+        rounded(client_income_breakdown(tables["passive_income"], start))
+    assert len(totals) <= len(SOURCE_TYPES)
+
+
+def test_empty_tables():
+    for name in aggregates.RPC_SQL:
+        assert aggregates.call({}, name, {"p_user_id": USER_ID, "p_start": month_start()}) == []
+
+
+def test_rpc_over_local_server():
+    tables = make_tables()
+    start = month_start()
+    backend = local_mode.StubBackend(fixtures=tables)
+
+    with local_mode.serve_stub(backend) as site:
+        request = urllib.request.Request(
+            f"{site.url}/rest/v1/rpc/income_breakdown",
+            data=json.dumps({"p_user_id": USER_ID, "p_start": start}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            totals = json.load(response)
+
+    assert rounded(bucket_income_totals(totals)) == \
+        rounded(client_income_breakdown(tables["passive_income"], start))
+    assert backend.counts("supabase") == {"rpc/income_breakdown": 1}
+
+
+def test_bulk_insert_over_local_server():
+    """A batched chat entry: one POST per table, rows back in the order sent."""
+    tables = make_tables()
+    backend = local_mode.StubBackend(fixtures=tables)
+    today = date.today().isoformat()
+    rows = [{"user_id": USER_ID, "category": category, "amount": amount, "expense_date": today,
+             "description": category, "is_recurring": False}
+            for category, amount in (("food", 500), ("transport", 200), ("utilities", 1500))]
+
+    with local_mode.serve_stub(backend) as site:
+        request = urllib.request.Request(
+            f"{site.url}/rest/v1/expenses?select=*",
+            data=json.dumps(rows).encode(),
+            headers={"Content-Type": "application/json", "Prefer": "return=representation"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            saved = json.load(response)
+
+    assert [(row["category"], row["amount"]) for row in saved] == \
+        [(row["category"], row["amount"]) for row in rows]
+    assert len({row["id"] for row in saved}) == 3
+    assert backend.counts("supabase") == {"expenses": 1}
+
+    totals = {t["category"]: t["total"] for t in backend.rpc("expense_category_totals",
+                                                             {"p_user_id": USER_ID, "p_start": month_start()})}
+    assert rounded(totals) == rounded(client_expense_breakdown(backend.tables["expenses"], month_start()))
+
+
+def test_retried_upsert_counts_once():
+    """An outbox batch retried after a lost response returns the first attempt's rows."""
+    backend = local_mode.StubBackend(fixtures=make_tables())
+    today = date.today().isoformat()
+    batch = [{"user_id": USER_ID, "category": "food", "amount": 250, "expense_date": today,
+              "client_id": f"00000000-0000-4000-8000-00000000000{i}"} for i in range(3)]
+
+    first = backend.insert("expenses", batch, on_conflict="client_id")
+    retried = backend.insert("expenses", batch[1:] + [{**batch[0], "client_id": None}], on_conflict="client_id")
+
+    assert [row["id"] for row in retried[:2]] == [row["id"] for row in first[1:]]
+    assert retried[2]["id"] not in {row["id"] for row in first}
+    assert sum(1 for row in backend.tables["expenses"] if row.get("client_id")) == 3
+
+    totals = {t["category"]: t["total"] for t in backend.rpc("expense_category_totals",
+                                                             {"p_user_id": USER_ID, "p_start": month_start()})}
+    assert rounded(totals) == rounded(client_expense_breakdown(backend.tables["expenses"], month_start()))
+
+
+def test_snapshot_tracks_inserts():
+    tables = make_tables()
+    tables["financial_assets"] = [
+        {"id": "a1", "user_id": USER_ID, "asset_type": "fd", "principal": 500000},
+        {"id": "a2", "user_id": USER_ID, "asset_type": "stock", "current_value": 250000, "principal": 100000},
+    ]
+    backend = local_mode.StubBackend(fixtures=tables)
+    today = date.today().isoformat()
+    backend.insert("expenses", [{"user_id": USER_ID, "category": "food", "amount": 321.5, "expense_date": today},
+                                {"user_id": USER_ID, "category": "pets", "amount": 99, "expense_date": today}])
+    backend.insert("passive_income", {"user_id": USER_ID, "source_type": "royalty", "source_name": "book",
+                                      "amount": 1200, "income_date": today})
+    backend.insert("financial_assets", {"user_id": USER_ID, "asset_type": "fd", "current_value": 1000})
+
+    metrics = {m["metric_name"]: m for m in backend.tables["dashboard_metrics"] if m["user_id"] == USER_ID}
+    start = month_start()
+    expenses = metrics["monthly_expenses"]["metric_data"]
+    assert expenses["month"] == start
+    assert rounded(expenses["categories"]) == rounded(client_expense_breakdown(backend.tables["expenses"], start))
+
+    sources = metrics["monthly_income"]["metric_data"]["sources"]
+    assert rounded(bucket_income_totals([{"source_type": k, "total": v} for k, v in sources.items()])) == \
+        rounded(client_income_breakdown(backend.tables["passive_income"], start))
+
+    snapshot, = [s for s in backend.tables["net_worth_snapshots"] if s["user_id"] == USER_ID]
+    assert snapshot["breakdown"] == {"fd": 501000, "stock": 250000}
+    assert snapshot["net_worth"] == 751000
+
+    # Another month's metric is recounted, not added to
+    metrics["monthly_expenses"]["metric_data"] = {"month": "2000-01-01", "categories": {"food": 1e9}}
+    backend.insert("expenses", {"user_id": USER_ID, "category": "food", "amount": 1, "expense_date": today})
+    assert rounded(metrics["monthly_expenses"]["metric_data"]["categories"]) == \
+        rounded(client_expense_breakdown(backend.tables["expenses"], start))
+
+
+def test_large_table_select_matches_python_path():
+    # Tables past SQLITE_SELECT_ROWS are served from SQLite; walking the keyset
+    # pages must give exactly what the Python filters give
+    streams = dataset.Generator(seed=3).streams(local_mode.SQLITE_SELECT_ROWS + 2000)
+    tables = {table: list(rows) for table, rows in streams.items()}
+    backend = local_mode.StubBackend(fixtures=tables)
+    assert len(backend.tables["expenses"]) >= local_mode.SQLITE_SELECT_ROWS
+
+    def walk():
+        seen, cursor = [], None
+        while True:
+            query = "user_id=eq.%s&order=expense_date.desc,id.desc&limit=3000" % USER_ID
+            if cursor:
+                query += "&or=(expense_date.lt.{0},and(expense_date.eq.{0},id.lt.{1}))".format(*cursor)
+            page = backend.select("expenses", parse_qs(query))
+            if not page:
+                return seen
+            seen += [row["id"] for row in page]
+            cursor = (page[-1]["expense_date"], page[-1]["id"])
+
+    fast = walk()
+    threshold, local_mode.SQLITE_SELECT_ROWS = local_mode.SQLITE_SELECT_ROWS, 10 ** 9
+    try:
+        slow = walk()
+        query = parse_qs("category=eq.food&amount=gte.1000&is_recurring=eq.false&order=amount.desc&limit=50")
+        python_rows = backend.select("expenses", query)
+    finally:
+        local_mode.SQLITE_SELECT_ROWS = threshold
+    assert fast == slow
+    assert len(set(fast)) == len(backend.tables["expenses"])
+    assert backend.select("expenses", query) == python_rows
+
+    # Inserts reach the SQLite copy
+    row, = backend.insert("expenses", {"user_id": USER_ID, "category": "food", "amount": 1,
+                                       "expense_date": "2999-01-01"})
+    assert backend.select("expenses", parse_qs("order=expense_date.desc&limit=1")) == [row]
+
+
+def test_sqlite_dataset_matches_lists(tmp_path):
+    # bench_scale serves write_sqlite() output without loading it into lists:
+    # reads, RPCs, snapshots and inserts must match the same rows as lists
+    path = str(tmp_path / "fi.db")
+    rows = local_mode.SQLITE_SELECT_ROWS + 2000
+    dataset.generate(rows, path, fmt="sqlite", seed=5)
+    streams = dataset.Generator(seed=5).streams(rows)
+    lists = local_mode.StubBackend(fixtures={table: list(rows) for table, rows in streams.items()})
+    stored = local_mode.StubBackend(fixtures=dataset.open_sqlite(path))
+    assert isinstance(stored.tables["expenses"], aggregates.SqliteRows)
+
+    queries = ["user_id=eq.%s&order=expense_date.desc,id.desc&limit=500" % USER_ID,
+               "category=eq.food&is_recurring=eq.false&order=amount.desc&limit=50",
+               "order=maturity_date.asc"]
+    for table, query in zip(("expenses", "expenses", "fd_tracker"), queries):
+        assert stored.select(table, parse_qs(query)) == lists.select(table, parse_qs(query))
+    args = {"p_user_id": USER_ID, "p_start": "2000-01-01"}
+    assert stored.rpc("expense_category_totals", args) == lists.rpc("expense_category_totals", args)
+    def metrics(backend):
+        return {row["metric_name"]: (row["metric_value"], row["metric_data"])
+                for row in backend.tables["dashboard_metrics"]}
+    assert metrics(stored) == metrics(lists)
+
+    row, = stored.insert("expenses", {"user_id": USER_ID, "category": "food", "amount": 1,
+                                      "expense_date": "2999-01-01", "client_id": "c1"})
+    stored.insert("expenses", {"client_id": "c1", "amount": 2}, on_conflict="client_id")
+    assert stored.select("expenses", parse_qs("order=expense_date.desc&limit=1")) == [row]
+    assert row["amount"] == 2 and len(stored.tables["expenses"]) == len(lists.tables["expenses"]) + 1
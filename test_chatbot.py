@@ -2,348 +2,255 @@
 """
 Comprehensive chatbot test for finance.maiyuri.com
 Tests: Chat button, text input, Gemini response, voice button
+
+Run with --local to test the built dist/ against stubbed Supabase + Gemini.
+
+Each step (navigate, find the button, open the window, type, send, wait for
+the response, probe voice and suggestions) is a timed span (harness/tracing.py)
+carrying its selector, candidates tried and element count, with the network
+requests and console errors that happened during it. The spans are written
+as a Chrome trace (--trace, open in https://ui.perfetto.dev) and as OTLP
+JSON (--otlp). --playwright-trace records a full Playwright trace but only
+keeps the zip when a step or a visual comparison failed.
+
+Screenshots are clipped to what the step is about (the chat window once it
+is open). With --local they are CDP captures compared against
+harness/baselines/visual/ (harness/visual.py, which needs NumPy) in a thread
+pool while the steps carry on; the live site's are only saved. A capture
+that differs beyond its regions' thresholds is an error, with a
+<name>.diff.png next to it; the first run, or --update-visual-baselines,
+records the baselines. Each step's span carries its capture_ms, the summary
+the pool's decode/compare/encode time.
 """
 
 from playwright.sync_api import sync_playwright
+import argparse
 import time
 import json
 
-def test_chatbot():
-    results = {
-        "site_loaded": False,
-        "chat_button_found": False,
-        "chat_window_opened": False,
-        "text_input_works": False,
-        "gemini_response": False,
-        "voice_button_found": False,
-        "quick_suggestions": False,
-        "errors": [],
-        "console_logs": [],
-        "screenshots": []
-    }
+from harness import local_mode, tracing, waits
+from harness.results import new_results, print_results
+from harness.resolver import SelectorResolver, locator
+
+# Console messages kept in the results; the rest are only counted
+MAX_CONSOLE_LOGS = 200
+
+TRACE_PATH = "/tmp/chatbot_trace.json"
+OTLP_PATH = "/tmp/chatbot_trace.otlp.json"
+PLAYWRIGHT_TRACE_PATH = "/tmp/chatbot_trace.zip"
+
+# Fractions of the capture. The viewport's bottom-right corner is the chat
+# toggle, which pulses; the window's header is fixed, its messages carry
+# timestamps and a blinking caret.
+PAGE_REGIONS = [
+    {"name": "chat_toggle", "box": (0.85, 0.8, 1, 1), "threshold": 1.0, "max_ratio": 1.0},
+]
+WINDOW_REGIONS = [
+    {"name": "header", "box": (0, 0, 1, 0.12), "threshold": 0.05, "max_ratio": 0.0005},
+    {"name": "messages", "box": (0, 0.12, 1, 0.85), "threshold": 0.2, "max_ratio": 0.02},
+]
+
+
+def test_chatbot(site=None, tracer=None, playwright_trace=None, visual_baselines=None, update_visual=False):
+    """Run the chatbot checks, one span per step; keeps a Playwright trace zip at
+    `playwright_trace` only if a step failed. Screenshots are compared against
+    `visual_baselines` (default: harness/baselines/visual/) when testing the
+    local build."""
+    site = site or local_mode.LiveSite()
+    tracer = tracer or tracing.Tracer("test_chatbot")
+    results = new_results()
+    resolver = SelectorResolver()
+
+    def resolve(role, span):
+        # One page round trip per role; the winner is cached per build
+        resolution = resolver.resolve(page, role)
+        results["selectors"][role] = resolution
+        span.set(selector=resolution["selector"], candidates_tried=resolution["tried"],
+                 elements=resolution["count"], from_cache=resolution["from_cache"])
+        if not resolution["selector"]:
+            span.fail(f"no element for {role}")
+        return resolution
+
+    def screenshot(name, selector=None, regions=(), compare=True):
+        if checker:
+            path = checker.capture(name, selector, regions, compare=compare)
+            if tracer.current:
+                tracer.current.set(capture_ms=checker.last_capture_ms)
+        else:
+            path = f"/tmp/{name}.png"
+            (page.locator(selector).first if selector else page).screenshot(path=path)
+        results["screenshots"].append(path)
+
+    def log_console(msg):
+        if len(results["console_logs"]) >= MAX_CONSOLE_LOGS:
+            results["console_logs_dropped"] += 1
+            return
+        results["console_logs"].append({"type": msg.type, "text": msg.text})
 
     with sync_playwright() as p:
-        # Launch browser with visible window for debugging
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(
             viewport={"width": 1280, "height": 800},
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
         )
+        site.install(context)
         page = context.new_page()
-
-        # Capture console logs
-        page.on("console", lambda msg: results["console_logs"].append({
-            "type": msg.type,
-            "text": msg.text
-        }))
-
-        # Capture errors
+        checker = None
+        # The live site's data changes between runs: only the stub's captures
+        # are compared, so only then is harness/visual.py (and NumPy) loaded
+        if site.backend is not None:
+            from harness import visual
+            checker = visual.Checker(page, baseline_dir=visual_baselines or visual.BASELINE_DIR, output_dir="/tmp",
+                                     update=update_visual)
+
+        page.on("console", log_console)
         page.on("pageerror", lambda err: results["errors"].append(str(err)))
+        tracer.attach(page)
 
         try:
-            # Step 1: Navigate to site
-            print("📍 Step 1: Navigating to finance.maiyuri.com...")
-            page.goto("https://finance.maiyuri.com", wait_until="networkidle", timeout=30000)
-            results["site_loaded"] = True
-            print("   ✅ Site loaded successfully")
-
-            # Take initial screenshot
-            page.screenshot(path="/tmp/chatbot_test_1_initial.png", full_page=True)
-            results["screenshots"].append("/tmp/chatbot_test_1_initial.png")
-
-            # Wait for Vue to mount
-            page.wait_for_timeout(2000)
-
-            # Step 2: Find chat button
-            print("\n📍 Step 2: Looking for chat button...")
-
-            # Try multiple selectors for the chat button
-            chat_button_selectors = [
-                "button:has-text('💬')",
-                "[class*='chat']",
-                "button[class*='fixed'][class*='bottom']",
-                ".chat-widget button",
-                "button:has(svg)",
-                "#chat-button",
-                "[data-testid='chat-button']"
-            ]
-
-            chat_button = None
-            for selector in chat_button_selectors:
-                try:
-                    elements = page.locator(selector).all()
-                    if elements:
-                        chat_button = page.locator(selector).first
-                        print(f"   Found button with selector: {selector}")
-                        break
-                except:
-                    continue
-
-            # Check for any fixed-position buttons (chat buttons are usually fixed)
-            if not chat_button:
-                all_buttons = page.locator("button").all()
-                print(f"   Found {len(all_buttons)} buttons on page")
-                for i, btn in enumerate(all_buttons):
-                    try:
-                        box = btn.bounding_box()
-                        if box:
-                            # Chat buttons are usually in bottom-right corner
-                            if box["x"] > 1000 and box["y"] > 600:
-                                chat_button = btn
-                                print(f"   Found fixed button at position ({box['x']}, {box['y']})")
-                                break
-                    except:
-                        continue
-
-            if chat_button:
-                results["chat_button_found"] = True
-                print("   ✅ Chat button found!")
-
-                # Take screenshot before clicking
-                page.screenshot(path="/tmp/chatbot_test_2_button_found.png")
-                results["screenshots"].append("/tmp/chatbot_test_2_button_found.png")
-
-                # Step 3: Click to open chat window
-                print("\n📍 Step 3: Opening chat window...")
-                chat_button.click()
-                page.wait_for_timeout(2000)  # Give Vue time to render chat window
-
-                # Check if chat window opened
-                chat_window_selectors = [
-                    "[class*='chat-window']",
-                    "[class*='ChatWindow']",
-                    ".chat-container",
-                    "[class*='fixed'][class*='bottom'][class*='right']",
-                    "div:has-text('FI Assistant')"
-                ]
-
-                chat_window = None
-                for selector in chat_window_selectors:
-                    try:
-                        if page.locator(selector).count() > 0:
-                            chat_window = page.locator(selector).first
-                            print(f"   Found chat window with: {selector}")
-                            break
-                    except:
-                        continue
-
-                if chat_window:
-                    results["chat_window_opened"] = True
-                    print("   ✅ Chat window opened!")
-
-                    page.screenshot(path="/tmp/chatbot_test_3_window_open.png")
-                    results["screenshots"].append("/tmp/chatbot_test_3_window_open.png")
-
-                    # Step 4: Find and test text input
-                    print("\n📍 Step 4: Testing text input...")
-
-                    input_selectors = [
-                        "textarea[placeholder*='message']",
-                        "textarea[placeholder*='voice']",
-                        "textarea",
-                        "input[type='text']",
-                        "input[placeholder*='message']",
-                        "[contenteditable='true']"
-                    ]
-
-                    text_input = None
-                    for selector in input_selectors:
-                        try:
-                            if page.locator(selector).count() > 0:
-                                text_input = page.locator(selector).first
-                                print(f"   Found input with: {selector}")
-                                break
-                        except:
-                            continue
-
-                    if text_input:
-                        # Type a test message
-                        test_message = "What's my net worth?"
-                        text_input.fill(test_message)
-                        results["text_input_works"] = True
-                        print(f"   ✅ Typed: '{test_message}'")
-
-                        page.screenshot(path="/tmp/chatbot_test_4_message_typed.png")
-                        results["screenshots"].append("/tmp/chatbot_test_4_message_typed.png")
-
-                        # Find and click send button
-                        send_selectors = [
-                            "button:has-text('Send')",
-                            "button[type='submit']",
-                            "button:has(svg[class*='send'])",
-                            "button:has(svg)",
-                            "form button"
-                        ]
-
-                        send_button = None
-                        for selector in send_selectors:
-                            try:
-                                buttons = page.locator(selector).all()
-                                for btn in buttons:
-                                    if btn.is_visible():
-                                        send_button = btn
-                                        break
-                                if send_button:
-                                    break
-                            except:
-                                continue
-
-                        if send_button:
-                            print("\n📍 Step 5: Sending message...")
-                            send_button.click()
-
-                            # Wait for Gemini response
-                            print("   Waiting for Gemini response (up to 15 seconds)...")
-                            page.wait_for_timeout(5000)
-
-                            page.screenshot(path="/tmp/chatbot_test_5_after_send.png")
-                            results["screenshots"].append("/tmp/chatbot_test_5_after_send.png")
-
-                            # Check for response messages
-                            message_selectors = [
-                                ".message",
-                                "[class*='message']",
-                                "[class*='bubble']",
-                                "div:has-text('₹')",  # Financial responses often have rupee symbol
-                                "div:has-text('net worth')"
-                            ]
-
-                            for selector in message_selectors:
-                                try:
-                                    messages = page.locator(selector).all()
-                                    if len(messages) > 1:  # More than just the user message
-                                        results["gemini_response"] = True
-                                        print(f"   ✅ Found {len(messages)} message(s) - Gemini responded!")
-                                        break
-                                except:
-                                    continue
-
-                            if not results["gemini_response"]:
-                                print("   ⚠️ No response detected yet (may need more time)")
-                        else:
-                            print("   ⚠️ Send button not found")
-                    else:
-                        print("   ⚠️ Text input not found")
-
-                    # Step 6: Check for voice button
-                    print("\n📍 Step 6: Checking for voice button...")
-                    voice_selectors = [
-                        "button:has-text('🎤')",
-                        "[class*='VoiceButton']",
-                        "[class*='voice']",
-                        "[class*='mic']",
-                        "button[title*='voice']",
-                        "button[title*='Start']",
-                        "button:has(svg[class*='animate'])"
-                    ]
-
-                    for selector in voice_selectors:
-                        try:
-                            if page.locator(selector).count() > 0:
-                                results["voice_button_found"] = True
-                                print(f"   ✅ Voice button found with: {selector}")
-                                break
-                        except:
-                            continue
-
-                    if not results["voice_button_found"]:
-                        print("   ⚠️ Voice button not found (may be browser-specific)")
-
-                    # Step 7: Check for quick suggestions
-                    print("\n📍 Step 7: Checking for quick suggestions...")
-                    suggestion_selectors = [
-                        "button:has-text('Add expense')",
-                        "button:has-text('My net worth')",
-                        "button:has-text('FI progress')",
-                        "button.rounded-full",
-                        "[class*='suggestion']",
-                        "[class*='quick']"
-                    ]
-
-                    for selector in suggestion_selectors:
-                        try:
-                            if page.locator(selector).count() > 0:
-                                results["quick_suggestions"] = True
-                                print(f"   ✅ Quick suggestions found with: {selector}")
-                                break
-                        except:
-                            continue
-                else:
-                    print("   ⚠️ Chat window did not open")
-            else:
-                print("   ❌ Chat button NOT found!")
-
-                # Debug: Print page content
-                page.screenshot(path="/tmp/chatbot_test_debug.png", full_page=True)
-                results["screenshots"].append("/tmp/chatbot_test_debug.png")
-
-                # Check what's on the page
-                content = page.content()
-                if "ChatWidget" in content:
-                    print("   Note: ChatWidget is in HTML but button not visible")
-                if "chat" in content.lower():
-                    print("   Note: 'chat' text found in page content")
-
+            with tracing.retain_on_failure(context, tracer, playwright_trace):
+                run_steps(page, site, tracer, results, resolve, screenshot)
+                # Still inside the trace block: a run that fails only on visual
+                # diffs marks this span failed, so its trace zip is kept
+                if checker:
+                    with tracer.span("visual") as span:
+                        results["visual"] = checker.finish()
+                        failures = visual_failures(results["visual"])
+                        span.set(captures=len(results["visual"]["captures"]), failed=len(failures))
+                        if failures:
+                            span.fail("; ".join(failures))
         except Exception as e:
             results["errors"].append(str(e))
-            print(f"\n❌ Error: {e}")
-            page.screenshot(path="/tmp/chatbot_test_error.png")
-            results["screenshots"].append("/tmp/chatbot_test_error.png")
+            screenshot("chatbot_test_error", compare=False)
 
         finally:
+            # A failed step leaves its captures (and the error screenshot) pending
+            if checker and "visual" not in results:
+                results["visual"] = checker.finish()
             browser.close()
 
-    return results
-
-def print_results(results):
-    print("\n" + "="*60)
-    print("📊 CHATBOT TEST RESULTS")
-    print("="*60)
+    results["errors"].extend(visual_failures(results.get("visual", {})))
 
-    tests = [
-        ("Site Loaded", results["site_loaded"]),
-        ("Chat Button Found", results["chat_button_found"]),
-        ("Chat Window Opened", results["chat_window_opened"]),
-        ("Text Input Works", results["text_input_works"]),
-        ("Gemini Response", results["gemini_response"]),
-        ("Voice Button Found", results["voice_button_found"]),
-        ("Quick Suggestions", results["quick_suggestions"]),
-    ]
-
-    passed = sum(1 for _, v in tests if v)
-    total = len(tests)
-
-    for name, passed_test in tests:
-        status = "✅ PASS" if passed_test else "❌ FAIL"
-        print(f"  {status} - {name}")
-
-    print(f"\n📈 Score: {passed}/{total} tests passed")
+    results["steps"] = tracer.steps()
+    return results
 
-    if results["errors"]:
-        print("\n⚠️ Errors encountered:")
-        for err in results["errors"]:
-            print(f"   - {err[:100]}")
 
-    if results["console_logs"]:
-        error_logs = [log for log in results["console_logs"] if log["type"] == "error"]
-        if error_logs:
-            print("\n🔴 Console Errors:")
-            for log in error_logs[:5]:
-                print(f"   - {log['text'][:100]}")
+def visual_failures(report):
+    failures = []
+    for capture in report.get("captures", []):
+        if capture["status"] == "failed":
+            failed = [r["name"] for r in capture.get("regions", []) if r["failed"]]
+            failures.append(f"visual: {capture['name']} differs from its baseline"
+                            f" ({capture.get('reason') or ', '.join(failed)}; {capture.get('diff', 'no diff')})")
+    return failures
+
+
+def run_steps(page, site, tracer, results, resolve, screenshot):
+    with tracer.span("navigate", url=site.url) as span:
+        page.goto(site.url, wait_until="networkidle", timeout=30000)
+        results["site_loaded"] = True
+        screenshot("chatbot_test_1_initial", regions=PAGE_REGIONS)
+
+        # Wait for Vue to mount
+        results["wait_durations"]["app_mounted"] = waits.app_mounted(page)["waited_ms"]
+        span.set(app_mounted_ms=results["wait_durations"]["app_mounted"])
+
+    # Try multiple selectors for the chat button, then the bottom-right corner
+    with tracer.span("find_button") as span:
+        found = resolve("chat_button", span)
+        if found["selector"]:
+            results["chat_button_found"] = True
+            screenshot("chatbot_test_2_button_found", regions=PAGE_REGIONS)
+        else:
+            # Debug: what's on the page
+            screenshot("chatbot_test_debug", compare=False)
+            content = page.content()
+            span.set(chat_widget_in_html="ChatWidget" in content, chat_in_text="chat" in content.lower())
+            return
+
+    with tracer.span("open_window") as span:
+        locator(page, "chat_button").click()
+        try:
+            # Give Vue time to render chat window
+            results["wait_durations"]["chat_window_ready"] = waits.chat_window_ready(page, timeout_ms=5000)["waited_ms"]
+            span.set(ready_ms=results["wait_durations"]["chat_window_ready"])
+        except Exception as e:
+            span.set(ready_error=str(e))
+
+        # Check if chat window opened
+        if not resolve("chat_window", span)["selector"]:
+            return
+        results["chat_window_opened"] = True
+        screenshot("chatbot_test_3_window_open", waits.CHAT_WINDOW, WINDOW_REGIONS)
+
+    with tracer.span("type") as span:
+        found = resolve("input", span)
+        if found["selector"]:
+            test_message = "What's my net worth?"
+            locator(page, "input").fill(test_message)
+            results["text_input_works"] = True
+            span.set(message=test_message)
+            screenshot("chatbot_test_4_message_typed", waits.CHAT_WINDOW, WINDOW_REGIONS)
+
+    if results["text_input_works"]:
+        with tracer.span("send") as span:
+            found = resolve("send", span)
+            if found["selector"]:
+                baseline = waits.count_assistant_bubbles(page)
+                span.set(assistant_bubbles=baseline)
+                locator(page, "send").click()
+
+        if found["selector"]:
+            with tracer.span("wait_for_response") as span:
+                try:
+                    bubble = waits.assistant_bubble_appended(page, baseline)
+                    done = waits.processing_done(page)
+                    results["wait_durations"]["assistant_bubble"] = bubble["waited_ms"]
+                    results["wait_durations"]["processing_done"] = done["waited_ms"]
+                    results["gemini_response"] = True
+                    span.set(bubble_ms=bubble["waited_ms"], processing_done_ms=done["waited_ms"])
+                except Exception as e:
+                    span.fail(f"no response detected ({e})")
+                screenshot("chatbot_test_5_after_send", waits.CHAT_WINDOW, WINDOW_REGIONS)
 
-    print("\n📸 Screenshots saved:")
-    for path in results["screenshots"]:
-        print(f"   - {path}")
+    # Voice may be missing in some browsers
+    with tracer.span("probe_voice") as span:
+        results["voice_button_found"] = bool(resolve("voice", span)["selector"])
 
-    print("="*60)
+    with tracer.span("probe_suggestions") as span:
+        results["quick_suggestions"] = bool(resolve("suggestions", span)["selector"])
 
-    return passed, total
 
 if __name__ == "__main__":
-    print("🚀 Starting Chatbot Test for finance.maiyuri.com")
-    print("-" * 50)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", default=TRACE_PATH, help="where to write the Chrome trace of the steps")
+    parser.add_argument("--otlp", default=OTLP_PATH, help="where to write the steps as OTLP JSON")
+    parser.add_argument("--playwright-trace", nargs="?", const=PLAYWRIGHT_TRACE_PATH, default=None,
+                        help=f"record a Playwright trace, kept only on failure (default path: {PLAYWRIGHT_TRACE_PATH})")
+    parser.add_argument("--visual-baselines", default=None,
+                        help="where the baseline captures live (default: harness/baselines/visual/)")
+    parser.add_argument("--update-visual-baselines", action="store_true",
+                        help="record this run's captures as the baselines")
+    local_mode.add_arguments(parser)
+    args = parser.parse_args()
+
+    tracer = tracing.Tracer("test_chatbot")
+    with local_mode.open_site(args) as site:
+        print(f"🚀 Starting Chatbot Test for {site.url}")
+        print("-" * 50)
+
+        results = test_chatbot(site, tracer, args.playwright_trace, args.visual_baselines,
+                               args.update_visual_baselines)
+
+    print("\n⏱️ Steps:")
+    tracer.print_waterfall()
+    results["trace"] = tracer.write_chrome_trace(args.trace)
+    tracer.write_otlp(args.otlp)
+    print(f"   Trace: {args.trace} (OTLP: {args.otlp})")
+    if args.playwright_trace and tracer.failed:
+        results["playwright_trace"] = args.playwright_trace
+        print(f"   Playwright trace: {args.playwright_trace}")
 
-    results = test_chatbot()
     passed, total = print_results(results)
 
     # Save results as JSON
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+useGeminiQueue check: requests with the same key share one in-flight task
+only within a lane. A chat parse must not ride on the voice lane's
+speculative parse of the same text, or the next cancelLane('voice') rejects
+the chat caller with a SupersededError nobody asked for.
+
+Runs src/composables/useGeminiQueue.ts in Node (type stripping needs Node
+22.6+; skipped on older Node): pytest test_gemini_queue.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+QUEUE_PATH = os.path.join(HERE, "src", "composables", "useGeminiQueue.ts")
+
+# The queue publishes its stats on window.__fiDebug at import
+SCRIPT = """
+globalThis.window = {}
+const { schedule, cancelLane } = await import(process.argv[1])
+const settled = promises => Promise.allSettled(promises).then(outcomes => outcomes.map(outcome =>
+    outcome.status === 'fulfilled' ? outcome.value : outcome.reason.name))
+
+const key = 'intent:spent 500 on food'
+const voice = schedule(() => new Promise(() => {}), { key, lane: 'voice' })
+const chat = schedule(async () => 'chat', { key, lane: 'chat' })
+cancelLane('voice')
+const lanes = await settled([voice, chat])
+
+const first = schedule(async () => 'first', { key: 'response:same' })
+const second = schedule(async () => 'second', { key: 'response:same' })
+const unlaned = await settled([first, second])
+
+console.log(JSON.stringify({ lanes, unlaned, stats: window.__fiDebug.gemini }))
+"""
+
+
+def run_queue_script():
+    node = shutil.which("node")
+    if not node:
+        pytest.skip("node not installed")
+    probe = subprocess.run([node, "--experimental-strip-types", "-e", ""], capture_output=True)
+    if probe.returncode != 0:
+        pytest.skip("node cannot strip TypeScript types (needs 22.6+)")
+    done = subprocess.run([node, "--experimental-strip-types", "--no-warnings", "--input-type=module",
+                           "-e", SCRIPT, "file://" + QUEUE_PATH],
+                          capture_output=True, text=True, timeout=30)
+    assert done.returncode == 0, done.stderr
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def test_same_key_in_other_lane_is_not_shared():
+    result = run_queue_script()
+
+    # The voice task is superseded; the chat task ran on its own
+    assert result["lanes"] == ["SupersededError", "chat"]
+    # Without a lane, the second caller still shares the first's request
+    assert result["unlaned"] == ["first", "first"]
+    assert result["stats"]["deduped"] == 1
+    assert result["stats"]["superseded"] == 1
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Gemini stub check: with --gemini-max-concurrent, the local-mode server answers
+calls beyond the cap with the 429 body Google sends (RESOURCE_EXHAUSTED), the
+one useGeminiQueue backs off on.
+
+Runs without a browser: pytest test_gemini_stub.py
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from harness import local_mode
+
+BODY = json.dumps({"contents": [{"role": "user", "parts": [{"text": "User: hello"}]}]}).encode()
+
+
+class HeldBackend(local_mode.StubBackend):
+    """Holds the first Gemini answer open until `release` is set."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def gemini(self, body):
+        if not self.entered.is_set():
+            self.entered.set()
+            assert self.release.wait(10), "first call never released"
+        return super().gemini(body)
+
+
+def call(url):
+    request = urllib.request.Request(
+        f"{url}/v1beta/models/gemini-2.5-flash:generateContent", data=BODY,
+        headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_gemini_429s_over_local_server():
+    """Calls beyond --gemini-max-concurrent in flight get Google's 429 body."""
+    backend = HeldBackend(gemini_max_concurrent=1)
+    answers = []
+
+    with local_mode.serve_stub(backend) as site:
+        first = threading.Thread(target=lambda: answers.append(call(site.url)))
+        first.start()
+        try:
+            assert backend.entered.wait(10), "first call never reached the stub"
+            # The first call is in flight until released, so these are over the cap
+            rejected = [call(site.url), call(site.url)]
+        finally:
+            backend.release.set()
+            first.join(10)
+
+    assert [status for status, _ in answers] == [200]
+    assert [status for status, _ in rejected] == [429, 429]
+    assert all(answer["error"]["status"] == "RESOURCE_EXHAUSTED" for _, answer in rejected)
+    assert backend.gemini_peak == 1 and backend.gemini_in_flight == 0
+    assert backend.gemini_rate_limited == 2
+    assert backend.counts("gemini") == {"gemini": 3}